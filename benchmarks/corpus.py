@@ -0,0 +1,145 @@
+"""Seeded generator of synthetic Liquipedia tournament pages."""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from src.liquipedia.download_pages import safe_title
+
+TEAMS = [
+    "Natus Vincere", "FaZe Clan", "Team Vitality", "G2 Esports", "MOUZ", "Team Spirit", "Heroic",
+    "Cloud9", "Team Liquid", "ENCE", "Astralis", "FURIA Esports", "Complexity Gaming", "Eternal Fire",
+    "Virtus.pro", "BIG", "paiN Gaming", "The MongolZ", "3DMAX", "SAW", "GamerLegion", "Imperial Esports",
+]
+MAPS = ["Ancient", "Anubis", "Dust2", "Inferno", "Mirage", "Nuke", "Vertigo", "Overpass"]
+WORDS = (
+    "the tournament featured teams from europe and north america competing for a share of the prize pool "
+    "matches were played online before the playoffs moved to an arena with a live audience and broadcast"
+).split()
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October"]
+TIMEZONES = ["CET", "CEST", "EEST", "EDT", "UTC", "SGT"]
+SIZES = {
+    "small": {"pages": 20, "brackets": 2, "matches": 8, "prose": 6},
+    "medium": {"pages": 200, "brackets": 3, "matches": 12, "prose": 12},
+    "large": {"pages": 1000, "brackets": 4, "matches": 16, "prose": 20},
+}
+
+
+def _prose(rng: random.Random, paragraphs: int) -> str:
+    lines = []
+    for _ in range(paragraphs):
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 80)))
+        lines.append(f"{sentence.capitalize()}. See [[{rng.choice(TEAMS)}]] for details.<ref>{{{{cite web|url=https://example.com}}}}</ref>")
+    return "\n\n".join(lines)
+
+
+def _date(rng: random.Random, year: int) -> str:
+    month = rng.randint(1, 10)
+    day = rng.randint(1, 28)
+    hour = rng.randint(10, 22)
+    if rng.random() < 0.5:
+        return f"{MONTHS[month - 1]} {day}, {year} - {hour:02d}:{rng.choice(['00', '30'])} {{{{Abbr/{rng.choice(TIMEZONES)}}}}}"
+    return f"{year}-{month:02d}-{day:02d} - {hour:02d}:00"
+
+
+def _match(rng: random.Random, year: int) -> str:
+    """One series, as legacy ``{{Match}}``/``{{Map}}`` or ``{{Match2}}``/``{{MatchMap}}`` (about half each)."""
+    team1, team2 = rng.sample(TEAMS, 2)
+    best_of = rng.choice([1, 3, 3, 5])
+    wins_needed = best_of // 2 + 1
+    winner_first = rng.random() < 0.5
+    loser_wins = rng.randint(0, wins_needed - 1)
+    score1, score2 = (wins_needed, loser_wins) if winner_first else (loser_wins, wins_needed)
+    map_winners = [1] * score1 + [2] * score2
+    rng.shuffle(map_winners)
+    last = 1 if score1 > score2 else 2
+    map_winners.remove(last)
+    map_winners.append(last)
+    match2 = rng.random() < 0.5
+    maps = []
+    for index, (map_name, map_winner) in enumerate(zip(rng.sample(MAPS, len(map_winners)), map_winners), start=1):
+        loser_rounds = rng.randint(3, 11)
+        map_scores = (13, loser_rounds) if map_winner == 1 else (loser_rounds, 13)
+        if match2:
+            params = f"team1score={map_scores[0]}|team2score={map_scores[1]}|winner={map_winner}"
+            maps.append(f"    |map{index}={{{{MatchMap|map={map_name}|{params}}}}}")
+        else:
+            params = f"score1={map_scores[0]}|score2={map_scores[1]}|finished=true"
+            maps.append(f"    |map{index}={{{{Map|map={map_name}|{params}}}}}")
+    if match2:
+        header = [
+            "{{Match2",
+            f"    |opponent1={team1} |opponent2={team2}",
+            f"    |team1score={score1} |team2score={score2}",
+        ]
+    else:
+        header = ["{{Match", f"    |team1={team1} |team2={team2}", f"    |score1={score1} |score2={score2}"]
+    return "\n".join(
+        [
+            *header,
+            f"    |bestof={best_of}",
+            f"    |date={_date(rng, year)}",
+            *maps,
+            "}}",
+        ]
+    )
+
+
+def generate_page(rng: random.Random, title: str, brackets: int, matches: int, prose: int) -> str:
+    """Generate one tournament page with ``brackets * matches`` match templates."""
+    year = rng.randint(2019, 2025)
+    parts = [
+        "{{Infobox league",
+        f"|name={title}",
+        "|liquipediatier=1",
+        f"|sdate={year}-01-01",
+        "}}",
+        _prose(rng, prose),
+        "==Participants==",
+        "{{box|start|padding=2em}}",
+    ]
+    for team in rng.sample(TEAMS, 8):
+        players = "".join(f"|p{n}=player{rng.randint(1, 999)} |p{n}flag=eu\n" for n in range(1, 6))
+        parts.append(f"{{{{TeamCard\n|team={team}\n{players}}}}}")
+    parts.append("{{box|end}}")
+    parts.append('{| class="wikitable"\n! Team !! Points\n' + "".join(f"|-\n| {team} || {rng.randint(0, 3000)}\n" for team in TEAMS[:8]) + "|}")
+    for bracket in range(brackets):
+        parts.append(f"==Stage {bracket + 1}==")
+        parts.append(_prose(rng, 1))
+        if rng.random() < 0.7:
+            body = "\n".join(f"|R1M{index + 1}={_match(rng, year)}" for index in range(matches))
+            parts.append(f"{{{{Bracket|Bracket/{matches}|id=B{bracket}\n{body}\n}}}}")
+        else:
+            body = "\n".join(f"|M{index + 1}={_match(rng, year)}" for index in range(matches))
+            parts.append(f"{{{{MatchList|id=L{bracket}|title=Stage {bracket + 1}\n{body}\n}}}}")
+    parts.append("[[Category:S-Tier Tournaments]]")
+    return "\n".join(parts)
+
+
+def generate_corpus(
+    seed: int = 0,
+    pages: int = 20,
+    brackets: int = 2,
+    matches: int = 8,
+    prose: int = 6,
+) -> list[tuple[str, str]]:
+    """Return ``pages`` (title, wikitext) pairs; the same seed gives the same corpus."""
+    rng = random.Random(seed)
+    return [
+        (title, generate_page(rng, title, brackets, matches, prose))
+        for title in (f"Synthetic Cup {index} {seed}" for index in range(pages))
+    ]
+
+
+def write_corpus(root: Path, corpus: list[tuple[str, str]], tier: str = "S") -> Path:
+    """Write pages and a tournaments.jsonl under root in the pipeline's layout."""
+    pages_dir = root / "data/raw/liquipedia/pages"
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    tournaments_path = root / "data/raw/liquipedia/tournaments.jsonl"
+    with tournaments_path.open("w", encoding="utf-8") as handle:
+        for pageid, (title, wikitext) in enumerate(corpus, start=1):
+            (pages_dir / f"{safe_title(title)}.wikitext").write_text(wikitext, encoding="utf-8")
+            handle.write(json.dumps({"title": title, "pageid": pageid, "tier": tier}) + "\n")
+    return tournaments_path
@@ -0,0 +1,179 @@
+"""Run the offline benchmark suite and write comparable JSON results."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from src.liquipedia import build_dataset
+from src.liquipedia.cache import JsonFileCache, SQLiteCache
+from src.liquipedia.extract_matches import extract_matches_from_wikitext
+
+from .corpus import SIZES, generate_corpus, write_corpus
+
+HIGHER_IS_BETTER = ("_per_s", "speedup")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run offline pipeline benchmarks.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="Synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Workers for the parallel build")
+    parser.add_argument("--output", type=Path, default=Path("reports/benchmarks.json"), help="Results JSON path")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument(
+        "--max_regression",
+        type=float,
+        default=0.15,
+        help="Allowed relative slowdown per metric before --compare fails",
+    )
+    return parser.parse_args()
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def bench_parse(corpus: list[tuple[str, str]]) -> dict[str, float]:
+    """Extraction throughput with and without the template pre-filter."""
+    results: dict[str, float] = {}
+    for label, prefilter in (("full", False), ("prefilter", True)):
+        matches = 0
+        start = time.perf_counter()
+        for title, wikitext in corpus:
+            matches += len(extract_matches_from_wikitext(wikitext, title, "S", prefilter=prefilter))
+        elapsed = time.perf_counter() - start
+        results[f"{label}_pages_per_s"] = len(corpus) / elapsed
+        results[f"{label}_matches_per_s"] = matches / elapsed
+    results["prefilter_speedup"] = results["prefilter_pages_per_s"] / results["full_pages_per_s"]
+    return results
+
+
+def bench_cache(root: Path, corpus: list[tuple[str, str]]) -> dict[str, float]:
+    """Per-response put/get latency of the cache backends."""
+    payloads = [
+        (f"{index:040x}", {"query": {"pages": {str(index): {"title": title, "revisions": [{"slots": {"main": {"*": text}}}]}}}})
+        for index, (title, text) in enumerate(corpus)
+    ]
+    backends = {
+        "json": JsonFileCache(root / "json_cache"),
+        "sqlite": SQLiteCache(root / "cache.sqlite"),
+    }
+    results: dict[str, float] = {}
+    for name, backend in backends.items():
+        put_times = []
+        for key, payload in payloads:
+            start = time.perf_counter()
+            backend.put(key, payload)
+            put_times.append(time.perf_counter() - start)
+        get_times = []
+        for key, _ in payloads:
+            start = time.perf_counter()
+            backend.get(key)
+            get_times.append(time.perf_counter() - start)
+        results[f"{name}_put_p50_ms"] = statistics.median(put_times) * 1000
+        results[f"{name}_get_p50_ms"] = statistics.median(get_times) * 1000
+        results[f"{name}_get_p95_ms"] = _percentile(get_times, 0.95) * 1000
+    return results
+
+
+def bench_build(root: Path, corpus: list[tuple[str, str]], workers: int) -> dict[str, float]:
+    """End-to-end ``build_dataset --offline`` wall time on the synthetic corpus."""
+    tournaments_path = write_corpus(root, corpus)
+    runs = {
+        "serial_cold_s": ["--workers", "1", "--no_extraction_cache"],
+        f"workers{workers}_cold_s": ["--workers", str(workers), "--no_extraction_cache"],
+        "populate_cache_s": ["--workers", str(workers)],
+        "warm_cache_s": ["--workers", str(workers)],
+    }
+    results: dict[str, float] = {}
+    cwd = Path.cwd()
+    os.chdir(root)
+    logging.disable(logging.INFO)
+    try:
+        for name, extra in runs.items():
+            start = time.perf_counter()
+            build_dataset.main(["--input", str(tournaments_path.relative_to(root)), "--offline", *extra])
+            results[name] = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(cwd)
+    results.pop("populate_cache_s")
+    results["pages_per_s_serial"] = len(corpus) / results["serial_cold_s"]
+    return results
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Return descriptions of metrics that regressed by more than max_regression."""
+    regressions = []
+    for group, metrics in results["results"].items():
+        for name, value in metrics.items():
+            base = baseline.get("results", {}).get(group, {}).get(name)
+            if not base or not value:
+                continue
+            higher_is_better = any(marker in name for marker in HIGHER_IS_BETTER)
+            ratio = value / base if higher_is_better else base / value
+            print(f"{group}.{name}: {base:.4g} -> {value:.4g} ({ratio:.2f}x)")
+            if ratio < 1 - max_regression:
+                regressions.append(f"{group}.{name} ({ratio:.2f}x)")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    args = parse_args()
+    size = SIZES[args.size]
+    corpus = generate_corpus(seed=args.seed, **size)
+
+    with tempfile.TemporaryDirectory(prefix="ldc-bench-") as tmp:
+        root = Path(tmp)
+        results = {
+            "meta": {
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "size": args.size,
+                "seed": args.seed,
+                "pages": len(corpus),
+                "workers": args.workers,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "results": {
+                "parse": bench_parse(corpus),
+                "cache": bench_cache(root, corpus),
+                "build": bench_build(root / "build", corpus, args.workers),
+            },
+        }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results["results"], indent=2))
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Run the pipeline stages in one process: ``python -m src.liquipedia run``.
+
+Stages form a small DAG (tournaments -> pages -> build -> features) and share
+one API client. Each stage imports its module only when it actually runs, and
+is skipped when the fingerprint of its inputs matches the one recorded after
+its last successful run, so a rerun with nothing new is close to free.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Any
+
+from .config import PROVENANCE_MODES
+from .extraction_cache import extractor_fingerprint
+from .logging_utils import setup_logging
+from .metrics import METRICS, METRICS_PATH
+from .page_store import PAGE_STORES, open_page_store
+
+TOURNAMENTS_PATH = Path("data/raw/liquipedia/tournaments.jsonl")
+MATCHES_PATH = Path("data/processed/matches.parquet")
+FEATURES_DIR = Path("data/processed/features")
+RUN_STATE_PATH = Path("data/processed/run_state.json")
+STAGE_DEPS: dict[str, tuple[str, ...]] = {
+    "tournaments": (),
+    "pages": ("tournaments",),
+    "build": ("pages",),
+    "features": ("build",),
+}
+SRC_DIR = Path(__file__).resolve().parent.parent
+# Code outside the extractor fingerprint whose changes should rerun a stage.
+STAGE_MODULES = {
+    "build": [
+        "liquipedia/build_dataset.py",
+        "liquipedia/teams.py",
+        "liquipedia/parquet_writer.py",
+        "liquipedia/quality.py",
+        "liquipedia/dataset.py",
+    ],
+    "features": ["modeling/features.py"],
+}
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.liquipedia", description="Liquipedia pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run pipeline stages, skipping those that are up to date.")
+    run_parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=list(STAGE_DEPS),
+        default=list(STAGE_DEPS),
+        help="Stages to run (always in dependency order)",
+    )
+    run_parser.add_argument("--input", type=Path, default=TOURNAMENTS_PATH, help="tournaments.jsonl path")
+    run_parser.add_argument("--tiers", nargs="+", default=["S", "A"], help="Tournament tiers to discover")
+    run_parser.add_argument("--max_pages", type=int, default=None, help="Max pages to download and build")
+    run_parser.add_argument("--workers", type=int, default=1, help="Parallel extraction processes")
+    run_parser.add_argument("--page_store", choices=PAGE_STORES, default=None, help="Page store to use")
+    run_parser.add_argument(
+        "--provenance", choices=PROVENANCE_MODES, default="compact", help="Provenance mode for the build"
+    )
+    run_parser.add_argument("--dataset", type=Path, default=None, help="Build into a partitioned dataset directory")
+    run_parser.add_argument("--offline", action="store_true", help="Skip network stages and build offline")
+    run_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Discover new tournaments and re-download changed pages even if inputs are unchanged",
+    )
+    run_parser.add_argument("--force", action="store_true", help="Run the selected stages even if up to date")
+    run_parser.add_argument("--dry_run", action="store_true", help="Only report which stages would run")
+    run_parser.add_argument("--state", type=Path, default=RUN_STATE_PATH, help="Recorded stage fingerprints")
+    run_parser.add_argument("--metrics", type=Path, default=METRICS_PATH, help="Pipeline metrics JSON path")
+    return parser.parse_args(argv)
+
+
+def _digest(*parts: Any) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str | None:
+    """Content hash of a file, or None if it does not exist."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha1()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _module_digest(stage: str) -> str:
+    return _digest([file_digest(SRC_DIR / name) for name in STAGE_MODULES.get(stage, [])])
+
+
+class Pipeline:
+    """Stage fingerprints, outputs and runners for parsed ``run`` arguments."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.page_store = args.page_store or os.environ.get("LIQUIPEDIA_PAGE_STORE", "files")
+        self.matches = args.dataset or MATCHES_PATH
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        """One API client (and response cache) shared by all stages."""
+        if self._client is None:
+            from .client import LiquipediaClient
+
+            self._client = LiquipediaClient()
+        return self._client
+
+    def fingerprint(self, stage: str) -> str:
+        args = self.args
+        if stage == "tournaments":
+            return _digest(stage, sorted(args.tiers))
+        if stage == "pages":
+            return _digest(stage, file_digest(args.input), self.page_store, args.max_pages)
+        if stage == "build":
+            store = open_page_store(self.page_store)
+            try:
+                pages = store.fingerprint()
+            finally:
+                store.close()
+            return _digest(
+                stage,
+                file_digest(args.input),
+                pages,
+                extractor_fingerprint(provenance=args.provenance),
+                _module_digest(stage),
+                args.provenance,
+                args.dataset,
+                args.max_pages,
+            )
+        if stage == "features":
+            source = self.matches / "_manifest.json" if self.matches.is_dir() else self.matches
+            return _digest(stage, file_digest(source), _module_digest(stage))
+        raise ValueError(f"Unknown stage: {stage}")
+
+    def outputs(self, stage: str) -> list[Path]:
+        if stage in ("tournaments", "pages"):
+            return [self.args.input]
+        if stage == "build":
+            return [self.matches / "_manifest.json" if self.args.dataset else self.matches]
+        return [FEATURES_DIR]
+
+    def run(self, stage: str) -> None:
+        getattr(self, f"_run_{stage}")()
+
+    def _run_tournaments(self) -> None:
+        from . import download_tournaments
+
+        argv = ["--output", str(self.args.input), "--tiers", *self.args.tiers]
+        if self.args.input.exists():
+            argv.append("--incremental")
+        download_tournaments.run(download_tournaments.parse_args(argv), self.client)
+
+    def _run_pages(self) -> None:
+        from . import download_pages
+
+        argv = ["--input", str(self.args.input), "--page_store", self.page_store]
+        if self.args.max_pages is not None:
+            argv += ["--max_pages", str(self.args.max_pages)]
+        if self.args.refresh:
+            argv.append("--refresh")
+        download_pages.run(download_pages.parse_args(argv), self.client)
+
+    def _run_build(self) -> None:
+        from . import build_dataset
+
+        argv = [
+            "--input",
+            str(self.args.input),
+            "--workers",
+            str(self.args.workers),
+            "--provenance",
+            self.args.provenance,
+            "--page_store",
+            self.page_store,
+        ]
+        if self.args.dataset is not None:
+            argv += ["--dataset", str(self.args.dataset)]
+        if self.args.max_pages is not None:
+            argv += ["--max_pages", str(self.args.max_pages)]
+        if self.args.offline:
+            argv.append("--offline")
+        build_dataset.run(build_dataset.parse_args(argv), None if self.args.offline else self.client)
+
+    def _run_features(self) -> None:
+        from src.modeling import features
+
+        features.run(features.parse_args(["--input", str(self.matches), "--output", str(FEATURES_DIR)]))
+
+
+def load_run_state(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_run_state(path: Path, state: dict[str, str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def stage_order(stages: list[str]) -> list[str]:
+    """Selected stages in dependency order."""
+    order = TopologicalSorter(STAGE_DEPS).static_order()
+    return [stage for stage in order if stage in stages]
+
+
+def run_pipeline(args: argparse.Namespace, pipeline: Pipeline | None = None) -> list[str]:
+    """Run stale stages in order; return the names of the stages that ran."""
+    pipeline = pipeline or Pipeline(args)
+    state = load_run_state(args.state)
+    remote = {"tournaments", "pages"}
+    ran: list[str] = []
+    for stage in stage_order(args.stages):
+        if args.offline and stage in remote:
+            logger.info("%s: skipped (offline)", stage)
+            continue
+        fingerprint = pipeline.fingerprint(stage)
+        stale = (
+            args.force
+            or (args.refresh and stage in remote)
+            or state.get(stage) != fingerprint
+            or not all(path.exists() for path in pipeline.outputs(stage))
+        )
+        if not stale:
+            logger.info("%s: up to date", stage)
+            continue
+        if args.dry_run:
+            logger.info("%s: would run", stage)
+            continue
+        logger.info("%s: running", stage)
+        with METRICS.timer(f"run.{stage}"):
+            pipeline.run(stage)
+        # Record the inputs as they are now: a stage may add to its own inputs (e.g. downloaded pages).
+        state[stage] = pipeline.fingerprint(stage)
+        save_run_state(args.state, state)
+        ran.append(stage)
+    return ran
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    setup_logging()
+    try:
+        ran = run_pipeline(args)
+        logger.info("Ran %s of %s stages", len(ran), len(args.stages))
+    finally:
+        if not args.dry_run:
+            METRICS.write(args.metrics, {"command": "run"})
+
+
+if __name__ == "__main__":
+    main()
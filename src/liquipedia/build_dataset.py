@@ -6,28 +6,93 @@ import argparse
 import hashlib
 import json
 import logging
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any
-
-import pandas as pd
+from typing import Any, Callable, Iterable, Iterator
 
 from .client import LiquipediaClient
-from .download_pages import safe_title
-from .extract_matches import extract_matches_from_wikitext
+from .config import PROVENANCE_MODES
+from .dataset import DATASET_DIR, MatchesDataset
+from .extract_matches import MAP_FIELDS, MATCH_FIELDS, extract_matches_from_wikitext
+from .extraction_cache import EXTRACTION_CACHE_PATH, ExtractionCache, content_hash, extractor_fingerprint
+from .jobs import JOBS_PATH, JobManifest, in_shard, parse_shard, shard_suffix
 from .logging_utils import setup_logging
-from .mediawiki import get_wikitext
+from .metrics import METRICS, METRICS_PATH, profiled
+from .mediawiki import MAX_TITLES_PER_REQUEST, get_wikitexts
+from .page_store import PAGE_STORES, PackedPageStore, PageRef, PageStore, open_page_store, read_page, safe_title
+from .parquet_writer import MAPS_SCHEMA, MATCH_PARAMS_SCHEMA, MATCHES_SCHEMA, StreamingParquetWriter
+from .prefetch import iter_prefetched
+from .quality import QualityReport
+from .teams import TEAM_INDEX_PATH, TeamIndex, iter_canonicalized
 
 
 logger = logging.getLogger(__name__)
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build matches dataset from wikitext.")
     parser.add_argument("--input", type=Path, required=True, help="Path to tournaments.jsonl")
     parser.add_argument("--max_pages", type=int, default=None, help="Max pages to process")
     parser.add_argument("--offline", action="store_true", help="Do not download missing pages")
     parser.add_argument("--debug", action="store_true", help="Store extraction traces")
-    return parser.parse_args()
+    parser.add_argument("--workers", type=int, default=1, help="Parallel extraction processes")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Download pages in a background thread while extracting",
+    )
+    parser.add_argument("--queue_size", type=int, default=64, help="Pages buffered between fetcher and extractor")
+    parser.add_argument(
+        "--extraction_cache",
+        type=Path,
+        default=EXTRACTION_CACHE_PATH,
+        help="Cache of extracted rows keyed by page content and extractor version",
+    )
+    parser.add_argument("--no_extraction_cache", action="store_true", help="Re-extract every page")
+    parser.add_argument("--metrics", type=Path, default=METRICS_PATH, help="Pipeline metrics JSON path")
+    parser.add_argument("--profile", type=Path, default=None, help="Write cProfile stats to this path")
+    parser.add_argument("--row_group_size", type=int, default=50_000, help="Rows per Parquet row group")
+    parser.add_argument(
+        "--provenance",
+        choices=PROVENANCE_MODES,
+        default="compact",
+        help="off: no source info; compact: source template name; full: also raw params in match_params.parquet",
+    )
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        default=None,
+        help=f"Upsert into a tier/year partitioned dataset (e.g. {DATASET_DIR}) instead of matches.parquet",
+    )
+    parser.add_argument(
+        "--page_store",
+        choices=PAGE_STORES,
+        default=None,
+        help="Where pages are read from and downloaded to (default: $LIQUIPEDIA_PAGE_STORE or files)",
+    )
+    parser.add_argument("--team_index", type=Path, default=TEAM_INDEX_PATH, help="Team alias index path")
+    parser.add_argument(
+        "--no_resolve_teams",
+        action="store_true",
+        help="Do not query the API for unseen team names (always the case with --offline)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=(0, 1),
+        help="Only build shard i of n (i/n); output goes to data/processed/shards/",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=Path,
+        default=None,
+        help=f"Job manifest to record extracted/failed pages in (e.g. {JOBS_PATH})",
+    )
+    return parser.parse_args(argv)
 
 
 def _match_id(record: dict[str, Any]) -> str:
@@ -44,83 +109,317 @@ def _match_id(record: dict[str, Any]) -> str:
     return hashlib.sha1(key.encode("utf-8")).hexdigest()
 
 
-def main() -> None:
-    args = parse_args()
+# (wikitext or a packed-corpus ref, title, tier). Refs are read in the worker.
+PageTask = tuple[str | PageRef, str, Any]
+
+
+def _iter_pages(records: list[dict[str, Any]], store: PageStore, max_pages: int | None) -> Iterator[PageTask]:
+    """Yield (page, title, tier) for stored pages, in input order."""
+    packed = isinstance(store, PackedPageStore)
+    yielded = 0
+    for record in records:
+        if max_pages is not None and yielded >= max_pages:
+            break
+        page = store.ref(record["title"]) if packed else store.get(record["title"])
+        if page is None:
+            continue
+        yield page, record["title"], record.get("tier")
+        yielded += 1
+
+
+def _iter_pages_online(
+    client: LiquipediaClient,
+    records: list[dict[str, Any]],
+    store: PageStore,
+    max_pages: int | None,
+) -> Iterator[PageTask]:
+    """Like _iter_pages, but download missing pages in batches just ahead of use."""
+    keep_responses = not isinstance(store, PackedPageStore)
+    wanted = records if max_pages is None else records[:max_pages]
+    for start in range(0, len(wanted), MAX_TITLES_PER_REQUEST):
+        chunk = wanted[start : start + MAX_TITLES_PER_REQUEST]
+        missing = [record["title"] for record in chunk if not store.has(record["title"])]
+        if missing:
+            with store.batch():
+                for title, wikitext in get_wikitexts(client, missing, store_responses=keep_responses).items():
+                    store.put(title, wikitext)
+        yield from _iter_pages(chunk, store, None)
+
+
+def _wikitext(page: str | PageRef) -> str:
+    return read_page(page) if isinstance(page, PageRef) else page
+
+
+def _row_fields(provenance: str) -> list[str]:
+    fields = [*MATCH_FIELDS, "maps"]
+    return [*fields, "source_params"] if provenance == "full" else fields
+
+
+def _extract_rows(task: PageTask, provenance: str = "compact") -> tuple[list[tuple[Any, ...]], float, dict[str, float]]:
+    """Extract matches for one page as compact tuples (worker entry point).
+
+    Also returns the parse time and the worker's metric counters, which the
+    parent merges into its own registry.
+    """
+    page, title, tier = task
+    start = time.perf_counter()
+    matches = extract_matches_from_wikitext(_wikitext(page), title, tier, provenance=provenance)
+    fields = _row_fields(provenance)
+    rows = [tuple(match[field] for field in fields) for match in matches]
+    return rows, time.perf_counter() - start, METRICS.drain_counters()
+
+
+def _mark_failed(jobs: JobManifest, title: str, exc: Exception) -> None:
+    logger.warning("Extraction failed for %s: %r", title, exc)
+    METRICS.incr("build.extraction_failures")
+    jobs.mark([title], "failed", error=repr(exc))
+
+
+def _is_ready(pending: Any) -> bool:
+    return isinstance(pending, list) or pending.done()
+
+
+def _iter_extracted(
+    tasks: Iterable[PageTask],
+    workers: int,
+    cache: ExtractionCache | None = None,
+    provenance: str = "compact",
+    on_error: Callable[[str, Exception], None] | None = None,
+) -> Iterator[tuple[str, Any, list[dict[str, Any]]]]:
+    """Yield (title, tier, matches) per page in input order, optionally in parallel.
+
+    Pages found in the extraction cache are not parsed again; parsed pages
+    are added to it. If ``on_error`` is given, pages whose extraction raises
+    are reported to it and skipped instead of aborting the build.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    window = workers * 4 if executor else 1
+    in_flight: deque = deque()
+    fields = _row_fields(provenance)
+
+    def finish() -> tuple[str, Any, list[dict[str, Any]]] | None:
+        title, tier, key, pending = in_flight.popleft()
+        if isinstance(pending, list):
+            return title, tier, pending
+        try:
+            rows, seconds, counters = pending.result()
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(title, exc)
+            return None
+        METRICS.merge_counters(counters)
+        METRICS.observe("extract.page", seconds, title)
+        matches = [dict(zip(fields, row)) for row in rows]
+        if cache is not None:
+            cache.put(key, matches)
+        return title, tier, matches
+
+    try:
+        for task in tasks:
+            page, title, tier = task
+            key = None
+            if cache is not None:
+                # Packed refs carry the content hash, so cache hits never touch the page bytes.
+                key = page.sha1 if isinstance(page, PageRef) else content_hash(page)
+            pending: Any = cache.get(key, title, tier) if cache is not None else None
+            if pending is None:
+                if executor is not None:
+                    pending = executor.submit(_extract_rows, task, provenance)
+                else:
+                    try:
+                        with METRICS.timer("extract.page", title):
+                            pending = extract_matches_from_wikitext(
+                                _wikitext(page), title, tier, provenance=provenance
+                            )
+                    except Exception as exc:
+                        if on_error is None:
+                            raise
+                        on_error(title, exc)
+                        continue
+                    if cache is not None:
+                        cache.put(key, pending)
+            in_flight.append((title, tier, key, pending))
+            while len(in_flight) >= window or (in_flight and _is_ready(in_flight[0][3])):
+                result = finish()
+                if result is not None:
+                    yield result
+        while in_flight:
+            result = finish()
+            if result is not None:
+                yield result
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     setup_logging()
-    client = LiquipediaClient()
+    METRICS.reset()
+    try:
+        with profiled(args.profile), METRICS.timer("build.total"):
+            run(args)
+    finally:
+        METRICS.write(args.metrics, {"command": "build_dataset"})
+        logger.info("Saved metrics to %s", args.metrics)
+
 
-    pages_dir = Path("data/raw/liquipedia/pages")
-    pages_dir.mkdir(parents=True, exist_ok=True)
+def run(args: argparse.Namespace, client: LiquipediaClient | None = None) -> None:
+    """Build the dataset for parsed command-line arguments."""
+    client = client or LiquipediaClient()
+
+    store = open_page_store(args.page_store)
     debug_dir = Path("data/raw/liquipedia/_debug/extraction")
     if args.debug:
         debug_dir.mkdir(parents=True, exist_ok=True)
 
-    all_matches: list[dict[str, Any]] = []
-    processed = 0
-
+    records: list[dict[str, Any]] = []
     with args.input.open("r", encoding="utf-8") as handle:
         for line in handle:
-            if args.max_pages is not None and processed >= args.max_pages:
-                break
             record = json.loads(line)
-            title = record.get("title")
-            tier = record.get("tier")
-            if not title:
-                continue
-
-            filename = pages_dir / f"{safe_title(title)}.wikitext"
-            if not filename.exists():
-                if args.offline:
-                    continue
-                wikitext = get_wikitext(client, title)
-                filename.write_text(wikitext, encoding="utf-8")
-            else:
-                wikitext = filename.read_text(encoding="utf-8")
-
-            matches = extract_matches_from_wikitext(wikitext, title, tier)
-            for match in matches:
-                match["match_id"] = _match_id(match)
-            all_matches.extend(matches)
-
-            if args.debug:
-                debug_path = debug_dir / f"{safe_title(title)}.json"
-                debug_payload = {
-                    "title": title,
-                    "tier": tier,
-                    "matches_extracted": len(matches),
-                }
-                debug_path.write_text(json.dumps(debug_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-
-            processed += 1
-            if processed % 5 == 0:
-                logger.info("Processed %s pages", processed)
-
-    if not all_matches:
-        logger.warning("No matches extracted.")
+            if record.get("title") and in_shard(record["title"], args.shard):
+                records.append(record)
+
+    jobs = None
+    if args.jobs is not None:
+        jobs = JobManifest(args.jobs)
+        jobs.sync(records)
+    done: list[str] = []
 
-    df = pd.DataFrame(all_matches)
-    if not df.empty:
-        df = df.drop_duplicates(subset=["match_id"])  # type: ignore[arg-type]
+    if args.offline:
+        tasks: Iterator[PageTask] = _iter_pages(records, store, args.max_pages)
+    else:
+        tasks = _iter_pages_online(client, records, store, args.max_pages)
+        if args.pipeline:
+            tasks = iter_prefetched(tasks, maxsize=args.queue_size, name="page-fetcher")
+
+    cache = None
+    if not args.no_extraction_cache:
+        cache = ExtractionCache(args.extraction_cache, extractor_fingerprint(provenance=args.provenance))
+    suffix = shard_suffix(args.shard)
+    output_dir = Path("data/processed/shards") if suffix else Path("data/processed")
+    output_path = output_dir / f"matches{suffix}.parquet"
+    dataset = None
+    if args.dataset is not None:
+        dataset = MatchesDataset(args.dataset)
+        output_path = dataset.staging_path
+    maps_path = output_dir / f"maps{suffix}.parquet"
+    maps_writer = StreamingParquetWriter(maps_path, MAPS_SCHEMA, row_group_size=args.row_group_size, dedup_key=None)
+    params_writer = None
+    if args.provenance == "full":
+        params_path = output_dir / f"match_params{suffix}.parquet"
+        params_writer = StreamingParquetWriter(
+            params_path, MATCH_PARAMS_SCHEMA, row_group_size=args.row_group_size, dedup_key=None
+        )
+    quality = QualityReport()
+    processed = 0
+    interrupted = False
+    on_error = None if jobs is None else partial(_mark_failed, jobs)
+    extracted = _iter_extracted(tasks, args.workers, cache, args.provenance, on_error)
+    teams = TeamIndex(args.team_index)
+    resolver = None if args.offline or args.no_resolve_teams else client
+    canonicalized = iter_canonicalized(extracted, teams, resolver)
+    writer = StreamingParquetWriter(
+        output_path, MATCHES_SCHEMA, row_group_size=args.row_group_size, on_flush=quality.update
+    )
+    with writer, maps_writer, params_writer or nullcontext():
+        try:
+            for title, tier, matches in canonicalized:
+                for match in matches:
+                    match["match_id"] = _match_id(match)
+                    if not writer.add(match):
+                        continue
+                    for values in match["maps"]:
+                        map_row = dict(zip(MAP_FIELDS, values))
+                        map_row["match_id"] = match["match_id"]
+                        map_row["tournament_page"] = title
+                        maps_writer.add(map_row)
+                    if params_writer is not None:
+                        for key, value in match["source_params"]:
+                            params_writer.add({"match_id": match["match_id"], "key": key, "value": value})
+                if dataset is not None:
+                    dataset.track(title, matches)
 
-    output_path = Path("data/processed/matches.parquet")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(output_path, index=False)
+                if args.debug:
+                    debug_path = debug_dir / f"{safe_title(title)}.json"
+                    debug_payload = {
+                        "title": title,
+                        "tier": tier,
+                        "matches_extracted": len(matches),
+                    }
+                    debug_path.write_text(json.dumps(debug_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+                processed += 1
+                if processed % 5 == 0:
+                    logger.info("Processed %s pages", processed)
+                if jobs is not None:
+                    done.append(title)
+                    if len(done) >= MAX_TITLES_PER_REQUEST:
+                        jobs.mark(done, "extracted")
+                        done.clear()
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("Interrupted after %s pages; writing partial dataset", processed)
+        finally:
+            canonicalized.close()
+            extracted.close()
+            tasks.close()
+            store.close()
+            teams.save()
+            if jobs is not None:
+                jobs.mark(done, "extracted")
+                jobs.close()
+
+    if cache is not None:
+        logger.info("Extraction cache: %s hits, %s misses", cache.hits, cache.misses)
+        METRICS.incr("extraction_cache.hits", cache.hits)
+        METRICS.incr("extraction_cache.misses", cache.misses)
+        cache.prune()
+        cache.close()
+
+    logger.info("Saved %s maps to %s", maps_writer.rows_written, maps_path)
+    logger.info("Team index: %s teams, %s aliases", len(teams.teams), len(teams.aliases))
+    if params_writer is not None:
+        logger.info("Saved %s source params to %s", params_writer.rows_written, params_path)
+    if dataset is not None:
+        with METRICS.timer("dataset.publish"):
+            rewritten = dataset.publish()
+        logger.info("Rewrote %s partitions of %s", len(rewritten), args.dataset)
+        output_path = args.dataset
+
+    total = writer.rows_written
+    METRICS.incr("build.pages", processed)
+    METRICS.incr("build.rows_written", total)
+    METRICS.incr("build.maps_written", maps_writer.rows_written)
+    METRICS.incr("build.duplicates_dropped", writer.duplicates_dropped)
+    if not total:
+        logger.warning("No matches extracted.")
 
+    with METRICS.timer("build.quality_report"):
+        breakdown = quality.result()
+    overall = breakdown["overall"]
     report = {
+        "interrupted": interrupted,
         "tournaments_processed": processed,
-        "matches_extracted": len(df),
-        "pct_with_teams": float(df.dropna(subset=["team1", "team2"]).shape[0] / len(df)) if len(df) else 0.0,
-        "pct_with_scores": float(df.dropna(subset=["score1", "score2"]).shape[0] / len(df)) if len(df) else 0.0,
-        "pct_with_start_time": float(df.dropna(subset=["start_time_utc"]).shape[0] / len(df)) if len(df) else 0.0,
+        "matches_extracted": total,
+        "maps_extracted": maps_writer.rows_written,
+        "duplicates_dropped": writer.duplicates_dropped,
+        "pct_with_teams": 1 - overall["missing_teams_rate"] if total else 0.0,
+        "pct_with_scores": 1 - overall["missing_scores_rate"] if total else 0.0,
+        "pct_with_start_time": 1 - overall["missing_start_time_rate"] if total else 0.0,
+        **breakdown,
     }
 
     reports_dir = Path("reports")
     reports_dir.mkdir(parents=True, exist_ok=True)
-    report_path = reports_dir / "data_quality.json"
+    report_path = reports_dir / f"data_quality{suffix}.json"
     report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
 
     logger.info("Saved dataset to %s", output_path)
     logger.info("Saved report to %s", report_path)
+    if interrupted:
+        raise SystemExit(130)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+"""Response cache backends for the Liquipedia client."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Protocol
+
+CACHE_DIR = Path("data/raw/liquipedia/cache")
+SQLITE_CACHE_PATH = Path("data/raw/liquipedia/cache.sqlite")
+
+
+class CacheBackend(Protocol):
+    """Storage for API responses keyed by a params digest."""
+
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def put(self, key: str, data: dict[str, Any]) -> None: ...
+
+
+class JsonFileCache:
+    """One pretty-printed JSON file per response (the original layout)."""
+
+    def __init__(self, directory: Path = CACHE_DIR) -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False, indent=2)
+
+
+class SQLiteCache:
+    """Single-file SQLite (WAL) cache of zlib-compressed responses.
+
+    Entries older than ``ttl_seconds`` are treated as misses. When
+    ``max_bytes`` is set, reads refresh ``accessed_at`` and the least recently
+    used entries are evicted once the stored size exceeds the limit. The
+    database can be shared by several processes; each process opens its own
+    connection.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: Path = SQLITE_CACHE_PATH,
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._puts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, data BLOB NOT NULL, fetched_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT data, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            data, fetched_at = row
+            now = time.time()
+            if self.ttl_seconds is not None and now - fetched_at > self.ttl_seconds:
+                return None
+            if self.max_bytes is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(data))
+
+    def put(self, key: str, data: dict[str, Any], fetched_at: float | None = None) -> None:
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO responses (key, data, fetched_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, fetched_at or now, now, len(blob)),
+            )
+            self._puts += 1
+        if self._puts % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones above max_bytes."""
+        removed = 0
+        with self._lock:
+            conn = self._connection()
+            if self.ttl_seconds is not None:
+                cursor = conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+                removed += cursor.rowcount
+            if self.max_bytes is None:
+                return removed
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total <= self.max_bytes:
+                return removed
+            stale: list[str] = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                if total <= self.max_bytes:
+                    break
+                stale.append(key)
+                total -= size
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in stale])
+            conn.execute("COMMIT")
+            removed += len(stale)
+        return removed
+
+    def import_json_dir(self, directory: Path, batch_size: int = 500) -> int:
+        """Import a JsonFileCache directory, keeping keys and file mtimes."""
+        imported = 0
+        batch: list[tuple[str, bytes, float, float, int]] = []
+        with self._lock:
+            conn = self._connection()
+            for path in directory.glob("*.json"):
+                with path.open("r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+                blob = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                mtime = path.stat().st_mtime
+                batch.append((path.stem, blob, mtime, mtime, len(blob)))
+                if len(batch) >= batch_size:
+                    imported += self._insert_many(conn, batch)
+                    batch = []
+            imported += self._insert_many(conn, batch)
+        return imported
+
+    @staticmethod
+    def _insert_many(conn: sqlite3.Connection, rows: list[tuple[str, bytes, float, float, int]]) -> int:
+        if not rows:
+            return 0
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR REPLACE INTO responses (key, data, fetched_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("COMMIT")
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_cache(backend: str | None = None) -> CacheBackend:
+    """Create the cache backend selected by ``LIQUIPEDIA_CACHE_BACKEND``."""
+    backend = backend or os.environ.get("LIQUIPEDIA_CACHE_BACKEND", "json")
+    if backend == "json":
+        return JsonFileCache()
+    if backend == "sqlite":
+        ttl = os.environ.get("LIQUIPEDIA_CACHE_TTL_SECONDS")
+        max_mb = os.environ.get("LIQUIPEDIA_CACHE_MAX_MB")
+        return SQLiteCache(
+            Path(os.environ.get("LIQUIPEDIA_CACHE_PATH", str(SQLITE_CACHE_PATH))),
+            ttl_seconds=float(ttl) if ttl else None,
+            max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+        )
+    raise ValueError(f"Unsupported cache backend: {backend}")
@@ -3,18 +3,19 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import os
-import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import requests
 
+from .cache import CacheBackend, open_cache
+from .metrics import METRICS
+from .rate_limit import RATE_LIMIT_STATE_PATH, TokenBucketLimiter, parse_retry_after
+
 BASE_URL = "https://liquipedia.net/counterstrike/api.php"
-CACHE_DIR = Path("data/raw/liquipedia/cache")
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 @dataclass
@@ -23,13 +24,25 @@ class LiquipediaClient:
 
     rate_limit_seconds: float | None = None
     session: requests.Session | None = None
+    cache: CacheBackend | None = None
+    limiter: TokenBucketLimiter | None = None
+    maxlag: int | None = None
 
     def __post_init__(self) -> None:
         if self.session is None:
             self.session = requests.Session()
+        if self.cache is None:
+            self.cache = open_cache()
         if self.rate_limit_seconds is None:
             self.rate_limit_seconds = float(os.environ.get("LIQUIPEDIA_RATE_LIMIT_SECONDS", "2.0"))
-        self._last_request_time = 0.0
+        if self.limiter is None:
+            self.limiter = TokenBucketLimiter(
+                rate_per_second=1.0 / max(self.rate_limit_seconds, 1e-3),
+                capacity=float(os.environ.get("LIQUIPEDIA_RATE_LIMIT_BURST", "1")),
+                path=Path(os.environ.get("LIQUIPEDIA_RATE_LIMIT_STATE", str(RATE_LIMIT_STATE_PATH))),
+            )
+        if self.maxlag is None:
+            self.maxlag = int(os.environ.get("LIQUIPEDIA_MAXLAG", "5"))
 
     def _headers(self) -> dict[str, str]:
         user_agent = os.environ.get("LIQUIPEDIA_USER_AGENT")
@@ -43,42 +56,72 @@ class LiquipediaClient:
             "Accept-Encoding": "gzip",
         }
 
-    def _cache_path(self, params: dict[str, Any]) -> Path:
+    def _cache_key(self, params: dict[str, Any]) -> str:
         hash_input = BASE_URL + "?" + "&".join(
             f"{key}={params[key]}" for key in sorted(params)
         )
-        digest = hashlib.sha1(hash_input.encode("utf-8")).hexdigest()
-        return CACHE_DIR / f"{digest}.json"
+        return hashlib.sha1(hash_input.encode("utf-8")).hexdigest()
 
     def _respect_rate_limit(self) -> None:
-        now = time.time()
-        elapsed = now - self._last_request_time
-        if elapsed < self.rate_limit_seconds:
-            time.sleep(self.rate_limit_seconds - elapsed)
+        waited = self.limiter.acquire()
+        if waited:
+            METRICS.incr("ratelimit.sleep_seconds", waited)
+
+    def _back_off(self, seconds: float) -> None:
+        """Hold back every process sharing the limiter for ``seconds``."""
+        METRICS.incr("http.retries")
+        METRICS.incr("http.backoff_seconds", seconds)
+        self.limiter.penalize(seconds)
+
+    def get_cached(self, params: dict[str, Any]) -> dict[str, Any] | None:
+        """Return a cached response for params, or None if not cached."""
+        with METRICS.timer("cache.read"):
+            data = self.cache.get(self._cache_key(params))
+        METRICS.incr("cache.hits" if data is not None else "cache.misses")
+        return data
+
+    def store_cached(self, params: dict[str, Any], data: dict[str, Any]) -> None:
+        """Store a response in the cache under params."""
+        with METRICS.timer("cache.write"):
+            self.cache.put(self._cache_key(params), data)
 
-    def get_json(self, params: dict[str, Any]) -> dict[str, Any]:
+    def get_json(self, params: dict[str, Any], use_cache: bool = True) -> dict[str, Any]:
         """Get JSON response, using cache and retry logic."""
-        cache_path = self._cache_path(params)
-        if cache_path.exists():
-            with cache_path.open("r", encoding="utf-8") as handle:
-                return json.load(handle)
+        if use_cache:
+            cached = self.get_cached(params)
+            if cached is not None:
+                return cached
 
-        self._respect_rate_limit()
         headers = self._headers()
+        request_params = dict(params)
+        if self.maxlag:
+            request_params["maxlag"] = self.maxlag
 
         retries = 3
         backoff = 1.0
         while True:
-            response = self.session.get(BASE_URL, params=params, headers=headers, timeout=30)
-            if response.status_code in {429, 500, 502, 503, 504} and retries > 0:
-                time.sleep(backoff)
+            self._respect_rate_limit()
+            with METRICS.timer("http.request"):
+                response = self.session.get(BASE_URL, params=request_params, headers=headers, timeout=30)
+            METRICS.incr("http.requests")
+            METRICS.incr("http.bytes", len(response.content))
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code in RETRY_STATUSES and retries > 0:
+                self._back_off(retry_after if retry_after is not None else backoff)
                 backoff *= 2
                 retries -= 1
                 continue
             response.raise_for_status()
             data = response.json()
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with cache_path.open("w", encoding="utf-8") as handle:
-                json.dump(data, handle, ensure_ascii=False, indent=2)
-            self._last_request_time = time.time()
+            error = data.get("error", {}) if isinstance(data, dict) else {}
+            if error.get("code") == "maxlag":
+                METRICS.incr("http.maxlag")
+                if retries > 0:
+                    self._back_off(retry_after if retry_after is not None else backoff)
+                    backoff *= 2
+                    retries -= 1
+                    continue
+                raise RuntimeError(f"Liquipedia API is lagged: {error.get('info', 'maxlag')}")
+            if use_cache:
+                self.store_cached(params, data)
             return data
@@ -9,3 +9,6 @@ DEFAULT_MATCH_TEMPLATES = [
     "MatchSummary",
     "MatchList",
 ]
+
+# How much of the source template a match keeps; see ``extract_matches_from_wikitext``.
+PROVENANCE_MODES = ("off", "compact", "full")
@@ -0,0 +1,191 @@
+"""Hive-partitioned matches dataset with per-tournament upserts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .parquet_writer import MATCHES_SCHEMA
+
+DATASET_DIR = Path("data/processed/matches")
+MANIFEST_NAME = "_manifest.json"
+STAGING_NAME = "_staging.parquet"
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+logger = logging.getLogger(__name__)
+
+
+def _partition_keys(table: pa.Table) -> pa.Array:
+    """The ``tournament_tier=<tier>/year=<year>`` directory of every row."""
+    tiers = pc.fill_null(table.column("tournament_tier"), DEFAULT_PARTITION)
+    years = pc.fill_null(pc.utf8_slice_codeunits(table.column("start_time_utc"), 0, 4), DEFAULT_PARTITION)
+    return pc.binary_join_element_wise("tournament_tier=", tiers, "/year=", years, "")
+
+
+def rows_digest(matches: list[dict[str, Any]]) -> str:
+    """Digest of a tournament's extracted rows, used to detect changes."""
+    payload = json.dumps(matches, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class MatchesDataset:
+    """Matches stored as one Parquet file per ``tournament_tier``/``year`` partition.
+
+    ``_manifest.json`` lists the current file of every partition and, per
+    tournament, the digest of its rows and the partitions holding them.
+    Readers only look at files named in the manifest, which is replaced
+    atomically, so they always see a consistent version. Files superseded
+    by a publish are deleted on the following one.
+    """
+
+    def __init__(self, root: Path = DATASET_DIR) -> None:
+        self.root = root
+        self.staging_path = root / STAGING_NAME
+        self.manifest = load_dataset_manifest(root)
+        self._digests: dict[str, str] = {}
+
+    def track(self, title: str, matches: list[dict[str, Any]]) -> bool:
+        """Record a tournament's rows for this build; return True if they changed."""
+        digest = rows_digest(matches)
+        self._digests[title] = digest
+        return self.manifest["tournaments"].get(title, {}).get("digest") != digest
+
+    def changed_titles(self) -> list[str]:
+        tournaments = self.manifest["tournaments"]
+        return [
+            title for title, digest in self._digests.items() if tournaments.get(title, {}).get("digest") != digest
+        ]
+
+    def upsert(self, staged_path: Path, titles: Iterable[str]) -> list[str]:
+        """Replace the rows of ``titles`` with their rows in ``staged_path``.
+
+        Existing rows of those tournaments, or with a staged ``match_id``,
+        are dropped. Only partitions that held or receive such rows are
+        rewritten. Returns the rewritten partition keys.
+        """
+        titles = sorted(set(titles))
+        if not titles:
+            return []
+        manifest = self.manifest
+        staged = pq.read_table(staged_path, filters=[("tournament_page", "in", titles)], schema=MATCHES_SCHEMA)
+        staged_keys = _partition_keys(staged)
+        touched = set(staged_keys.to_pylist())
+        for title in titles:
+            touched.update(manifest["tournaments"].get(title, {}).get("partitions", []))
+
+        version = manifest["version"] + 1
+        files = dict(manifest["files"])
+        retired = []
+        title_set = pa.array(titles, pa.string())
+        staged_ids = staged.column("match_id")
+        for key in sorted(touched):
+            parts = [staged.filter(pc.equal(staged_keys, key))]
+            if key in files:
+                old = pq.read_table(self.root / files[key], schema=MATCHES_SCHEMA)
+                keep = pc.invert(
+                    pc.or_(
+                        pc.is_in(old.column("tournament_page"), value_set=title_set),
+                        pc.is_in(old.column("match_id"), value_set=staged_ids),
+                    )
+                )
+                parts.insert(0, old.filter(keep))
+                retired.append(files.pop(key))
+            table = pa.concat_tables(parts)
+            if not table.num_rows:
+                continue
+            relative = f"{key}/part-{version:06d}.parquet"
+            (self.root / key).mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, self.root / relative)
+            files[key] = relative
+
+        tournaments = dict(manifest["tournaments"])
+        staged_titles = staged.column("tournament_page").to_pylist()
+        by_title: dict[str, set[str]] = {title: set() for title in titles}
+        for title, key in zip(staged_titles, staged_keys.to_pylist()):
+            by_title[title].add(key)
+        for title in titles:
+            tournaments[title] = {"digest": self._digests.get(title), "partitions": sorted(by_title[title])}
+
+        previous_retired = manifest.get("retired", [])
+        self.manifest = {"version": version, "files": files, "tournaments": tournaments, "retired": retired}
+        save_dataset_manifest(self.root, self.manifest)
+        for relative in previous_retired:
+            (self.root / relative).unlink(missing_ok=True)
+        logger.info("Published dataset version %s (%s partitions rewritten)", version, len(touched))
+        return sorted(touched)
+
+    def publish(self) -> list[str]:
+        """Upsert the changed tournaments from the staging file, then remove it."""
+        try:
+            return self.upsert(self.staging_path, self.changed_titles())
+        finally:
+            self.staging_path.unlink(missing_ok=True)
+
+
+def load_dataset_manifest(root: Path) -> dict[str, Any]:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {"version": 0, "files": {}, "tournaments": {}, "retired": []}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_dataset_manifest(root: Path, manifest: dict[str, Any]) -> None:
+    """Atomically replace the dataset manifest."""
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / MANIFEST_NAME
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def read_matches(
+    path: Path,
+    tiers: Iterable[str] | None = None,
+    years: Iterable[int | str] | None = None,
+    columns: list[str] | None = None,
+    filter: ds.Expression | None = None,
+) -> pa.Table:
+    """Read matches from a partitioned dataset directory or a single Parquet file.
+
+    For a dataset, partitions outside ``tiers``/``years`` are skipped using
+    the manifest; ``filter`` is pushed down to row-group statistics.
+    """
+    tiers = None if tiers is None else sorted(set(tiers))
+    years = None if years is None else sorted({str(year) for year in years})
+    if path.is_dir():
+        files = load_dataset_manifest(path)["files"]
+        wanted = [
+            str(path / relative)
+            for key, relative in sorted(files.items())
+            if (tiers is None or key.split("/")[0].split("=", 1)[1] in tiers)
+            and (years is None or key.split("/")[1].split("=", 1)[1] in years)
+        ]
+        source = ds.dataset(wanted, schema=MATCHES_SCHEMA, format="parquet")
+    else:
+        source = ds.dataset(path, format="parquet")
+    expression = filter
+    if tiers is not None:
+        tier_filter = ds.field("tournament_tier").isin(tiers)
+        expression = tier_filter if expression is None else expression & tier_filter
+    read_columns = columns
+    if columns is not None and years is not None and "start_time_utc" not in columns:
+        read_columns = [*columns, "start_time_utc"]
+    table = source.to_table(columns=read_columns, filter=expression)
+    if years is not None:
+        table_years = pc.utf8_slice_codeunits(table.column("start_time_utc"), 0, 4)
+        table = table.filter(pc.is_in(table_years, value_set=pa.array(years, pa.string())))
+    if columns is not None:
+        table = table.select(columns)
+    return table
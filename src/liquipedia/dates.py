@@ -0,0 +1,143 @@
+"""Fast, memoized normalization of Liquipedia date/time strings to UTC."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from dateutil import parser as date_parser
+
+from .metrics import METRICS
+
+# UTC offsets in hours for the abbreviations used by Liquipedia's {{Abbr/...}}
+# timezone templates. Ambiguous abbreviations use the reading Liquipedia uses
+# for Counter-Strike events (e.g. CST is US Central, AST is Arabia).
+TIMEZONE_OFFSETS_HOURS = {
+    "UTC": 0,
+    "GMT": 0,
+    "Z": 0,
+    "WET": 0,
+    "WEST": 1,
+    "BST": 1,
+    "CET": 1,
+    "CEST": 2,
+    "EET": 2,
+    "EEST": 3,
+    "MSK": 3,
+    "AST": 3,
+    "GST": 4,
+    "PKT": 5,
+    "IST": 5.5,
+    "ICT": 7,
+    "WIB": 7,
+    "SGT": 8,
+    "HKT": 8,
+    "PHT": 8,
+    "AWST": 8,
+    "KST": 9,
+    "JST": 9,
+    "ACST": 9.5,
+    "AEST": 10,
+    "AEDT": 11,
+    "NZST": 12,
+    "NZDT": 13,
+    "BRT": -3,
+    "ART": -3,
+    "CLT": -4,
+    "EDT": -4,
+    "EST": -5,
+    "CDT": -5,
+    "CST": -6,
+    "MDT": -6,
+    "MST": -7,
+    "PDT": -7,
+    "PST": -8,
+}
+TIMEZONES = {name: timezone(timedelta(hours=hours)) for name, hours in TIMEZONE_OFFSETS_HOURS.items()}
+_TZINFOS = {name: int(hours * 3600) for name, hours in TIMEZONE_OFFSETS_HOURS.items()}
+
+MONTHS = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+_ABBR_TEMPLATE_RE = re.compile(r"\{\{\s*Abbr/([A-Za-z]+)\s*\}\}")
+_FAST_RE = re.compile(
+    r"\s*(?:(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})"
+    r"|(?P<month_name>[A-Za-z]+)\.?\s+(?P<day_name>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<year_name>\d{4}))"
+    r"(?:\s*-?\s*(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?"
+    r"(?:\s*(?P<tz>[A-Z]{1,5}))?\s*"
+)
+
+
+def _fast_parse(text: str) -> datetime | None:
+    """Parse the common Liquipedia formats; None means 'not handled here'."""
+    match = _FAST_RE.fullmatch(text)
+    if match is None:
+        return None
+    tzname = match.group("tz")
+    if tzname is not None and tzname not in TIMEZONES:
+        return None
+    if match.group("year") is not None:
+        year, month, day = int(match.group("year")), int(match.group("month")), int(match.group("day"))
+    else:
+        month = MONTHS.get(match.group("month_name").lower())
+        if month is None:
+            return None
+        year, day = int(match.group("year_name")), int(match.group("day_name"))
+    hour = int(match.group("hour") or 0)
+    minute = int(match.group("minute") or 0)
+    second = int(match.group("second") or 0)
+    try:
+        return datetime(year, month, day, hour, minute, second, tzinfo=TIMEZONES[tzname or "UTC"])
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_datetime_utc(date_str: str | None, time_str: str | None) -> str | None:
+    """Combine date and time params into an ISO-8601 UTC string.
+
+    Inputs without a timezone are taken as UTC. ``{{Abbr/CEST}}``-style
+    templates and bare abbreviations are converted with TIMEZONE_OFFSETS_HOURS.
+    Common formats are parsed with a regex; anything else goes through
+    dateutil. Results are memoized, since values repeat within a page.
+    """
+    if not date_str and not time_str:
+        return None
+    if date_str and time_str:
+        combined = f"{date_str} {time_str}"
+    else:
+        combined = date_str or time_str
+    combined = _ABBR_TEMPLATE_RE.sub(r"\1", combined)
+
+    parsed = _fast_parse(combined)
+    if parsed is not None:
+        METRICS.incr("dates.fast_path")
+    else:
+        METRICS.incr("dates.dateutil")
+        try:
+            parsed = date_parser.parse(combined, tzinfos=_TZINFOS)
+        except (ValueError, TypeError, OverflowError):
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="seconds")
@@ -1,23 +1,149 @@
-"""Inspect template usage in a wikitext file."""
+"""Inspect template usage in a wikitext file or across the whole page store."""
 
 from __future__ import annotations
 
 import argparse
+import json
+import logging
+import os
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Iterable
 
 import mwparserfromhell
 
+from .config import DEFAULT_MATCH_TEMPLATES
+from .extract_matches import MAP_TEMPLATES, TEAM_KEYS
+from .logging_utils import setup_logging
+from .page_store import PAGE_STORES, PackedPageStore, PageRef, open_page_store, read_page
+from .template_scanner import iter_template_calls
+
+CENSUS_PATH = Path("reports/template_census.json")
+CHUNK_SIZE = 64
+MAX_EXAMPLES = 3
+# A template is match-like when most calls name both opponents.
+TEAM_KEY_PAIRS = list(zip(TEAM_KEYS[0::2], TEAM_KEYS[1::2]))
+MATCH_LIKE_SHARE = 0.5
+
+# name -> [calls, pages, param key counts, example titles]
+Census = dict[str, list[Any]]
+
+
+logger = logging.getLogger(__name__)
+
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Debug template usage in a wikitext file.")
-    parser.add_argument("--input", type=Path, required=True, help="Path to .wikitext file")
+    parser = argparse.ArgumentParser(description="Debug template usage in a wikitext file or the page store.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", type=Path, help="Path to .wikitext file")
+    source.add_argument("--corpus", action="store_true", help="Scan every stored page and write a census")
     parser.add_argument("--top", type=int, default=20, help="Show top N templates")
+    parser.add_argument("--page_store", choices=PAGE_STORES, default=None, help="Page store to scan with --corpus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel scan processes")
+    parser.add_argument("--output", type=Path, default=CENSUS_PATH, help="Census JSON path for --corpus")
     return parser.parse_args()
 
 
+def census_pages(pages: list[tuple[str, str | PageRef]]) -> Census:
+    """Count template calls and param keys for (title, path or ref) pages (worker entry point)."""
+    census: Census = {}
+    for title, source in pages:
+        text = read_page(source) if isinstance(source, PageRef) else Path(source).read_text(encoding="utf-8")
+        seen: set[str] = set()
+        for name, keys in iter_template_calls(text):
+            entry = census.get(name)
+            if entry is None:
+                entry = census[name] = [0, 0, Counter(), []]
+            entry[0] += 1
+            entry[2].update(keys)
+            seen.add(name)
+        for name in seen:
+            entry = census[name]
+            entry[1] += 1
+            if len(entry[3]) < MAX_EXAMPLES:
+                entry[3].append(title)
+    return census
+
+
+def merge_census(target: Census, part: Census) -> None:
+    for name, (calls, pages, params, examples) in part.items():
+        entry = target.get(name)
+        if entry is None:
+            target[name] = [calls, pages, params, examples]
+            continue
+        entry[0] += calls
+        entry[1] += pages
+        entry[2].update(params)
+        entry[3].extend(examples[: MAX_EXAMPLES - len(entry[3])])
+
+
+def is_match_like(calls: int, params: Counter) -> bool:
+    both = max(min(params[first], params[second]) for first, second in TEAM_KEY_PAIRS)
+    return both >= calls * MATCH_LIKE_SHARE
+
+
+def run_census(pages: Iterable[tuple[str, str | PageRef]], workers: int = 1) -> Census:
+    """Scan pages in chunks, in parallel with ``workers`` > 1, and merge the counts."""
+    pages = list(pages)
+    chunks = [pages[start : start + CHUNK_SIZE] for start in range(0, len(pages), CHUNK_SIZE)]
+    census: Census = {}
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(census_pages, chunks):
+                merge_census(census, part)
+    else:
+        for chunk in chunks:
+            merge_census(census, census_pages(chunk))
+    return census
+
+
+def census_report(census: Census, pages: int, match_templates: list[str] | None = None) -> dict[str, Any]:
+    """Census as JSON, with match-like templates missing from the config flagged."""
+    known = set(match_templates or DEFAULT_MATCH_TEMPLATES) | set(MAP_TEMPLATES)
+    templates = {
+        name: {"calls": calls, "pages": page_count, "params": dict(params.most_common()), "examples": examples}
+        for name, (calls, page_count, params, examples) in sorted(census.items(), key=lambda item: -item[1][0])
+    }
+    unconfigured = [
+        {"name": name, "calls": entry["calls"], "pages": entry["pages"], "examples": entry["examples"]}
+        for name, entry in templates.items()
+        if name not in known and is_match_like(entry["calls"], census[name][2])
+    ]
+    return {"pages": pages, "unconfigured_match_templates": unconfigured, "templates": templates}
+
+
+def _stored_pages(kind: str | None) -> list[tuple[str, str | PageRef]]:
+    store = open_page_store(kind)
+    try:
+        if isinstance(store, PackedPageStore):
+            return list(store.refs().items())
+        return [(path.stem, str(path)) for path in sorted(store.directory.glob("*.wikitext"))]
+    finally:
+        store.close()
+
+
 def main() -> None:
     args = parse_args()
+    if args.corpus:
+        setup_logging()
+        pages = _stored_pages(args.page_store)
+        report = census_report(run_census(pages, args.workers), len(pages))
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info("Scanned %s pages; saved census to %s", len(pages), args.output)
+        for name, entry in list(report["templates"].items())[: args.top]:
+            print(f"{name}: {entry['calls']}")
+        for entry in report["unconfigured_match_templates"]:
+            logger.warning(
+                "Match-like template %s is not configured: %s calls on %s pages, e.g. %s",
+                entry["name"],
+                entry["calls"],
+                entry["pages"],
+                ", ".join(entry["examples"]),
+            )
+        return
+
     text = args.input.read_text(encoding="utf-8")
     parsed = mwparserfromhell.parse(text)
     counts = Counter()
@@ -5,69 +5,191 @@ from __future__ import annotations
 import argparse
 import json
 import logging
-import re
 from pathlib import Path
 
+import requests
+
 from .client import LiquipediaClient
+from .jobs import JOBS_PATH, JobManifest, in_shard, parse_shard
 from .logging_utils import setup_logging
-from .mediawiki import get_wikitext
+from .mediawiki import MAX_TITLES_PER_REQUEST, get_page_info, get_revisions
+from .metrics import METRICS, METRICS_PATH, profiled
+from .page_manifest import is_stale, load_manifest, manifest_path, save_manifest
+from .page_store import PAGE_STORES, PackedPageStore, PageStore, open_page_store, safe_title
 
 
 logger = logging.getLogger(__name__)
 
 
-def safe_title(title: str) -> str:
-    safe = re.sub(r"[^A-Za-z0-9_\-]+", "_", title.strip())
-    return safe.strip("_") or "untitled"
-
-
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Download tournament wikitext pages.")
     parser.add_argument("--input", type=Path, required=True, help="Path to tournaments.jsonl")
     parser.add_argument("--max_pages", type=int, default=None, help="Max pages to download")
     parser.add_argument("--force", action="store_true", help="Re-download even if file exists")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Check current revisions and re-download only pages that changed",
+    )
     parser.add_argument("--log_every", type=int, default=5, help="Log every N pages")
     parser.add_argument("--debug", action="store_true", help="Store debug metadata")
-    return parser.parse_args()
-
-
-def main() -> None:
-    args = parse_args()
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Only handle shard i of n (i/n)")
+    parser.add_argument(
+        "--jobs",
+        type=Path,
+        default=None,
+        help=f"Job manifest for resumable, lease-based claiming (e.g. {JOBS_PATH})",
+    )
+    parser.add_argument("--lease_seconds", type=float, default=900.0, help="Job lease duration")
+    parser.add_argument(
+        "--page_store",
+        choices=PAGE_STORES,
+        default=None,
+        help="files: one file per page; packed: deduplicated shard corpus (default: $LIQUIPEDIA_PAGE_STORE or files)",
+    )
+    parser.add_argument("--metrics", type=Path, default=METRICS_PATH, help="Pipeline metrics JSON path")
+    parser.add_argument("--profile", type=Path, default=None, help="Write cProfile stats to this path")
+    args = parser.parse_args(argv)
+    if args.refresh and args.jobs is not None:
+        # Claims only hand out pending and failed titles, so fetched pages would never be revisited.
+        parser.error("--refresh cannot be combined with --jobs")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     setup_logging()
-    client = LiquipediaClient()
+    try:
+        with profiled(args.profile), METRICS.timer("download.total"):
+            run(args)
+    finally:
+        METRICS.write(args.metrics, {"command": "download_pages"})
+
+
+def _write_page(store: PageStore, debug_dir: Path | None, title: str, revision: dict) -> None:
+    wikitext = revision["wikitext"]
+    store.put(title, wikitext, pageid=revision["pageid"], revid=revision["lastrevid"])
+    if debug_dir is not None:
+        metadata = {
+            "title": title,
+            "store": str(store.directory),
+            "length": len(wikitext),
+        }
+        debug_path = debug_dir / f"{safe_title(title)}.json"
+        debug_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _fetch(args: argparse.Namespace, client: LiquipediaClient, store: PageStore, titles: list[str]) -> dict:
+    """Fetch a batch of titles; ``--force`` and ``--refresh`` bypass the response cache."""
+    # The packed corpus already holds every fetched page once, so the
+    # per-page response cache would only duplicate it on disk.
+    keep_responses = not isinstance(store, PackedPageStore)
+    return get_revisions(client, titles, use_cache=not (args.force or args.refresh), store_responses=keep_responses)
+
+
+def _record(manifest: dict[str, dict], title: str, revision: dict) -> None:
+    """Remember the revision a stored page was taken from, for later ``--refresh`` runs."""
+    if revision["lastrevid"] is not None:
+        manifest[title] = {key: revision[key] for key in ("pageid", "lastrevid", "touched")}
+
+
+def _run_jobs(args: argparse.Namespace, client: LiquipediaClient, store: PageStore, debug_dir: Path) -> None:
+    """Claim pending titles of this shard from the job manifest and fetch them."""
+    jobs = JobManifest(args.jobs, lease_seconds=args.lease_seconds)
+    manifest_file = manifest_path(store.directory)
+    with args.input.open("r", encoding="utf-8") as handle:
+        added = jobs.sync(json.loads(line) for line in handle)
+    logger.info("Added %s new jobs to %s", added, args.jobs)
 
-    pages_dir = Path("data/raw/liquipedia/pages")
-    pages_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    while args.max_pages is None or count < args.max_pages:
+        limit = MAX_TITLES_PER_REQUEST
+        if args.max_pages is not None:
+            limit = min(limit, args.max_pages - count)
+        claimed = [job["title"] for job in jobs.claim(args.shard, limit=limit)]
+        if not claimed:
+            break
+        try:
+            revisions = _fetch(args, client, store, claimed)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            logger.warning("Batch of %s titles failed: %s", len(claimed), exc)
+            jobs.mark(claimed, "failed", error=repr(exc))
+            continue
+        with store.batch():
+            for title in claimed:
+                if title in revisions:
+                    _write_page(store, debug_dir if args.debug else None, title, revisions[title])
+        # Re-read right before saving, since other workers update the same manifest.
+        manifest = load_manifest(manifest_file)
+        for title in claimed:
+            if title in revisions:
+                _record(manifest, title, revisions[title])
+        save_manifest(manifest_file, manifest)
+        jobs.mark([title for title in claimed if title in revisions], "fetched")
+        jobs.mark([title for title in claimed if title not in revisions], "failed", error="No page returned")
+        count += sum(title in revisions for title in claimed)
+        logger.info("Downloaded %s pages; shard status %s", count, jobs.counts(args.shard))
+
+    logger.info("Finished. Downloaded %s pages; shard status %s", count, jobs.counts(args.shard))
+    jobs.close()
+
+
+def run(args: argparse.Namespace, client: LiquipediaClient | None = None) -> None:
+    """Download pages for parsed command-line arguments."""
+    client = client or LiquipediaClient()
+
+    store = open_page_store(args.page_store)
     debug_dir = Path("data/raw/liquipedia/_debug/pages")
     if args.debug:
         debug_dir.mkdir(parents=True, exist_ok=True)
 
-    count = 0
+    try:
+        if args.jobs is not None:
+            _run_jobs(args, client, store, debug_dir)
+        else:
+            _download(args, client, store, debug_dir)
+    finally:
+        store.close()
+
+
+def _download(args: argparse.Namespace, client: LiquipediaClient, store: PageStore, debug_dir: Path) -> None:
+    titles: list[str] = []
     with args.input.open("r", encoding="utf-8") as handle:
         for line in handle:
-            if args.max_pages is not None and count >= args.max_pages:
+            if args.max_pages is not None and len(titles) >= args.max_pages:
                 break
             record = json.loads(line)
             title = record.get("title")
-            if not title:
+            if not title or not in_shard(title, args.shard):
                 continue
-            filename = pages_dir / f"{safe_title(title)}.wikitext"
-            if filename.exists() and not args.force:
+            titles.append(title)
+
+    manifest_file = manifest_path(store.directory)
+    manifest = load_manifest(manifest_file)
+    if args.refresh:
+        current = get_page_info(client, titles)
+        pending = [
+            title
+            for title in titles
+            if title in current and (is_stale(manifest.get(title), current[title]) or not store.has(title))
+        ]
+        logger.info("%s of %s pages changed since last download", len(pending), len(titles))
+    else:
+        pending = [title for title in titles if args.force or not store.has(title)]
+    count = len(titles) - len(pending)
+    for start in range(0, len(pending), MAX_TITLES_PER_REQUEST):
+        batch = pending[start : start + MAX_TITLES_PER_REQUEST]
+        revisions = _fetch(args, client, store, batch)
+        with store.batch():
+            for title in batch:
+                if title not in revisions:
+                    continue
+                _write_page(store, debug_dir if args.debug else None, title, revisions[title])
+                _record(manifest, title, revisions[title])
                 count += 1
-                continue
-            wikitext = get_wikitext(client, title)
-            filename.write_text(wikitext, encoding="utf-8")
-            if args.debug:
-                metadata = {
-                    "title": title,
-                    "path": str(filename),
-                    "length": len(wikitext),
-                }
-                debug_path = debug_dir / f"{safe_title(title)}.json"
-                debug_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
-            count += 1
-            if count % args.log_every == 0:
-                logger.info("Downloaded %s pages", count)
+                if count % args.log_every == 0:
+                    logger.info("Downloaded %s pages", count)
+        save_manifest(manifest_file, manifest)
 
     logger.info("Finished. Downloaded %s pages", count)
 
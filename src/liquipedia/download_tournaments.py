@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
+import os
 from pathlib import Path
 
 from .client import LiquipediaClient
@@ -13,12 +15,26 @@ from .mediawiki import iter_category_members
 TIER_CATEGORIES = {
     "S": "S-Tier_Tournaments",
     "A": "A-Tier_Tournaments",
+    "B": "B-Tier_Tournaments",
+    "C": "C-Tier_Tournaments",
+    "Qualifier": "Qualifier_Tournaments",
 }
 
+DISCOVERY_STATE_PATH = Path("data/raw/liquipedia/discovery_state.json")
 
-def parse_args() -> argparse.Namespace:
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Download tournaments from Liquipedia.")
-    parser.add_argument("--tiers", nargs="+", default=["S", "A"], help="Tournament tiers to fetch.")
+    parser.add_argument(
+        "--tiers",
+        nargs="+",
+        default=["S", "A"],
+        choices=list(TIER_CATEGORIES),
+        help="Tournament tiers to fetch.",
+    )
     parser.add_argument("--limit", type=int, default=50, help="Max entries per API call.")
     parser.add_argument("--debug", action="store_true", help="Store example API responses.")
     parser.add_argument(
@@ -27,15 +43,105 @@ def parse_args() -> argparse.Namespace:
         default=Path("data/raw/liquipedia/tournaments.jsonl"),
         help="Output JSONL path.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch members added since the last run and append them to the output.",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=DISCOVERY_STATE_PATH,
+        help="Per-category high-water marks for --incremental.",
+    )
+    return parser.parse_args(argv)
+
+
+def load_state(path: Path) -> dict[str, str]:
+    """Load the category -> last seen member timestamp map."""
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
 
 
-def main() -> None:
-    args = parse_args()
+def save_state(path: Path, state: dict[str, str]) -> None:
+    """Atomically write the high-water marks."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def known_titles(path: Path) -> set[str]:
+    """Titles already listed in a tournaments JSONL."""
+    if not path.exists():
+        return set()
+    with path.open("r", encoding="utf-8") as handle:
+        return {json.loads(line).get("title") for line in handle if line.strip()}
+
+
+def discover(
+    client: LiquipediaClient,
+    tiers: list[str],
+    output: Path,
+    state_path: Path,
+    limit: int = 50,
+    debug_dir: str | None = None,
+) -> int:
+    """Append members added to the tier categories since the last run; return how many.
+
+    The high-water mark is the newest ``timestamp`` seen per category. Since
+    ``cmstart`` is inclusive, members at exactly that timestamp come back
+    and are skipped as already known.
+    """
+    state = load_state(state_path)
+    known = known_titles(output)
+    added = 0
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a", encoding="utf-8") as handle:
+        for tier in tiers:
+            category = TIER_CATEGORIES[tier]
+            members = iter_category_members(
+                client,
+                category,
+                cmlimit=limit,
+                debug_dir=debug_dir,
+                start=state.get(category, ""),
+                use_cache=False,
+            )
+            for member in members:
+                state[category] = max(state.get(category, ""), member.get("timestamp", ""))
+                title = member.get("title")
+                if not title or title in known:
+                    continue
+                record = {"title": title, "pageid": member.get("pageid"), "tier": tier}
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+                known.add(title)
+                added += 1
+            handle.flush()
+            save_state(state_path, state)
+            logger.info("%s: high-water mark %s", category, state.get(category) or "-")
+    return added
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     setup_logging()
-    client = LiquipediaClient()
+    run(args)
+
+
+def run(args: argparse.Namespace, client: LiquipediaClient | None = None) -> None:
+    """Download tournaments for parsed command-line arguments."""
+    client = client or LiquipediaClient()
     debug_dir = "data/raw/liquipedia/_debug" if args.debug else None
 
+    if args.incremental:
+        added = discover(client, args.tiers, args.output, args.state, args.limit, debug_dir)
+        logger.info("Added %s new tournaments to %s", added, args.output)
+        return
+
     args.output.parent.mkdir(parents=True, exist_ok=True)
     with args.output.open("w", encoding="utf-8") as handle:
         for tier in args.tiers:
@@ -2,17 +2,38 @@
 
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
-from typing import Any
+import re
+from typing import Any, Iterator
 
 import mwparserfromhell
-from dateutil import parser as date_parser
 
-from .config import DEFAULT_MATCH_TEMPLATES
+from .config import DEFAULT_MATCH_TEMPLATES, PROVENANCE_MODES
+from .dates import parse_datetime_utc
+from .metrics import METRICS
+from .template_scanner import find_template_spans
+
+Template = mwparserfromhell.nodes.Template
 
 TEAM_KEYS = ["team1", "team2", "opponent1", "opponent2", "team1name", "team2name"]
 SCORE_KEYS = ["score1", "score2", "team1score", "team2score", "score", "score2"]
+MATCH_FIELDS = [
+    "tournament_page",
+    "tournament_tier",
+    "team1",
+    "team2",
+    "score1",
+    "score2",
+    "best_of",
+    "winner",
+    "start_time_utc",
+    "stage",
+    "match_format",
+    "map_list",
+    "source_template",
+]
+MAP_TEMPLATES = ("Map", "MatchMap")
+MAP_FIELDS = ["map_index", "map_name", "score1", "score2", "winner", "picked_by", "team1_side"]
+_MAP_PARAM_RE = re.compile(r"map(\d+)$")
 
 
 def _get_param(template: mwparserfromhell.wikicode.Template, key: str) -> str | None:
@@ -41,22 +62,6 @@ def _parse_int(value: str | None) -> int | None:
         return None
 
 
-def _parse_datetime(date_str: str | None, time_str: str | None) -> str | None:
-    if not date_str and not time_str:
-        return None
-    if date_str and time_str:
-        combined = f"{date_str} {time_str}"
-    else:
-        combined = date_str or time_str
-    try:
-        parsed = date_parser.parse(combined)
-        if parsed.tzinfo is None:
-            parsed = parsed.replace(tzinfo=timezone.utc)
-        return parsed.astimezone(timezone.utc).isoformat()
-    except (ValueError, TypeError):
-        return None
-
-
 def _winner(score1: int | None, score2: int | None) -> str | None:
     if score1 is None or score2 is None:
         return None
@@ -67,55 +72,158 @@ def _winner(score1: int | None, score2: int | None) -> str | None:
     return None
 
 
+def _side_winner(value: str | None) -> str | None:
+    if value in ("1", "2"):
+        return f"team{value}"
+    return None
+
+
+def _nested_map_templates(template: Template) -> Iterator[Template]:
+    """``{{Map}}``/``{{MatchMap}}`` templates given directly as ``mapN`` values."""
+    for param in template.params:
+        if _MAP_PARAM_RE.match(str(param.name).strip()):
+            for inner in param.value.filter_templates(recursive=False):
+                if str(inner.name).strip() in MAP_TEMPLATES:
+                    yield inner
+
+
+def _wraps_matches(template: Template, templates: list[str]) -> bool:
+    """Whether any param value is itself a (non-map) match template."""
+    return any(
+        str(inner.name).strip() in templates and str(inner.name).strip() not in MAP_TEMPLATES
+        for param in template.params
+        for inner in param.value.filter_templates(recursive=False)
+    )
+
+
+def _map_rows(template: Template) -> list[list[Any]]:
+    """Per-map rows (in ``MAP_FIELDS`` order) from a match template's ``mapN`` params.
+
+    Handles nested ``{{Map|...}}``/``{{MatchMap|...}}`` values as well as the
+    legacy ``mapN=<name>`` + ``mapNwin=<1|2>`` form, falling back to the names
+    in ``maplist``. Unplayed maps are skipped.
+    """
+    rows = []
+    for param in template.params:
+        match = _MAP_PARAM_RE.match(str(param.name).strip())
+        if match is None:
+            continue
+        index = int(match.group(1))
+        nested = [t for t in param.value.filter_templates(recursive=False) if str(t.name).strip() in MAP_TEMPLATES]
+        if nested:
+            inner = nested[0]
+            if _get_param(inner, "finished") == "skip":
+                continue
+            name = _first_param(inner, ["map", "name"])
+            score1 = _parse_int(_first_param(inner, ["score1", "team1score"]))
+            score2 = _parse_int(_first_param(inner, ["score2", "team2score"]))
+            winner = _side_winner(_get_param(inner, "winner")) or _winner(score1, score2)
+            picked_by = _side_winner(_first_param(inner, ["pick", "picked_by", "mappick"]))
+            team1_side = _first_param(inner, ["t1firstside", "team1side", "t1side"])
+        else:
+            name = str(param.value).strip()
+            score1 = _parse_int(_get_param(template, f"map{index}score1"))
+            score2 = _parse_int(_get_param(template, f"map{index}score2"))
+            winner = _side_winner(_get_param(template, f"map{index}win")) or _winner(score1, score2)
+            picked_by = _side_winner(_get_param(template, f"map{index}pick"))
+            team1_side = None
+        if not name:
+            continue
+        rows.append([index, name, score1, score2, winner, picked_by, team1_side.lower() if team1_side else None])
+    if not rows:
+        maplist = _get_param(template, "maplist")
+        names = [name.strip() for name in maplist.split(",")] if maplist else []
+        rows = [[index, name, None, None, None, None, None] for index, name in enumerate(names, start=1) if name]
+    return rows
+
+
+def _iter_templates(wikitext: str, templates: list[str], prefilter: bool) -> Iterator[Any]:
+    """Yield templates in document order, parsing only candidate spans if possible."""
+    spans = find_template_spans(wikitext, tuple(templates)) if prefilter else None
+    if spans is not None:
+        if not spans:
+            METRICS.incr("extract.pages_without_candidates")
+            return
+        fragments = [mwparserfromhell.parse(wikitext[start:end]) for start, end in spans]
+        if all(len(fragment.nodes) == 1 and isinstance(fragment.nodes[0], Template) for fragment in fragments):
+            METRICS.incr("extract.prefiltered_spans", len(spans))
+            for fragment in fragments:
+                yield from fragment.filter_templates(recursive=True)
+            return
+    METRICS.incr("extract.full_parses")
+    yield from mwparserfromhell.parse(wikitext).filter_templates(recursive=True)
+
+
 def extract_matches_from_wikitext(
     wikitext: str,
     tournament_title: str,
     tier: str,
     match_templates: list[str] | None = None,
+    prefilter: bool = True,
+    provenance: str = "compact",
 ) -> list[dict[str, Any]]:
-    """Extract matches from wikitext using configured templates."""
+    """Extract matches from wikitext using configured templates.
+
+    With ``prefilter`` (the default) only the spans of candidate templates are
+    handed to mwparserfromhell; the output is the same as a full-page parse.
+
+    ``provenance`` controls how the source template is recorded: ``off``
+    leaves ``source_template`` empty, ``compact`` stores the template name and
+    ``full`` also adds the raw params as ``source_params`` key/value pairs.
+
+    Each match carries its per-map rows under ``maps`` (see ``MAP_FIELDS``),
+    taken from the same parse.
+    """
+    if provenance not in PROVENANCE_MODES:
+        raise ValueError(f"Unsupported provenance mode: {provenance}")
     templates = match_templates or DEFAULT_MATCH_TEMPLATES
-    parsed = mwparserfromhell.parse(wikitext)
     matches: list[dict[str, Any]] = []
+    METRICS.incr("extract.pages")
+    METRICS.incr("extract.bytes", len(wikitext))
 
-    for template in parsed.filter_templates(recursive=True):
+    # Map templates nested in a match's ``mapN`` params are its map rows, not matches of their own.
+    nested_maps: set[int] = set()
+    for template in _iter_templates(wikitext, templates, prefilter):
         name = str(template.name).strip()
-        if name not in templates:
+        if name not in templates or id(template) in nested_maps:
             continue
+        nested_maps.update(id(inner) for inner in _nested_map_templates(template))
 
         team1 = _first_param(template, ["team1", "opponent1", "team1name", "team1short"])
         team2 = _first_param(template, ["team2", "opponent2", "team2name", "team2short"])
+        if team1 is None and team2 is None and _wraps_matches(template, templates):
+            # A ``{{MatchList|M1={{Match|...}}}}``-style container; its matches are yielded on their own.
+            continue
         score1 = _parse_int(_first_param(template, ["score1", "team1score", "score"]))
         score2 = _parse_int(_first_param(template, ["score2", "team2score"]))
         best_of = _parse_int(_first_param(template, ["bestof", "bo", "best_of"]))
         date_str = _first_param(template, ["date", "match_date"])
         time_str = _first_param(template, ["time", "timezone", "match_time"])
-        start_time = _parse_datetime(date_str, time_str)
+        start_time = parse_datetime_utc(date_str, time_str)
         stage = _first_param(template, ["stage", "round", "group"]) or None
         match_format = _first_param(template, ["format", "match_format"]) or None
-        map_list = _first_param(template, ["map", "map1", "maplist", "maps"])
-
-        debug = {
-            "template": name,
-            "params": {str(param.name).strip(): str(param.value).strip() for param in template.params},
+        maps = _map_rows(template)
+        map_list = ",".join(row[1] for row in maps) or _first_param(template, ["map", "maps"])
+
+        match = {
+            "tournament_page": tournament_title,
+            "tournament_tier": tier,
+            "team1": team1,
+            "team2": team2,
+            "score1": score1,
+            "score2": score2,
+            "best_of": best_of,
+            "winner": _winner(score1, score2),
+            "start_time_utc": start_time,
+            "stage": stage,
+            "match_format": match_format,
+            "map_list": map_list,
+            "source_template": None if provenance == "off" else name,
+            "maps": maps,
         }
+        if provenance == "full":
+            match["source_params"] = [[str(param.name).strip(), str(param.value).strip()] for param in template.params]
+        matches.append(match)
 
-        matches.append(
-            {
-                "tournament_page": tournament_title,
-                "tournament_tier": tier,
-                "team1": team1,
-                "team2": team2,
-                "score1": score1,
-                "score2": score2,
-                "best_of": best_of,
-                "winner": _winner(score1, score2),
-                "start_time_utc": start_time,
-                "stage": stage,
-                "match_format": match_format,
-                "map_list": map_list,
-                "source_fields": json.dumps(debug, ensure_ascii=False),
-            }
-        )
-
+    METRICS.incr("extract.matches", len(matches))
     return matches
@@ -0,0 +1,89 @@
+"""Persistent cache of extracted match rows keyed by page content."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any
+
+from .config import DEFAULT_MATCH_TEMPLATES
+
+EXTRACTION_CACHE_PATH = Path("data/processed/extraction_cache.sqlite")
+FINGERPRINT_MODULES = ["extract_matches.py", "template_scanner.py", "dates.py", "config.py"]
+PAGE_FIELDS = ("tournament_page", "tournament_tier")
+
+
+def extractor_fingerprint(match_templates: list[str] | None = None, provenance: str = "compact") -> str:
+    """Hash the extraction source files, the configured template list and provenance mode."""
+    digest = hashlib.sha1()
+    package_dir = Path(__file__).parent
+    for name in FINGERPRINT_MODULES:
+        digest.update(name.encode("utf-8"))
+        digest.update((package_dir / name).read_bytes())
+    digest.update("\n".join(match_templates or DEFAULT_MATCH_TEMPLATES).encode("utf-8"))
+    digest.update(provenance.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def content_hash(wikitext: str) -> str:
+    """Hash page wikitext."""
+    return hashlib.sha1(wikitext.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite store of extracted rows keyed by (content hash, extractor fingerprint).
+
+    Page-level fields (title, tier) are not stored, so a cached page can be
+    reused if it is listed under another title or tier.
+    """
+
+    def __init__(self, path: Path = EXTRACTION_CACHE_PATH, fingerprint: str | None = None) -> None:
+        self.path = path
+        self.fingerprint = fingerprint or extractor_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "content_hash TEXT NOT NULL, fingerprint TEXT NOT NULL, rows BLOB NOT NULL, "
+            "PRIMARY KEY (content_hash, fingerprint))"
+        )
+
+    def get(self, key: str, title: str, tier: Any) -> list[dict[str, Any]] | None:
+        """Return cached matches for a page, with title and tier filled in."""
+        row = self._conn.execute(
+            "SELECT rows FROM extractions WHERE content_hash = ? AND fingerprint = ?",
+            (key, self.fingerprint),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [
+            {"tournament_page": title, "tournament_tier": tier, **match}
+            for match in json.loads(zlib.decompress(row[0]))
+        ]
+
+    def put(self, key: str, matches: list[dict[str, Any]]) -> None:
+        """Store matches for a page."""
+        stripped = [{k: v for k, v in match.items() if k not in PAGE_FIELDS} for match in matches]
+        blob = zlib.compress(json.dumps(stripped, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (content_hash, fingerprint, rows) VALUES (?, ?, ?)",
+            (key, self.fingerprint, blob),
+        )
+
+    def prune(self) -> int:
+        """Delete entries produced by other extractor versions."""
+        cursor = self._conn.execute("DELETE FROM extractions WHERE fingerprint != ?", (self.fingerprint,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
@@ -0,0 +1,219 @@
+"""Ingest pages from a MediaWiki XML export into the local page store."""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .download_tournaments import TIER_CATEGORIES, known_titles
+from .logging_utils import setup_logging
+from .metrics import METRICS, METRICS_PATH
+from .page_manifest import load_manifest, manifest_path, save_manifest
+from .page_store import PAGE_STORES, PAGES_DIR, FilePageStore, PageStore, open_page_store
+
+# Liquipedia assigns tier categories through the infobox rather than explicit links.
+INFOBOX_TIERS = {"1": "S", "2": "A", "3": "B", "4": "C"}
+
+_CATEGORY_RE = re.compile(r"\[\[\s*Category\s*:\s*([^\]|]+?)\s*(?:\|[^\]]*)?\]\]", re.IGNORECASE)
+_TIER_RE = re.compile(r"\|\s*liquipediatier\s*=\s*(\w+)")
+_TIER_TYPE_RE = re.compile(r"\|\s*liquipediatiertype\s*=\s*(\w+)")
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest a MediaWiki XML dump into the page store.")
+    parser.add_argument("--dump", type=Path, required=True, help="XML export (.xml, .xml.bz2 or .xml.gz)")
+    parser.add_argument("--input", type=Path, default=None, help="Only ingest titles listed in this tournaments.jsonl")
+    parser.add_argument(
+        "--category",
+        nargs="+",
+        default=None,
+        help="Only ingest pages in these categories (e.g. S-Tier_Tournaments)",
+    )
+    parser.add_argument("--records", type=Path, default=None, help="Append ingested titles to this JSONL")
+    parser.add_argument("--page_store", choices=PAGE_STORES, default=None, help="Page store to write into")
+    parser.add_argument("--pages_dir", type=Path, default=None, help="Page store directory (default per store kind)")
+    parser.add_argument("--namespace", type=int, default=0, help="Only ingest pages in this namespace")
+    parser.add_argument("--max_pages", type=int, default=None, help="Stop after N ingested pages")
+    parser.add_argument("--force", action="store_true", help="Overwrite pages that are already stored")
+    parser.add_argument("--metrics", type=Path, default=METRICS_PATH, help="Pipeline metrics JSON path")
+    return parser.parse_args()
+
+
+def open_dump(path: Path) -> IO[bytes]:
+    """Open a dump file, decompressing .bz2 and .gz transparently."""
+    if path.suffix == ".bz2":
+        return bz2.open(path, "rb")
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_dump_pages(handle: IO[bytes]) -> Iterator[dict[str, Any]]:
+    """Stream pages from an export, yielding title, ns, ids, timestamp and text.
+
+    Each ``<page>`` element is discarded after it is read, so memory stays
+    flat however large the dump is. With several revisions per page the last
+    one wins.
+    """
+    context = ET.iterparse(handle, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or _local(elem.tag) != "page":
+            continue
+        page: dict[str, Any] = {"redirect": False, "text": "", "revid": None, "timestamp": None}
+        for child in elem:
+            tag = _local(child.tag)
+            if tag == "title":
+                page["title"] = child.text or ""
+            elif tag == "ns":
+                page["ns"] = int(child.text or 0)
+            elif tag == "id":
+                page["pageid"] = int(child.text or 0)
+            elif tag == "redirect":
+                page["redirect"] = True
+            elif tag == "revision":
+                for field in child:
+                    name = _local(field.tag)
+                    if name == "id":
+                        page["revid"] = int(field.text or 0)
+                    elif name == "timestamp":
+                        page["timestamp"] = field.text
+                    elif name == "text":
+                        page["text"] = field.text or ""
+        root.clear()
+        yield page
+
+
+def _normalize(title: str) -> str:
+    return title.replace("_", " ").strip()
+
+
+def page_tier(wikitext: str) -> str | None:
+    """Tier of a tournament page from its infobox, in ``TIER_CATEGORIES`` terms."""
+    tier_type = _TIER_TYPE_RE.search(wikitext)
+    if tier_type and tier_type.group(1).lower() == "qualifier":
+        return "Qualifier"
+    tier = _TIER_RE.search(wikitext)
+    return INFOBOX_TIERS.get(tier.group(1)) if tier else None
+
+
+def page_categories(wikitext: str) -> set[str]:
+    """Explicit category links plus the tier category implied by the infobox."""
+    categories = {_normalize(name) for name in _CATEGORY_RE.findall(wikitext)}
+    tier = page_tier(wikitext)
+    if tier is not None:
+        categories.add(_normalize(TIER_CATEGORIES[tier]))
+    return categories
+
+
+def ingest_dump(
+    dump: Path,
+    pages_dir: Path = PAGES_DIR,
+    titles: set[str] | None = None,
+    categories: list[str] | None = None,
+    namespace: int = 0,
+    max_pages: int | None = None,
+    force: bool = False,
+    store: PageStore | None = None,
+) -> list[dict[str, Any]]:
+    """Write matching pages into ``store`` (files in ``pages_dir`` by default) and return their records.
+
+    Pages are recorded in the page manifest with their revision id, so a
+    later ``download_pages --refresh`` only fetches pages edited after the
+    dump was taken.
+    """
+    wanted_titles = None if titles is None else {_normalize(title) for title in titles}
+    wanted_categories = None if categories is None else {_normalize(name) for name in categories}
+    store = store or FilePageStore(pages_dir)
+    manifest_file = manifest_path(store.directory)
+    manifest = load_manifest(manifest_file)
+    records: list[dict[str, Any]] = []
+    try:
+        with open_dump(dump) as handle, store.batch():
+            for page in iter_dump_pages(handle):
+                METRICS.incr("ingest.pages_scanned")
+                if page.get("ns", 0) != namespace or page["redirect"]:
+                    continue
+                title = _normalize(page.get("title", ""))
+                if wanted_titles is not None and title not in wanted_titles:
+                    continue
+                if wanted_categories is not None and not wanted_categories & page_categories(page["text"]):
+                    continue
+                # Existing pages keep their manifest entry, so ``--refresh`` still sees their own revision.
+                if force or not store.has(title):
+                    store.put(title, page["text"], pageid=page.get("pageid"), revid=page["revid"])
+                    METRICS.incr("ingest.bytes", len(page["text"]))
+                    manifest[title] = {
+                        "pageid": page.get("pageid"),
+                        "lastrevid": page["revid"],
+                        "touched": page["timestamp"],
+                    }
+                records.append({"title": title, "pageid": page.get("pageid"), "tier": page_tier(page["text"])})
+                if len(records) % 1000 == 0:
+                    logger.info("Ingested %s pages", len(records))
+                if max_pages is not None and len(records) >= max_pages:
+                    break
+    finally:
+        save_manifest(manifest_file, manifest)
+    METRICS.incr("ingest.pages", len(records))
+    return records
+
+
+def _append_records(path: Path, records: list[dict[str, Any]]) -> int:
+    known = known_titles(path)
+    added = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        for record in records:
+            if record["title"] in known:
+                continue
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            known.add(record["title"])
+            added += 1
+    return added
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    titles = None
+    if args.input is not None:
+        with args.input.open("r", encoding="utf-8") as handle:
+            titles = {json.loads(line)["title"] for line in handle if line.strip()}
+    store = open_page_store(args.page_store, args.pages_dir)
+    try:
+        with METRICS.timer("ingest.total"):
+            records = ingest_dump(
+                args.dump,
+                titles=titles,
+                categories=args.category,
+                namespace=args.namespace,
+                max_pages=args.max_pages,
+                force=args.force,
+                store=store,
+            )
+        logger.info("Ingested %s pages from %s into %s", len(records), args.dump, store.directory)
+        if args.records is not None:
+            added = _append_records(args.records, records)
+            logger.info("Added %s titles to %s", added, args.records)
+    finally:
+        store.close()
+        METRICS.write(args.metrics, {"command": "ingest_dump"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""SQLite job manifest for resumable, sharded crawls and builds."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+JOBS_PATH = Path("data/raw/liquipedia/jobs.sqlite")
+STATUSES = ("pending", "fetched", "extracted", "failed")
+
+Shard = tuple[int, int]
+
+
+def parse_shard(value: str) -> Shard:
+    """Parse an ``i/n`` shard spec (argparse type)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Shard must look like i/n, got {value!r}") from exc
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Shard index must be in [0, {count}), got {value!r}")
+    return index, count
+
+
+def shard_key(title: str) -> int:
+    """Stable 32-bit hash of a title used to assign shards."""
+    return int(hashlib.sha1(title.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def in_shard(title: str, shard: Shard) -> bool:
+    index, count = shard
+    return shard_key(title) % count == index
+
+
+def shard_suffix(shard: Shard) -> str:
+    """File name suffix for shard outputs ('' for the unsharded 0/1)."""
+    index, count = shard
+    return "" if count == 1 else f"-{index:03d}-of-{count:03d}"
+
+
+class JobManifest:
+    """Per-title job state: status, attempts, last error and a claim lease.
+
+    Several processes or hosts can share the database. ``claim`` hands out
+    titles under a time-limited lease, so work held by a crashed worker is
+    handed out again once its lease expires.
+    """
+
+    def __init__(
+        self,
+        path: Path = JOBS_PATH,
+        owner: str | None = None,
+        lease_seconds: float = 900.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "title TEXT PRIMARY KEY, pageid INTEGER, tier TEXT, position INTEGER NOT NULL, "
+            "shard_key INTEGER NOT NULL, status TEXT NOT NULL DEFAULT 'pending', "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, lease_owner TEXT, lease_expires REAL, "
+            "updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_position ON jobs (status, position)")
+
+    def sync(self, records: Iterable[dict[str, Any]]) -> int:
+        """Add titles that are not tracked yet as pending jobs; return how many."""
+        (position,) = self._conn.execute("SELECT COALESCE(MAX(position), -1) FROM jobs").fetchone()
+        rows = []
+        for record in records:
+            title = record.get("title")
+            if not title:
+                continue
+            position += 1
+            rows.append((title, record.get("pageid"), record.get("tier"), position, shard_key(title), time.time()))
+        self._conn.execute("BEGIN IMMEDIATE")
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO jobs (title, pageid, tier, position, shard_key, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        added = self._conn.total_changes - before
+        self._conn.execute("COMMIT")
+        return added
+
+    def claim(
+        self,
+        shard: Shard = (0, 1),
+        statuses: tuple[str, ...] = ("pending", "failed"),
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Lease up to ``limit`` unleased jobs of this shard in input order.
+
+        Failed jobs are only handed out again while attempts < max_attempts.
+        """
+        index, count = shard
+        now = time.time()
+        placeholders = ",".join("?" for _ in statuses)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                f"SELECT title, pageid, tier FROM jobs WHERE status IN ({placeholders}) "
+                "AND shard_key % ? = ? AND (status != 'failed' OR attempts < ?) "
+                "AND (lease_expires IS NULL OR lease_expires < ?) ORDER BY position LIMIT ?",
+                (*statuses, count, index, self.max_attempts, now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE title = ?",
+                [(self.owner, now + self.lease_seconds, now, row["title"]) for row in rows],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [dict(row) for row in rows]
+
+    def mark(self, titles: Iterable[str], status: str, error: str | None = None) -> None:
+        """Set the status of titles and release their leases."""
+        if status not in STATUSES:
+            raise ValueError(f"Unsupported job status: {status}")
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE title = ?",
+            [(status, error, now, title) for title in titles],
+        )
+        self._conn.execute("COMMIT")
+
+    def counts(self, shard: Shard = (0, 1)) -> dict[str, int]:
+        """Number of jobs per status in a shard."""
+        index, count = shard
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE shard_key % ? = ? GROUP BY status", (count, index)
+        ).fetchall()
+        return {status: 0 for status in STATUSES} | {status: total for status, total in rows}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Iterator
+import logging
+from typing import Any, Iterator
 
 from .client import LiquipediaClient
+from .metrics import METRICS
+
+
+logger = logging.getLogger(__name__)
 
 
 def iter_category_members(
@@ -12,8 +17,16 @@ def iter_category_members(
     cmtitle: str,
     cmlimit: int = 50,
     debug_dir: str | None = None,
+    start: str | None = None,
+    use_cache: bool = True,
 ) -> Iterator[dict]:
-    """Iterate over category members for a category title."""
+    """Iterate over category members for a category title.
+
+    With ``start`` (an ISO 8601 timestamp), members are listed oldest first
+    by the time they were added to the category, beginning at ``start``
+    (inclusive), and each member carries its ``timestamp``. An empty
+    ``start`` lists the whole category in that order.
+    """
     params = {
         "action": "query",
         "format": "json",
@@ -21,9 +34,19 @@ def iter_category_members(
         "cmtitle": f"Category:{cmtitle}",
         "cmlimit": cmlimit,
     }
+    if start is not None:
+        params.update(
+            {
+                "cmsort": "timestamp",
+                "cmdir": "ascending",
+                "cmprop": "ids|title|timestamp",
+            }
+        )
+        if start:
+            params["cmstart"] = start
     page_index = 1
     while True:
-        payload = client.get_json(params)
+        payload = client.get_json(params, use_cache=use_cache)
         if debug_dir:
             from pathlib import Path
             import json
@@ -42,23 +65,240 @@ def iter_category_members(
         params["cmcontinue"] = cont["cmcontinue"]
 
 
-def get_wikitext(client: LiquipediaClient, title: str) -> str:
-    """Fetch wikitext for a page title."""
-    params = {
+MAX_TITLES_PER_REQUEST = 50
+
+
+def _revisions_params(titles: list[str]) -> dict[str, Any]:
+    return {
         "action": "query",
         "format": "json",
         "prop": "revisions",
-        "rvprop": "content",
+        "rvprop": "content|ids|timestamp",
         "rvslots": "main",
-        "titles": title,
+        "redirects": 1,
+        "titles": "|".join(titles),
     }
-    payload = client.get_json(params)
-    pages = payload.get("query", {}).get("pages", {})
-    if not pages:
-        raise ValueError(f"No pages found for title: {title}")
-    page = next(iter(pages.values()))
+
+
+def _page_revision(page: dict[str, Any]) -> dict[str, Any]:
+    """Wikitext plus the ``pageid``/``lastrevid``/``touched`` of the fetched revision."""
     revisions = page.get("revisions", [])
-    if not revisions:
-        return ""
-    slot = revisions[0].get("slots", {}).get("main", {})
-    return slot.get("*") or slot.get("content", "")
+    revision = revisions[0] if revisions else {}
+    slot = revision.get("slots", {}).get("main", {})
+    return {
+        "wikitext": slot.get("*") or slot.get("content", ""),
+        "pageid": page.get("pageid"),
+        "lastrevid": revision.get("revid"),
+        "touched": revision.get("timestamp"),
+    }
+
+
+def _redirect_chain(title: str, redirects: dict[str, str]) -> list[dict[str, str]]:
+    chain: list[dict[str, str]] = []
+    seen = {title}
+    while title in redirects and redirects[title] not in seen:
+        chain.append({"from": title, "to": redirects[title]})
+        title = redirects[title]
+        seen.add(title)
+    return chain
+
+
+def _split_query(titles: list[str], query: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Split a multi-title query result into single-title query results."""
+    normalized = {item["from"]: item["to"] for item in query.get("normalized", [])}
+    redirects = {item["from"]: item["to"] for item in query.get("redirects", [])}
+    pages_by_title = {page.get("title"): (key, page) for key, page in query.get("pages", {}).items()}
+
+    results: dict[str, dict[str, Any]] = {}
+    for title in titles:
+        chain = _redirect_chain(normalized.get(title, title), redirects)
+        resolved = chain[-1]["to"] if chain else normalized.get(title, title)
+        if resolved not in pages_by_title:
+            continue
+        key, page = pages_by_title[resolved]
+        single: dict[str, Any] = {"pages": {key: page}}
+        if title in normalized:
+            single["normalized"] = [{"from": title, "to": normalized[title]}]
+        if chain:
+            single["redirects"] = chain
+        results[title] = single
+    return results
+
+
+def _fetch_revisions(client: LiquipediaClient, titles: list[str]) -> dict[str, Any]:
+    """Fetch one batch of titles, following rvcontinue until all content is in."""
+    params = _revisions_params(titles)
+    query: dict[str, Any] = {}
+    while True:
+        payload = client.get_json(params, use_cache=False)
+        chunk = payload.get("query", {})
+        for key in ("normalized", "redirects"):
+            if key in chunk and key not in query:
+                query[key] = chunk[key]
+        pages = query.setdefault("pages", {})
+        for page_key, page in chunk.get("pages", {}).items():
+            if page_key not in pages or "revisions" in page:
+                pages[page_key] = page
+        cont = payload.get("continue", {})
+        if "rvcontinue" not in cont:
+            return query
+        params = {**_revisions_params(titles), **cont}
+
+
+def get_revisions(
+    client: LiquipediaClient,
+    titles: list[str],
+    batch_size: int = MAX_TITLES_PER_REQUEST,
+    use_cache: bool = True,
+    store_responses: bool = True,
+) -> dict[str, dict[str, Any]]:
+    """Fetch the current revision of many page titles, batching up to 50 titles per request.
+
+    Each result holds the ``wikitext`` and the ``pageid``, ``lastrevid`` and
+    ``touched`` (revision timestamp) of the revision it was taken from.
+
+    Titles are resolved through the normalization and redirect maps of the
+    response, so the result is keyed by the requested titles. Missing pages have
+    an empty wikitext and no ids; titles the API does not report at all are omitted.
+    Each page is cached as its own single-title response, so later calls only
+    request titles that were never fetched. With ``use_cache=False`` every title
+    is fetched again and its cache entry is replaced. With
+    ``store_responses=False`` fetched pages are not written to the response
+    cache, for callers that keep the text in a page store anyway.
+    """
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    results: dict[str, dict[str, Any]] = {}
+    pending: list[str] = []
+    for title in unique_titles:
+        cached = client.get_cached(_revisions_params([title])) if use_cache else None
+        if cached is None:
+            pending.append(title)
+            continue
+        query = cached.get("query", {})
+        for page in query.get("pages", {}).values():
+            results[title] = _page_revision(page)
+
+    METRICS.incr("wikitext.titles", len(unique_titles))
+    METRICS.incr("wikitext.cached_titles", len(unique_titles) - len(pending))
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        METRICS.incr("wikitext.batches")
+        with METRICS.timer("wikitext.batch"):
+            query = _fetch_revisions(client, batch)
+        for title, single in _split_query(batch, query).items():
+            if store_responses:
+                client.store_cached(_revisions_params([title]), {"query": single})
+            page = next(iter(single["pages"].values()))
+            results[title] = _page_revision(page)
+        missing = [title for title in batch if title not in results]
+        if missing:
+            logger.warning("No pages returned for titles: %s", ", ".join(missing))
+
+    return results
+
+
+def get_wikitexts(
+    client: LiquipediaClient,
+    titles: list[str],
+    batch_size: int = MAX_TITLES_PER_REQUEST,
+    use_cache: bool = True,
+    store_responses: bool = True,
+) -> dict[str, str]:
+    """Fetch wikitext for many page titles; see ``get_revisions``."""
+    revisions = get_revisions(client, titles, batch_size, use_cache, store_responses)
+    return {title: revision["wikitext"] for title, revision in revisions.items()}
+
+
+def get_page_info(
+    client: LiquipediaClient,
+    titles: list[str],
+    batch_size: int = MAX_TITLES_PER_REQUEST,
+) -> dict[str, dict[str, Any]]:
+    """Fetch current revision metadata (``prop=info``) for many titles.
+
+    Responses are never cached, since the point is to see edits. Returns
+    ``pageid``, ``lastrevid`` and ``touched`` keyed by requested title;
+    missing pages are omitted.
+    """
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    results: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(unique_titles), batch_size):
+        batch = unique_titles[start : start + batch_size]
+        params = {
+            "action": "query",
+            "format": "json",
+            "prop": "info",
+            "redirects": 1,
+            "titles": "|".join(batch),
+        }
+        payload = client.get_json(params, use_cache=False)
+        for title, single in _split_query(batch, payload.get("query", {})).items():
+            page = next(iter(single["pages"].values()))
+            if "missing" in page or "invalid" in page:
+                continue
+            results[title] = {
+                "pageid": page.get("pageid"),
+                "lastrevid": page.get("lastrevid"),
+                "touched": page.get("touched"),
+            }
+    return results
+
+
+def resolve_titles(
+    client: LiquipediaClient,
+    titles: list[str],
+    batch_size: int = MAX_TITLES_PER_REQUEST,
+) -> dict[str, dict[str, Any]]:
+    """Resolve titles through normalization and redirects, 50 per request.
+
+    Returns, per requested title, the resolved page ``title``, whether it is
+    ``missing`` and the ``aliases`` (titles of redirects to the resolved page,
+    from ``prop=redirects``). Invalid titles are omitted.
+    """
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    results: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(unique_titles), batch_size):
+        batch = unique_titles[start : start + batch_size]
+        base = {
+            "action": "query",
+            "format": "json",
+            "prop": "redirects",
+            "rdprop": "title",
+            "rdlimit": "max",
+            "redirects": 1,
+            "titles": "|".join(batch),
+        }
+        params = dict(base)
+        query: dict[str, Any] = {}
+        aliases: dict[str, list[str]] = {}
+        while True:
+            METRICS.incr("resolve.batches")
+            payload = client.get_json(params, use_cache=False)
+            chunk = payload.get("query", {})
+            for key in ("normalized", "redirects", "pages"):
+                if key in chunk and key not in query:
+                    query[key] = chunk[key]
+            for page in chunk.get("pages", {}).values():
+                aliases.setdefault(page.get("title"), []).extend(item["title"] for item in page.get("redirects", []))
+            cont = payload.get("continue", {})
+            if "rdcontinue" not in cont:
+                break
+            params = {**base, **cont}
+        for title, single in _split_query(batch, query).items():
+            page = next(iter(single["pages"].values()))
+            if "invalid" in page:
+                continue
+            results[title] = {
+                "title": page.get("title"),
+                "missing": "missing" in page,
+                "aliases": aliases.get(page.get("title"), []),
+            }
+    return results
+
+
+def get_wikitext(client: LiquipediaClient, title: str) -> str:
+    """Fetch wikitext for a page title."""
+    texts = get_wikitexts(client, [title])
+    if title not in texts:
+        raise ValueError(f"No pages found for title: {title}")
+    return texts[title]
@@ -0,0 +1,87 @@
+"""Merge per-shard match files into one dataset."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .logging_utils import setup_logging
+from .parquet_writer import MAPS_SCHEMA, MATCH_PARAMS_SCHEMA, MATCHES_SCHEMA, StreamingParquetWriter
+
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIR = Path("data/processed/shards")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge shard outputs of build_dataset --shard.")
+    parser.add_argument("--inputs", type=Path, nargs="*", default=None, help="Shard Parquet files")
+    parser.add_argument("--output", type=Path, default=Path("data/processed/matches.parquet"), help="Merged output")
+    parser.add_argument(
+        "--maps_output",
+        type=Path,
+        default=Path("data/processed/maps.parquet"),
+        help="Merged per-map output (from maps-*.parquet next to each shard)",
+    )
+    parser.add_argument(
+        "--params_output",
+        type=Path,
+        default=Path("data/processed/match_params.parquet"),
+        help="Merged raw template params (from match_params-*.parquet of --provenance full builds)",
+    )
+    parser.add_argument("--row_group_size", type=int, default=50_000, help="Rows per Parquet row group")
+    return parser.parse_args()
+
+
+def merge_shards(
+    inputs: list[Path],
+    output: Path,
+    row_group_size: int = 50_000,
+    schema: pa.Schema = MATCHES_SCHEMA,
+    dedup_key: str | None = "match_id",
+) -> StreamingParquetWriter:
+    """Stream shard files into ``output``, dropping duplicate keys."""
+    with StreamingParquetWriter(output, schema, row_group_size=row_group_size, dedup_key=dedup_key) as writer:
+        for path in inputs:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=row_group_size):
+                for row in batch.to_pylist():
+                    writer.add(row)
+            logger.info("Merged %s", path)
+    return writer
+
+
+def sidecar_inputs(inputs: list[Path], prefix: str) -> list[Path]:
+    """Existing ``<prefix>-iii-of-nnn.parquet`` files next to the given matches shards."""
+    paths = [path.with_name(prefix + path.name[len("matches") :]) for path in inputs]
+    return [path for path in paths if path.exists()]
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    inputs = args.inputs or sorted(SHARDS_DIR.glob("matches-*.parquet"))
+    if not inputs:
+        raise SystemExit(f"No shard files found in {SHARDS_DIR}")
+    writer = merge_shards(inputs, args.output, args.row_group_size)
+    logger.info(
+        "Saved %s matches from %s shards to %s (%s duplicates dropped)",
+        writer.rows_written,
+        len(inputs),
+        args.output,
+        writer.duplicates_dropped,
+    )
+    sidecars = [("maps", MAPS_SCHEMA, args.maps_output), ("match_params", MATCH_PARAMS_SCHEMA, args.params_output)]
+    for prefix, schema, output in sidecars:
+        sidecar = sidecar_inputs(inputs, prefix)
+        if sidecar:
+            sidecar_writer = merge_shards(sidecar, output, args.row_group_size, schema, dedup_key=None)
+            logger.info("Saved %s %s rows to %s", sidecar_writer.rows_written, prefix, output)
+
+
+if __name__ == "__main__":
+    main()
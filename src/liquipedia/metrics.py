@@ -0,0 +1,142 @@
+"""Process-wide counters, timing histograms and slowest-item tracking."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+METRICS_PATH = Path("reports/pipeline_metrics.json")
+BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class Timer:
+    """Timing histogram with fixed buckets."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_SECONDS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for index, bound in enumerate(BUCKETS_SECONDS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"le_{bound:g}s" for bound in BUCKETS_SECONDS] + ["gt_10s"]
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 6),
+            "mean_s": round(self.total / self.count, 6) if self.count else 0.0,
+            "min_s": round(self.min, 6) if self.count else 0.0,
+            "max_s": round(self.max, 6),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, timers and top-N slowest items."""
+
+    def __init__(self, slowest_n: int = 20) -> None:
+        self.slowest_n = slowest_n
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: dict[str, float] = {}
+            self.timers: dict[str, Timer] = {}
+            self.slowest: dict[str, list[tuple[float, str]]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float, item: str | None = None) -> None:
+        """Record a duration; with item, also track it among the slowest."""
+        with self._lock:
+            self.timers.setdefault(name, Timer()).observe(seconds)
+            if item is None:
+                return
+            heap = self.slowest.setdefault(name, [])
+            if len(heap) < self.slowest_n:
+                heapq.heappush(heap, (seconds, item))
+            elif seconds > heap[0][0]:
+                heapq.heapreplace(heap, (seconds, item))
+
+    @contextmanager
+    def timer(self, name: str, item: str | None = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, item)
+
+    def drain_counters(self) -> dict[str, float]:
+        """Return and clear counters (used to ship worker counters to the parent)."""
+        with self._lock:
+            counters, self.counters = self.counters, {}
+        return counters
+
+    def merge_counters(self, counters: dict[str, float]) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            ratios = {}
+            for name, hits in self.counters.items():
+                if name.endswith(".hits"):
+                    prefix = name[: -len(".hits")]
+                    total = hits + self.counters.get(f"{prefix}.misses", 0)
+                    ratios[f"{prefix}.hit_ratio"] = round(hits / total, 4) if total else 0.0
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "ratios": dict(sorted(ratios.items())),
+                "timers": {name: timer.snapshot() for name, timer in sorted(self.timers.items())},
+                "slowest": {
+                    name: [{"item": item, "seconds": round(seconds, 6)} for seconds, item in sorted(heap, reverse=True)]
+                    for name, heap in sorted(self.slowest.items())
+                },
+            }
+
+    def write(self, path: Path = METRICS_PATH, extra: dict[str, Any] | None = None) -> None:
+        """Write a JSON snapshot, merged with extra top-level fields."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {**(extra or {}), **self.snapshot()}
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def profiled(path: Path | None) -> Iterator[None]:
+    """Run the block under cProfile and dump stats to path (no-op if None)."""
+    if path is None:
+        yield
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
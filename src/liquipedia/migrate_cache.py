@@ -0,0 +1,33 @@
+"""Import the JSON file cache into the SQLite cache backend."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from .cache import CACHE_DIR, SQLITE_CACHE_PATH, SQLiteCache
+from .logging_utils import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Migrate the JSON response cache to SQLite.")
+    parser.add_argument("--source", type=Path, default=CACHE_DIR, help="JSON cache directory")
+    parser.add_argument("--target", type=Path, default=SQLITE_CACHE_PATH, help="SQLite cache path")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    cache = SQLiteCache(args.target)
+    imported = cache.import_json_dir(args.source)
+    cache.close()
+    logger.info("Imported %s responses from %s into %s", imported, args.source, args.target)
+
+
+if __name__ == "__main__":
+    main()
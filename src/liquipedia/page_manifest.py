@@ -0,0 +1,40 @@
+"""Sidecar manifest of downloaded page revisions."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+MANIFEST_NAME = "manifest.json"
+
+
+def manifest_path(pages_dir: Path) -> Path:
+    """Return the manifest path for a pages directory."""
+    return pages_dir / MANIFEST_NAME
+
+
+def load_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    """Load the manifest, mapping page title to its stored revision info."""
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_manifest(path: Path, manifest: dict[str, dict[str, Any]]) -> None:
+    """Atomically write the manifest."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp name: job workers save the same manifest concurrently.
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_stale(entry: dict[str, Any] | None, info: dict[str, Any]) -> bool:
+    """Return True if the stored entry does not match the current revision."""
+    if entry is None:
+        return True
+    return entry.get("lastrevid") != info.get("lastrevid")
@@ -0,0 +1,300 @@
+"""Storage backends for downloaded page wikitext."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import IO, Iterator, NamedTuple, Protocol
+
+from .logging_utils import setup_logging
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+PAGES_DIR = Path("data/raw/liquipedia/pages")
+PACKED_DIR = Path("data/raw/liquipedia/corpus")
+SHARD_BYTES = 256 * 1024 * 1024
+PAGE_STORES = ("files", "packed")
+
+
+logger = logging.getLogger(__name__)
+
+
+def safe_title(title: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_\-]+", "_", title.strip())
+    return safe.strip("_") or "untitled"
+
+
+class PageRef(NamedTuple):
+    """Location of a page's UTF-8 bytes inside a packed shard."""
+
+    path: str
+    offset: int
+    length: int
+    sha1: str
+
+
+class PageStore(Protocol):
+    """Wikitext keyed by page title."""
+
+    directory: Path
+
+    def has(self, title: str) -> bool: ...
+
+    def get(self, title: str) -> str | None: ...
+
+    def put(self, title: str, wikitext: str, pageid: int | None = None, revid: int | None = None) -> None: ...
+
+    def batch(self) -> AbstractContextManager[None]: ...
+
+    def fingerprint(self) -> str: ...
+
+    def close(self) -> None: ...
+
+
+class FilePageStore:
+    """One ``<safe_title>.wikitext`` file per page (the original layout)."""
+
+    def __init__(self, directory: Path = PAGES_DIR) -> None:
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, title: str) -> Path:
+        return self.directory / f"{safe_title(title)}.wikitext"
+
+    def has(self, title: str) -> bool:
+        return self._path(title).exists()
+
+    def get(self, title: str) -> str | None:
+        path = self._path(title)
+        if not path.exists():
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def put(self, title: str, wikitext: str, pageid: int | None = None, revid: int | None = None) -> None:
+        self._path(title).write_text(wikitext, encoding="utf-8")
+
+    def batch(self) -> AbstractContextManager[None]:
+        return nullcontext()
+
+    def fingerprint(self) -> str:
+        """Digest of page file names, sizes and modification times."""
+        digest = hashlib.sha1()
+        for entry in sorted(os.scandir(self.directory), key=lambda entry: entry.name):
+            if entry.name.endswith(".wikitext"):
+                stat = entry.stat()
+                digest.update(f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def close(self) -> None:
+        pass
+
+
+_MAPS: dict[str, mmap.mmap] = {}
+
+
+def read_page(ref: PageRef) -> str:
+    """Decode a page straight from a memory-mapped shard.
+
+    Maps are opened once per process and reopened if the shard has grown
+    past the mapped size, so worker processes can read refs they are sent.
+    """
+    if not ref.length:
+        # Missing pages are stored empty, possibly in a still-empty shard that cannot be mapped.
+        return ""
+    mapped = _MAPS.get(ref.path)
+    end = ref.offset + ref.length
+    if mapped is None or end > len(mapped):
+        if mapped is not None:
+            mapped.close()
+        with open(ref.path, "rb") as handle:
+            mapped = _MAPS[ref.path] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return str(memoryview(mapped)[ref.offset : end], "utf-8")
+
+
+class PackedPageStore:
+    """Append-only shard files plus an SQLite offset index.
+
+    Pages are stored once as raw UTF-8: identical content (a page listed
+    under two titles, or re-downloaded unchanged) points at the same bytes.
+    Titles are index keys, so distinct titles never collide. The index is
+    read in one query when the store is opened; pages are read through
+    ``mmap``. Writers take a file lock (without ``fcntl``, only the index's
+    write transaction), so several processes can append.
+    """
+
+    def __init__(self, directory: Path = PACKED_DIR, shard_bytes: int = SHARD_BYTES) -> None:
+        self.directory = directory
+        self.shard_bytes = shard_bytes
+        directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            directory / "index.sqlite", timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "title TEXT PRIMARY KEY, pageid INTEGER, revid INTEGER, shard INTEGER NOT NULL, "
+            "offset INTEGER NOT NULL, length INTEGER NOT NULL, sha1 TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_sha1 ON pages (sha1)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_pageid ON pages (pageid, revid)")
+        self._index: dict[str, PageRef] = {}
+        self._handle: IO[bytes] | None = None
+        self._shard = 0
+        self._added: dict[str, PageRef] = {}
+        self._refresh()
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.directory / f"pages-{shard:05d}.pack"
+
+    def _refresh(self) -> None:
+        rows = self._conn.execute("SELECT title, shard, offset, length, sha1 FROM pages").fetchall()
+        self._index = {
+            title: PageRef(str(self._shard_path(shard)), offset, length, sha1)
+            for title, shard, offset, length, sha1 in rows
+        }
+
+    def ref(self, title: str) -> PageRef | None:
+        return self._index.get(title)
+
+    def fingerprint(self) -> str:
+        """Digest of every title and its content hash."""
+        digest = hashlib.sha1()
+        for title, sha1 in self._conn.execute("SELECT title, sha1 FROM pages ORDER BY title"):
+            digest.update(f"{title}\0{sha1}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def refs(self) -> dict[str, PageRef]:
+        """All committed title -> ref entries."""
+        return dict(self._index)
+
+    def has(self, title: str) -> bool:
+        return title in self._index or title in self._added
+
+    def get(self, title: str) -> str | None:
+        ref = self._index.get(title)
+        return None if ref is None else read_page(ref)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group puts under one lock and one index commit.
+
+        Shard data is synced before the index is committed, so the index
+        never points at bytes that could be lost.
+        """
+        if self._handle is not None:
+            yield
+            return
+        with open(self.directory / ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._shard = self._conn.execute("SELECT COALESCE(MAX(shard), 0) FROM pages").fetchone()[0]
+            self._handle = self._shard_path(self._shard).open("ab")
+            added: dict[str, PageRef] = {}
+            self._added = added
+            try:
+                yield
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._handle.close()
+                self._handle = None
+                self._added = {}
+            self._conn.execute("COMMIT")
+        self._index.update(added)
+
+    def put(self, title: str, wikitext: str, pageid: int | None = None, revid: int | None = None) -> None:
+        with self.batch():
+            data = wikitext.encode("utf-8")
+            sha1 = hashlib.sha1(data).hexdigest()
+            existing = self._conn.execute(
+                "SELECT shard, offset, length FROM pages WHERE sha1 = ? LIMIT 1", (sha1,)
+            ).fetchone()
+            if existing is not None:
+                shard, offset, length = existing
+            else:
+                handle = self._handle
+                if handle.tell() and handle.tell() + len(data) > self.shard_bytes:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    handle.close()
+                    self._shard += 1
+                    handle = self._handle = self._shard_path(self._shard).open("ab")
+                shard, offset, length = self._shard, handle.tell(), len(data)
+                handle.write(data)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (title, pageid, revid, shard, offset, length, sha1) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (title, pageid, revid, shard, offset, length, sha1),
+            )
+            self._added[title] = PageRef(str(self._shard_path(shard)), offset, length, sha1)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_page_store(kind: str | None = None, directory: Path | None = None) -> PageStore:
+    """Create the page store selected by ``kind`` or ``LIQUIPEDIA_PAGE_STORE``.
+
+    Without ``directory`` the packed corpus lives in ``LIQUIPEDIA_PAGE_STORE_PATH`` if set.
+    """
+    kind = kind or os.environ.get("LIQUIPEDIA_PAGE_STORE", "files")
+    if kind == "files":
+        return FilePageStore(directory or PAGES_DIR)
+    if kind == "packed":
+        return PackedPageStore(directory or Path(os.environ.get("LIQUIPEDIA_PAGE_STORE_PATH", str(PACKED_DIR))))
+    raise ValueError(f"Unsupported page store: {kind}")
+
+
+def pack_pages(titles: list[str], source: PageStore, target: PageStore) -> int:
+    """Copy pages from one store into another; return how many were copied."""
+    copied = 0
+    with target.batch():
+        for title in titles:
+            if target.has(title):
+                continue
+            wikitext = source.get(title)
+            if wikitext is None:
+                continue
+            target.put(title, wikitext)
+            copied += 1
+    return copied
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Copy downloaded page files into the packed corpus.")
+    parser.add_argument("--input", type=Path, required=True, help="Path to tournaments.jsonl")
+    parser.add_argument("--pages_dir", type=Path, default=PAGES_DIR, help="Page file directory to read")
+    parser.add_argument("--output", type=Path, default=PACKED_DIR, help="Packed corpus directory")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    with args.input.open("r", encoding="utf-8") as handle:
+        titles = [json.loads(line)["title"] for line in handle if line.strip()]
+    target = PackedPageStore(args.output)
+    try:
+        copied = pack_pages(titles, FilePageStore(args.pages_dir), target)
+    finally:
+        target.close()
+    logger.info("Packed %s pages into %s", copied, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Streaming Parquet output with bounded memory."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .metrics import METRICS
+
+MATCHES_SCHEMA = pa.schema(
+    [
+        ("tournament_page", pa.string()),
+        ("tournament_tier", pa.string()),
+        ("team1", pa.string()),
+        ("team2", pa.string()),
+        ("score1", pa.int64()),
+        ("score2", pa.int64()),
+        ("best_of", pa.int64()),
+        ("winner", pa.string()),
+        ("start_time_utc", pa.string()),
+        ("stage", pa.string()),
+        ("match_format", pa.string()),
+        ("map_list", pa.string()),
+        ("source_template", pa.string()),
+        ("match_id", pa.string()),
+        ("team1_id", pa.int32()),
+        ("team2_id", pa.int32()),
+        ("team1_canonical", pa.dictionary(pa.int32(), pa.string())),
+        ("team2_canonical", pa.dictionary(pa.int32(), pa.string())),
+    ]
+)
+
+MAPS_SCHEMA = pa.schema(
+    [
+        ("match_id", pa.string()),
+        ("tournament_page", pa.string()),
+        ("map_index", pa.int64()),
+        ("map_name", pa.string()),
+        ("score1", pa.int64()),
+        ("score2", pa.int64()),
+        ("winner", pa.string()),
+        ("picked_by", pa.string()),
+        ("team1_side", pa.string()),
+    ]
+)
+
+# Sidecar of raw template params (``--provenance full``), one row per param.
+MATCH_PARAMS_SCHEMA = pa.schema(
+    [
+        ("match_id", pa.dictionary(pa.int32(), pa.string())),
+        ("key", pa.dictionary(pa.int32(), pa.string())),
+        ("value", pa.dictionary(pa.int32(), pa.string())),
+    ]
+)
+
+
+def digest64(key: str) -> int:
+    """64-bit blake2b digest of a key, for compact seen-sets."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class StreamingParquetWriter:
+    """Write rows to Parquet in fixed-size row groups, dropping duplicate keys.
+
+    Rows are buffered column-wise and flushed every ``row_group_size`` rows,
+    so memory stays flat regardless of the total row count. Duplicates are
+    detected with a set of 64-bit digests of ``dedup_key``; the first row
+    seen for a key wins. The file is written under a temporary name and
+    moved into place on ``close``. ``on_flush`` is called with each row
+    group as it is written, so reports can be built column-wise on the fly.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        schema: pa.Schema,
+        row_group_size: int = 50_000,
+        dedup_key: str | None = "match_id",
+        on_flush: Callable[[pa.Table], None] | None = None,
+    ) -> None:
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.dedup_key = dedup_key
+        self.on_flush = on_flush
+        self.rows_written = 0
+        self.duplicates_dropped = 0
+        self._seen: set[int] = set()
+        self._buffer: dict[str, list[Any]] = {name: [] for name in schema.names}
+        self._buffered = 0
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(self._tmp_path, schema)
+
+    def add(self, row: dict[str, Any]) -> bool:
+        """Buffer a row; return False if its key was already written."""
+        if self.dedup_key is not None:
+            digest = digest64(row[self.dedup_key])
+            if digest in self._seen:
+                self.duplicates_dropped += 1
+                return False
+            self._seen.add(digest)
+        for name, column in self._buffer.items():
+            column.append(row.get(name))
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group."""
+        if not self._buffered:
+            return
+        with METRICS.timer("parquet.flush"):
+            table = pa.Table.from_pydict(self._buffer, schema=self.schema)
+            self._writer.write_table(table)
+        if self.on_flush is not None:
+            self.on_flush(table)
+        self.rows_written += self._buffered
+        self._buffer = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Flush remaining rows and move the file into place."""
+        self.flush()
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self) -> StreamingParquetWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._writer.close()
+            self._tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,69 @@
+"""Run a producer iterable in a background thread behind a bounded queue."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def iter_prefetched(iterable: Iterable[T], maxsize: int, name: str = "prefetch") -> Iterator[T]:
+    """Yield items of iterable while a background thread produces ahead.
+
+    At most ``maxsize`` items wait in the queue, so a fast producer blocks
+    instead of buffering without limit. Exceptions raised by the producer are
+    re-raised in the consumer. Closing the generator (or an exception in the
+    consumer, e.g. KeyboardInterrupt) tells the producer to stop at its next
+    item and waits for it to finish, so resources the producer uses (such as
+    a page store) can be closed safely afterwards.
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as exc:  # noqa: BLE001 - forwarded to the consumer
+            put(_Failure(exc))
+            return
+        finally:
+            # Run the producer's own cleanup (e.g. an open store batch) in this thread.
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+        thread.join()
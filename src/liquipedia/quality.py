@@ -0,0 +1,240 @@
+"""Data-quality report grouped by tournament, tier and source template."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .dataset import load_dataset_manifest
+from .logging_utils import setup_logging
+from .parquet_writer import MATCHES_SCHEMA, digest64
+
+GROUP_KEYS = ["tournament_page", "tournament_tier", "source_template"]
+FLAGS = ["missing_teams", "missing_scores", "missing_start_time", "bad_scores", "problem"]
+DUPLICATE_KEYS = ["team1", "team2", "start_time_utc"]
+QUALITY_COLUMNS = [*GROUP_KEYS, *DUPLICATE_KEYS, "score1", "score2", "best_of"]
+TIME_RANGE = [("first_match", "min"), ("last_match", "max")]
+# Merge the per-batch partial aggregates once this many have piled up.
+COMPACT_EVERY = 64
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report data quality per tournament, tier and template.")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        default=Path("data/processed/matches.parquet"),
+        help="Path to matches.parquet or a partitioned dataset directory",
+    )
+    parser.add_argument("--output", type=Path, default=Path("reports/data_quality_breakdown.json"))
+    parser.add_argument("--top", type=int, default=20, help="Suspect pages to log")
+    return parser.parse_args()
+
+
+def _flags(table: pa.Table) -> dict[str, pa.ChunkedArray]:
+    """Per-row problem flags, computed column-wise."""
+    score1, score2, best_of = table.column("score1"), table.column("score2"), table.column("best_of")
+    missing_teams = pc.or_(pc.is_null(table.column("team1")), pc.is_null(table.column("team2")))
+    missing_scores = pc.or_(pc.is_null(score1), pc.is_null(score2))
+    missing_start_time = pc.is_null(table.column("start_time_utc"))
+    # In a best-of-N series the winner needs N // 2 + 1 maps and at most N maps are played.
+    # Best-of-one scores are often round scores, so only negative values are flagged there.
+    series = pc.greater(best_of, 1)
+    too_many = pc.or_(
+        pc.greater(pc.max_element_wise(score1, score2), pc.add(pc.divide(best_of, 2), 1)),
+        pc.greater(pc.add(score1, score2), best_of),
+    )
+    negative = pc.or_(pc.less(score1, 0), pc.less(score2, 0))
+    bad_scores = pc.fill_null(pc.or_(pc.and_(series, too_many), negative), False)
+    problem = pc.or_(pc.or_(missing_teams, missing_scores), bad_scores)
+    return {
+        "missing_teams": missing_teams,
+        "missing_scores": missing_scores,
+        "missing_start_time": missing_start_time,
+        "bad_scores": bad_scores,
+        "problem": problem,
+    }
+
+
+def _as_string(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    return column.cast(pa.string()) if pa.types.is_dictionary(column.type) else column
+
+
+class QualityReport:
+    """Accumulate grouped quality counts batch by batch.
+
+    Each batch is reduced to one row per (tournament, tier, template) group
+    with a single ``group_by``; partial groups are merged at the end, so the
+    report can follow a writer's row groups without holding the rows.
+    Duplicates across batches are counted from a 64-bit digest of each
+    (team1, team2, start time) key, like ``StreamingParquetWriter`` does.
+    """
+
+    def __init__(self) -> None:
+        self._partials: list[pa.Table] = []
+        self._group_ids: dict[tuple[str | None, ...], int] = {}
+        # Key digest -> group id of its first row, or -1 once that row was counted.
+        self._seen: dict[int, int] = {}
+        self._duplicate_rows: Counter[int] = Counter()
+
+    def update(self, table: pa.Table | pa.RecordBatch) -> None:
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        if not table.num_rows:
+            return
+        groups = {name: _as_string(table.column(name)) for name in GROUP_KEYS}
+        flags = {name: pc.cast(values, pa.int64()) for name, values in _flags(table).items()}
+        start = table.column("start_time_utc")
+        ones = pa.repeat(1, table.num_rows)
+        rows = pa.table({**groups, **flags, "rows": ones, "first_match": start, "last_match": start})
+        partial = rows.group_by(GROUP_KEYS).aggregate([(name, "sum") for name in [*FLAGS, "rows"]] + TIME_RANGE)
+        self._partials.append(_unsuffix(partial))
+        keyed = pc.and_(
+            pc.and_(pc.is_valid(table.column("team1")), pc.is_valid(table.column("team2"))),
+            pc.is_valid(start),
+        )
+        keys = pa.table({**groups, **{name: table.column(name) for name in DUPLICATE_KEYS}}).filter(keyed)
+        self._count_duplicates(keys)
+        if len(self._partials) >= COMPACT_EVERY:
+            self._partials = [self._merged()]
+
+    def _count_duplicates(self, keys: pa.Table) -> None:
+        """Count every row whose (team1, team2, start time) key occurs more than once, per group."""
+        columns = [keys.column(name).to_pylist() for name in [*GROUP_KEYS, *DUPLICATE_KEYS]]
+        for row in zip(*columns):
+            group_id = self._group_ids.setdefault(row[: len(GROUP_KEYS)], len(self._group_ids))
+            digest = digest64("\x1f".join(row[len(GROUP_KEYS) :]))
+            first = self._seen.get(digest)
+            if first is None:
+                self._seen[digest] = group_id
+                continue
+            if first >= 0:
+                self._duplicate_rows[first] += 1
+                self._seen[digest] = -1
+            self._duplicate_rows[group_id] += 1
+
+    def _merged(self) -> pa.Table:
+        if not self._partials:
+            empty = {name: pa.array([], pa.string()) for name in GROUP_KEYS}
+            empty.update({name: pa.array([], pa.int64()) for name in [*FLAGS, "rows"]})
+            empty.update({"first_match": pa.array([], pa.string()), "last_match": pa.array([], pa.string())})
+            return pa.table(empty)
+        return _regroup(pa.concat_tables(self._partials), GROUP_KEYS)
+
+    def _duplicates(self) -> pa.Table:
+        """Rows per group whose (team1, team2, start time) appears more than once."""
+        schema = pa.schema([*((name, pa.string()) for name in GROUP_KEYS), ("duplicates", pa.int64())])
+        rows = [
+            {**dict(zip(GROUP_KEYS, group)), "duplicates": self._duplicate_rows[group_id]}
+            for group, group_id in self._group_ids.items()
+            if group_id in self._duplicate_rows
+        ]
+        return pa.Table.from_pylist(rows, schema=schema)
+
+    def groups(self) -> pa.Table:
+        """Counts per (tournament, tier, template), with duplicate counts joined in."""
+        merged = self._merged()
+        duplicates = self._duplicates()
+        merged = merged.join(duplicates, GROUP_KEYS, join_type="left outer")
+        return merged.set_column(
+            merged.schema.get_field_index("duplicates"),
+            "duplicates",
+            pc.fill_null(merged.column("duplicates"), 0),
+        )
+
+    def result(self, top: int = 20) -> dict[str, Any]:
+        """Overall rates plus breakdowns by tournament, tier and template.
+
+        ``suspect_pages`` lists the tournaments with the highest share of
+        rows missing teams or scores or with impossible scores.
+        """
+        groups = self.groups()
+        tournaments = _rates(_regroup(groups, ["tournament_page", "tournament_tier"]))
+        suspects = tournaments.filter(pc.greater(tournaments.column("problem_rate"), 0)).sort_by(
+            [("problem_rate", "descending"), ("rows", "descending")]
+        )
+        return {
+            "overall": _rates(_regroup(groups, [])).to_pylist()[0],
+            "by_tier": _rates(_regroup(groups, ["tournament_tier"])).sort_by("tournament_tier").to_pylist(),
+            "by_template": _rates(_regroup(groups, ["source_template"]))
+            .sort_by([("rows", "descending")])
+            .to_pylist(),
+            "suspect_pages": suspects.slice(0, top).to_pylist(),
+            "by_tournament": tournaments.sort_by("tournament_page").to_pylist(),
+        }
+
+
+def _unsuffix(table: pa.Table) -> pa.Table:
+    """Drop the ``_sum``/``_min``/``_max`` suffixes ``aggregate`` adds."""
+    suffixes = ("_sum", "_min", "_max")
+    names = [name.rsplit("_", 1)[0] if name.endswith(suffixes) else name for name in table.column_names]
+    return table.rename_columns(names)
+
+
+def _regroup(table: pa.Table, keys: list[str]) -> pa.Table:
+    sums = [name for name in [*FLAGS, "rows", "duplicates"] if name in table.column_names]
+    return _unsuffix(table.group_by(keys).aggregate([(name, "sum") for name in sums] + TIME_RANGE))
+
+
+def _rates(table: pa.Table) -> pa.Table:
+    """Add the share of rows for each flag count."""
+    rows = pc.cast(table.column("rows"), pa.float64())
+    for name in [*FLAGS, "duplicates"]:
+        if name in table.column_names:
+            rate = pc.divide(pc.cast(table.column(name), pa.float64()), rows)
+            table = table.append_column(f"{name}_rate", rate)
+    return table
+
+
+def iter_batches(path: Path, batch_size: int = 65_536):
+    """Stream the quality columns of a matches file or dataset directory."""
+    if path.is_dir():
+        files = [str(path / relative) for relative in sorted(load_dataset_manifest(path)["files"].values())]
+        yield from ds.dataset(files, schema=MATCHES_SCHEMA, format="parquet").to_batches(
+            columns=QUALITY_COLUMNS, batch_size=batch_size
+        )
+        return
+    yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=QUALITY_COLUMNS)
+
+
+def quality_report(path: Path, top: int = 20) -> dict[str, Any]:
+    """Compute the grouped quality report for stored matches."""
+    report = QualityReport()
+    for batch in iter_batches(path):
+        report.update(batch)
+    return report.result(top)
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    result = quality_report(args.input, args.top)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info("Saved quality breakdown of %s tournaments to %s", len(result["by_tournament"]), args.output)
+    for page in result["suspect_pages"]:
+        logger.warning(
+            "%s: %.0f%% of %s rows have problems (teams %.0f%%, scores %.0f%%, bad scores %.0f%%)",
+            page["tournament_page"],
+            100 * page["problem_rate"],
+            page["rows"],
+            100 * page["missing_teams_rate"],
+            100 * page["missing_scores_rate"],
+            100 * page["bad_scores_rate"],
+        )
+
+
+if __name__ == "__main__":
+    main()
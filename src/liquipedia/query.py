@@ -0,0 +1,244 @@
+"""Indexed lookups (team, head-to-head, time range) over the processed matches."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import numbers
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .dataset import MANIFEST_NAME, read_matches
+from .logging_utils import setup_logging
+
+MATCHES_PATH = Path("data/processed/matches.parquet")
+INDEX_VERSION = 1
+INDEX_COLUMNS = ["start_time_utc", "team1_id", "team2_id", "team1_canonical", "team2_canonical"]
+# Rows without a start time sort last.
+MISSING_TIME = np.iinfo(np.int64).max
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query matches by team, opponent and time range.")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        default=MATCHES_PATH,
+        help="Path to matches.parquet or a partitioned dataset directory",
+    )
+    parser.add_argument("--team", default=None, help="Canonical team name")
+    parser.add_argument("--opponent", default=None, help="Only matches against this team")
+    parser.add_argument("--start", default=None, help="Earliest start time (ISO date or datetime, UTC)")
+    parser.add_argument("--end", default=None, help="Latest start time, exclusive")
+    parser.add_argument("--columns", nargs="+", default=None, help="Columns to print")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index even if it is current")
+    return parser.parse_args()
+
+
+def index_path(path: Path) -> Path:
+    """Where the index of a matches file or dataset directory is stored."""
+    return path / "_index.npz" if path.is_dir() else path.with_name(path.name + ".index.npz")
+
+
+def source_fingerprint(path: Path) -> str:
+    """Identify the data an index was built from: the dataset manifest, or the file's size and mtime."""
+    if path.is_dir():
+        return hashlib.sha1((path / MANIFEST_NAME).read_bytes()).hexdigest()
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def to_seconds(value: str | datetime | None) -> int | None:
+    """Epoch seconds of an ISO date/datetime; naive values are taken as UTC."""
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def _start_seconds(column: pa.ChunkedArray) -> np.ndarray:
+    parsed = pc.cast(pc.strptime(column, "%Y-%m-%dT%H:%M:%S%z", "s", error_is_null=True), pa.int64())
+    return parsed.fill_null(MISSING_TIME).to_numpy()
+
+
+def _grouped(keys: np.ndarray, rows: np.ndarray, times: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sort rows by (key, time); return the sorted keys and rows."""
+    order = np.lexsort((times[rows], keys))
+    return keys[order], rows[order]
+
+
+class MatchIndex:
+    """Matches table plus sorted row-id indexes on time, team and team pair.
+
+    The indexes are built once per version of the data and saved next to it.
+    Each lookup is a binary search over sorted arrays followed by a ``take``
+    of the matching rows, so lookups never rescan the table.
+    """
+
+    def __init__(self, table: pa.Table, arrays: dict[str, np.ndarray], teams: dict[str, int]) -> None:
+        self.table = table
+        self.times = arrays["times"]
+        self.time_rows = arrays["time_rows"]
+        self.team_keys = arrays["team_keys"]
+        self.team_rows = arrays["team_rows"]
+        self.pair_keys = arrays["pair_keys"]
+        self.pair_rows = arrays["pair_rows"]
+        self.teams = teams
+
+    @classmethod
+    def open(cls, path: Path = MATCHES_PATH, columns: list[str] | None = None, rebuild: bool = False) -> MatchIndex:
+        """Load the matches (only ``columns`` if given) and their index, building it if stale."""
+        # ``take`` on a multi-chunk table concatenates the chunks on every call.
+        table = read_matches(path, columns=columns).unify_dictionaries().combine_chunks()
+        location = index_path(path)
+        fingerprint = source_fingerprint(path)
+        if not rebuild and location.exists():
+            with np.load(location) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta["version"] == INDEX_VERSION and meta["source"] == fingerprint:
+                    arrays = {name: data[name] for name in data.files if name != "meta"}
+                    return cls(table, arrays, meta["teams"])
+        index = cls.build(read_matches(path, columns=INDEX_COLUMNS))
+        index.table = table
+        index.save(location, fingerprint)
+        return index
+
+    @classmethod
+    def build(cls, table: pa.Table) -> MatchIndex:
+        """Build the indexes for a table with at least ``INDEX_COLUMNS``."""
+        times = _start_seconds(table.column("start_time_utc"))
+        team1 = table.column("team1_id").fill_null(-1).to_numpy().astype(np.int64)
+        team2 = table.column("team2_id").fill_null(-1).to_numpy().astype(np.int64)
+        rows = np.arange(table.num_rows, dtype=np.int64)
+
+        time_rows = np.argsort(times, kind="stable")
+        sides = np.concatenate([team1, team2])
+        known = sides >= 0
+        team_keys, team_rows = _grouped(sides[known], np.concatenate([rows, rows])[known], times)
+        both = (team1 >= 0) & (team2 >= 0)
+        low, high = np.minimum(team1, team2)[both], np.maximum(team1, team2)[both]
+        pair_keys, pair_rows = _grouped((low << 32) | high, rows[both], times)
+
+        teams: dict[str, int] = {}
+        for id_column, name_column in (("team1_id", "team1_canonical"), ("team2_id", "team2_canonical")):
+            pairs = pa.table([table.column(id_column), table.column(name_column).cast(pa.string())], ["id", "name"])
+            pairs = pairs.filter(pc.is_valid(pairs.column("id"))).group_by(["id", "name"]).aggregate([])
+            teams.update(zip(pairs.column("name").to_pylist(), pairs.column("id").to_pylist()))
+        arrays = {
+            "times": times,
+            "time_rows": time_rows,
+            "team_keys": team_keys,
+            "team_rows": team_rows,
+            "pair_keys": pair_keys,
+            "pair_rows": pair_rows,
+        }
+        return cls(table, arrays, teams)
+
+    def save(self, path: Path, fingerprint: str) -> None:
+        """Atomically write the indexes."""
+        meta = json.dumps({"version": INDEX_VERSION, "source": fingerprint, "teams": self.teams})
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                times=self.times,
+                time_rows=self.time_rows,
+                team_keys=self.team_keys,
+                team_rows=self.team_rows,
+                pair_keys=self.pair_keys,
+                pair_rows=self.pair_rows,
+                meta=np.array(meta),
+            )
+        os.replace(tmp_path, path)
+
+    def team_id(self, team: int | str) -> int | None:
+        """Resolve a canonical team name (ids, including NumPy integers, pass through)."""
+        return int(team) if isinstance(team, numbers.Integral) else self.teams.get(team)
+
+    def _in_range(self, rows: np.ndarray, start: int | None, end: int | None) -> np.ndarray:
+        # ``rows`` are sorted by time, so the range is a contiguous slice; undated rows sort last
+        # and only match an unbounded lookup.
+        if start is None and end is None:
+            return rows
+        times = self.times[rows]
+        low = 0 if start is None else np.searchsorted(times, start, side="left")
+        high = np.searchsorted(times, MISSING_TIME if end is None else min(end, MISSING_TIME), side="left")
+        return rows[low:high]
+
+    def _take(self, rows: np.ndarray, columns: list[str] | None) -> pa.Table:
+        table = self.table if columns is None else self.table.select(columns)
+        return table.take(pa.array(rows, pa.int64()))
+
+    def between(
+        self,
+        start: str | datetime | None = None,
+        end: str | datetime | None = None,
+        columns: list[str] | None = None,
+    ) -> pa.Table:
+        """Matches starting in ``[start, end)``, in time order."""
+        rows = self._in_range(self.time_rows, to_seconds(start), to_seconds(end))
+        if start is None and end is None:
+            rows = rows[self.times[rows] != MISSING_TIME]
+        return self._take(rows, columns)
+
+    def team_matches(
+        self,
+        team: int | str,
+        start: str | datetime | None = None,
+        end: str | datetime | None = None,
+        columns: list[str] | None = None,
+    ) -> pa.Table:
+        """Matches of one team in ``[start, end)``, in time order."""
+        team_id = self.team_id(team)
+        if team_id is None:
+            return self._take(np.zeros(0, dtype=np.int64), columns)
+        low, high = np.searchsorted(self.team_keys, [team_id, team_id + 1])
+        rows = self._in_range(self.team_rows[low:high], to_seconds(start), to_seconds(end))
+        return self._take(rows, columns)
+
+    def head_to_head(
+        self,
+        team: int | str,
+        opponent: int | str,
+        start: str | datetime | None = None,
+        end: str | datetime | None = None,
+        columns: list[str] | None = None,
+    ) -> pa.Table:
+        """Matches between two teams in ``[start, end)``, in time order."""
+        first, second = self.team_id(team), self.team_id(opponent)
+        if first is None or second is None:
+            return self._take(np.zeros(0, dtype=np.int64), columns)
+        key = (min(first, second) << 32) | max(first, second)
+        low, high = np.searchsorted(self.pair_keys, [key, key + 1])
+        rows = self._in_range(self.pair_rows[low:high], to_seconds(start), to_seconds(end))
+        return self._take(rows, columns)
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    index = MatchIndex.open(args.input, rebuild=args.rebuild)
+    if args.team and args.opponent:
+        result = index.head_to_head(args.team, args.opponent, args.start, args.end, args.columns)
+    elif args.team:
+        result = index.team_matches(args.team, args.start, args.end, args.columns)
+    else:
+        result = index.between(args.start, args.end, args.columns)
+    logger.info("%s matches", result.num_rows)
+    print(result.to_pandas().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Token-bucket rate limiter shared by local processes through a state file."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+RATE_LIMIT_STATE_PATH = Path("data/raw/liquipedia/ratelimit.json")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketLimiter:
+    """Token bucket whose state lives in a file guarded by ``flock``.
+
+    Every process (and thread) that points at the same state file draws from
+    one bucket that refills at ``rate_per_second`` up to ``capacity`` tokens.
+    ``penalize`` blocks all of them until a server-requested time has passed,
+    e.g. after a 429 with Retry-After or a MediaWiki maxlag error. Without
+    ``fcntl`` (Windows) the bucket is only shared between threads.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float = 1.0, path: Path = RATE_LIMIT_STATE_PATH) -> None:
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self.path = path
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, Any]]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = b""
+                while chunk := os.read(fd, 4096):
+                    raw += chunk
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                state.setdefault("tokens", self.capacity)
+                state.setdefault("updated", time.time())
+                state.setdefault("blocked_until", 0.0)
+                yield state
+                payload = json.dumps(state).encode("utf-8")
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._state() as state:
+                now = time.time()
+                elapsed = max(0.0, now - state["updated"])
+                state["tokens"] = min(self.capacity, state["tokens"] + elapsed * self.rate_per_second)
+                state["updated"] = now
+                if now < state["blocked_until"]:
+                    delay = state["blocked_until"] - now
+                elif state["tokens"] >= 1.0:
+                    state["tokens"] -= 1.0
+                    return waited
+                else:
+                    delay = (1.0 - state["tokens"]) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float) -> None:
+        """Hold back all requests for at least ``seconds`` from now."""
+        with self._state() as state:
+            state["blocked_until"] = max(state["blocked_until"], time.time() + seconds)
+            state["tokens"] = 0.0
@@ -0,0 +1,225 @@
+"""Team name canonicalization with a persisted alias index."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+
+import requests
+
+from .client import LiquipediaClient
+from .mediawiki import MAX_TITLES_PER_REQUEST, resolve_titles
+from .metrics import METRICS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+TEAM_INDEX_PATH = Path("data/raw/liquipedia/team_index.json")
+PLACEHOLDER_NAMES = {"tbd", "tba", "bye", "definitions", "-"}
+
+_TEAM_TEMPLATE_RE = re.compile(r"^\{\{\s*Team\w*\s*\|\s*([^|}]+)", re.IGNORECASE)
+_LINK_RE = re.compile(r"^\[\[\s*([^|\]]+)")
+_SPACES_RE = re.compile(r"[\s_]+")
+
+
+logger = logging.getLogger(__name__)
+
+
+def clean_team_name(raw: str | None) -> str | None:
+    """Reduce a raw team param to a title-like name, or None for placeholders.
+
+    ``{{TeamOpponent|navi}}`` and ``[[Natus Vincere|NaVi]]`` yield their
+    target; names are normalized like MediaWiki titles (spaces, first letter).
+    """
+    if not raw:
+        return None
+    raw = raw.strip()
+    template = _TEAM_TEMPLATE_RE.match(raw) or _LINK_RE.match(raw)
+    if template:
+        raw = template.group(1)
+    name = _SPACES_RE.sub(" ", raw).strip()
+    if not name or name.lower() in PLACEHOLDER_NAMES or "{{" in name:
+        return None
+    return name[0].upper() + name[1:]
+
+
+class TeamIndex:
+    """Alias -> canonical name map plus interned integer ids for canonical names.
+
+    Lookups are plain dict accesses. Names are only sent to the API by
+    ``resolve`` if they were never resolved before; the redirects pointing
+    at each resolved page are added as aliases too, so most spellings are
+    known before they are seen.
+
+    Ids are line numbers in an append-only name log next to the alias file
+    (``team_index.ids``). New names are appended under a file lock after
+    reading what other processes appended, so concurrent shard builds agree
+    on every id. Aliases are merged into the file on ``save`` under the same
+    lock. Without ``fcntl`` (Windows) only one build should run at a time.
+    """
+
+    def __init__(self, path: Path = TEAM_INDEX_PATH) -> None:
+        self.path = path
+        self.ids_path = path.with_suffix(".ids")
+        data: dict[str, Any] = {"aliases": {}}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        self.aliases: dict[str, str] = data["aliases"]
+        self.teams: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._offset = 0
+        self._dirty = False
+        # Indexes written before the id log kept the names in the JSON file.
+        legacy = [] if self.ids_path.exists() else data.get("teams", [])
+        with self._locked() as handle:
+            self._read_new(handle)
+        self.assign(legacy)
+
+    @contextmanager
+    def _locked(self) -> Iterator[BinaryIO]:
+        self.ids_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.ids_path.open("a+b") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield handle
+
+    def _read_new(self, handle: BinaryIO) -> None:
+        handle.seek(self._offset)
+        for line in handle.read().decode("utf-8").splitlines():
+            self._ids.setdefault(line, len(self.teams))
+            self.teams.append(line)
+        self._offset = handle.tell()
+
+    def assign(self, names: Iterable[str]) -> None:
+        """Give ids to canonical names that have none, agreeing with other processes."""
+        names = [name for name in dict.fromkeys(names) if name not in self._ids]
+        if not names:
+            return
+        with self._locked() as handle:
+            self._read_new(handle)
+            missing = [name for name in names if name not in self._ids]
+            if missing:
+                handle.write("".join(f"{name}\n" for name in missing).encode("utf-8"))
+                handle.flush()
+                self._read_new(handle)
+
+    def is_resolved(self, name: str) -> bool:
+        return name in self.aliases
+
+    def team_id(self, canonical: str) -> int:
+        """Return the interned id of a canonical name, assigning a new one if needed."""
+        team_id = self._ids.get(canonical)
+        if team_id is None:
+            self.assign([canonical])
+            team_id = self._ids[canonical]
+        return team_id
+
+    def canonical(self, raw: str | None) -> str | None:
+        """Canonical name for a raw team param; names never resolved are their own canonical name."""
+        name = clean_team_name(raw)
+        return None if name is None else self.aliases.get(name, name)
+
+    def lookup(self, raw: str | None) -> tuple[int | None, str | None]:
+        """Return (team_id, canonical name) for a raw team param."""
+        canonical = self.canonical(raw)
+        if canonical is None:
+            return None, None
+        return self.team_id(canonical), canonical
+
+    def resolve(self, client: LiquipediaClient, names: Iterable[str]) -> int:
+        """Resolve unseen names through the API in batches; return how many were sent.
+
+        If the API fails, the names stay unresolved (and stand for
+        themselves) so a later run can try again.
+        """
+        pending = [name for name in dict.fromkeys(names) if name not in self.aliases]
+        if not pending:
+            return 0
+        try:
+            with METRICS.timer("teams.resolve"):
+                resolved = resolve_titles(client, pending)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            logger.warning("Resolving %s team names failed: %s", len(pending), exc)
+            METRICS.incr("teams.resolve_failures", len(pending))
+            return 0
+        for name in pending:
+            info = resolved.get(name)
+            canonical = info["title"] if info and not info["missing"] else name
+            self.aliases[name] = canonical
+            self.aliases.setdefault(canonical, canonical)
+            for alias in info["aliases"] if info else []:
+                self.aliases.setdefault(alias, canonical)
+        METRICS.incr("teams.resolved", len(pending))
+        self._dirty = True
+        return len(pending)
+
+    def save(self) -> None:
+        """Merge the aliases into the file and write it atomically, if they changed."""
+        if not self._dirty:
+            return
+        with self._locked():
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as handle:
+                    stored = json.load(handle)["aliases"]
+                self.aliases = stored | self.aliases
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump({"aliases": self.aliases}, handle, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def annotate_teams(matches: list[dict[str, Any]], index: TeamIndex) -> None:
+    """Add ``team{1,2}_id`` and ``team{1,2}_canonical`` to extracted matches."""
+    # One locked append for all new teams on the page.
+    index.assign(name for match in matches for key in ("team1", "team2") if (name := index.canonical(match[key])))
+    for match in matches:
+        match["team1_id"], match["team1_canonical"] = index.lookup(match["team1"])
+        match["team2_id"], match["team2_canonical"] = index.lookup(match["team2"])
+
+
+def iter_canonicalized(
+    pages: Iterable[tuple[str, Any, list[dict[str, Any]]]],
+    index: TeamIndex,
+    client: LiquipediaClient | None = None,
+    batch_size: int = MAX_TITLES_PER_REQUEST,
+) -> Iterator[tuple[str, Any, list[dict[str, Any]]]]:
+    """Annotate (title, tier, matches) pages with team ids, in input order.
+
+    With a client, pages are held back until ``batch_size`` unseen names
+    have accumulated, so they are resolved in full batches.
+    """
+    held: deque = deque()
+    unseen: dict[str, None] = {}
+    for page in pages:
+        if client is not None:
+            for match in page[2]:
+                for key in ("team1", "team2"):
+                    name = clean_team_name(match[key])
+                    if name is not None and not index.is_resolved(name):
+                        unseen[name] = None
+        held.append(page)
+        if unseen and len(unseen) < batch_size:
+            continue
+        if unseen:
+            index.resolve(client, unseen)
+            unseen.clear()
+        while held:
+            title, tier, matches = held.popleft()
+            annotate_teams(matches, index)
+            yield title, tier, matches
+    if unseen and client is not None:
+        index.resolve(client, unseen)
+    while held:
+        title, tier, matches = held.popleft()
+        annotate_teams(matches, index)
+        yield title, tier, matches
@@ -0,0 +1,110 @@
+"""Fast brace scanner that locates candidate template spans in wikitext."""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Iterator
+
+_TOKEN_RE = re.compile(r"<!--|\{\{|\}\}")
+_COMMENT_RE = re.compile(r"<!--.*?(?:-->|\Z)", re.DOTALL)
+# (token, template name after "{{", "key=" after "|")
+_CALL_TOKEN_RE = re.compile(
+    r"(\{\{\s*(?:([^|{}\[\]<>:#\n]*[^|{}\[\]<>:#\s])\s*(?=\||\}\}))?|\}\}|\[\[|\]\]|\|([^=|{}\[\]]*=)?)"
+)
+_UNSUPPORTED_RE = re.compile(r"\{\{\{|<nowiki|<pre|<includeonly|<noinclude|<onlyinclude", re.IGNORECASE)
+
+
+@lru_cache(maxsize=32)
+def _name_re(names: tuple[str, ...]) -> re.Pattern[str]:
+    alternatives = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return re.compile(r"\{\{\s*(?:" + alternatives + r")\s*(?=\||\}\})")
+
+
+def has_candidates(text: str, names: tuple[str, ...]) -> bool:
+    """Return True if text may contain a template named in names."""
+    return _name_re(names).search(text) is not None
+
+
+def find_template_spans(text: str, names: tuple[str, ...]) -> list[tuple[int, int]] | None:
+    """Return (start, end) spans of outermost templates named in names.
+
+    Templates nested inside another candidate are covered by the outer span;
+    candidates nested inside other templates get their own span. Comments are
+    skipped. Returns None when the text uses constructs the scanner does not
+    model (template arguments, nowiki/pre, transclusion tags, unbalanced
+    braces); callers should then parse the whole page.
+    """
+    name_re = _name_re(names)
+    if name_re.search(text) is None:
+        return []
+    if _UNSUPPORTED_RE.search(text):
+        return None
+
+    spans: list[tuple[int, int]] = []
+    stack: list[tuple[int, bool]] = []
+    open_candidates = 0
+    pos = 0
+    while True:
+        token = _TOKEN_RE.search(text, pos)
+        if token is None:
+            break
+        kind = token.group()
+        start = token.start()
+        if kind == "<!--":
+            end = text.find("-->", token.end())
+            if end == -1:
+                return None
+            pos = end + 3
+            continue
+        pos = token.end()
+        if kind == "{{":
+            is_candidate = name_re.match(text, start) is not None
+            stack.append((start, is_candidate))
+            open_candidates += is_candidate
+            continue
+        if not stack:
+            continue
+        open_start, is_candidate = stack.pop()
+        if is_candidate:
+            open_candidates -= 1
+            if open_candidates == 0:
+                spans.append((open_start, pos))
+
+    if stack:
+        return None
+    return spans
+
+
+def iter_template_calls(text: str) -> Iterator[tuple[str, list[str]]]:
+    """Yield (name, param keys) for every template call, nested ones included.
+
+    A tokenizer rather than a parser: one regex pass picks up braces, links
+    and pipes together with the template name or param key that follows,
+    which is enough for a census at a fraction of a full parse. Positional
+    params are keyed "1", "2", ...; parser functions, comments and unclosed
+    calls are skipped.
+    """
+    if "<!--" in text:
+        text = _COMMENT_RE.sub("", text)
+    # Open template frames are [name, keys, positional count]; links are None.
+    stack: list[list[Any] | None] = []
+    for token, name, key in _CALL_TOKEN_RE.findall(text):
+        kind = token[0]
+        if kind == "|":
+            frame = stack[-1] if stack else None
+            if frame is None:
+                continue
+            if key:
+                frame[1].append(key[:-1].strip())
+            else:
+                frame[2] += 1
+                frame[1].append(str(frame[2]))
+        elif kind == "{":
+            stack.append([name or None, [], 0])
+        elif kind == "[":
+            stack.append(None)
+        elif stack and (stack[-1] is None) == (kind == "]"):
+            frame = stack.pop()
+            if frame is not None and frame[0] is not None:
+                yield frame[0], frame[1]
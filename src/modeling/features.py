@@ -0,0 +1,253 @@
+"""Pre-match team features (Elo, form, head-to-head, rest) with incremental updates.
+
+Matches are walked in chronological order and every feature is computed from
+the state *before* the match, so nothing leaks the result. Team state lives in
+NumPy arrays indexed by ``team_id``; the store persists that state next to the
+feature rows, so new matches are appended without a full recomputation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.liquipedia.dataset import read_matches
+from src.liquipedia.logging_utils import setup_logging
+
+FEATURES_DIR = Path("data/processed/features")
+STATE_NAME = "state.npz"
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+FORM_WINDOW = 10
+FEATURE_COLUMNS = [
+    "elo1",
+    "elo2",
+    "elo_diff",
+    "elo_expected1",
+    "games1",
+    "games2",
+    "form1",
+    "form2",
+    "h2h_games",
+    "h2h_winrate1",
+    "days_since1",
+    "days_since2",
+]
+MATCH_COLUMNS = ["match_id", "start_time_utc", "team1_id", "team2_id", "winner"]
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Update the pre-match team feature store.")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        default=Path("data/processed/matches.parquet"),
+        help="Path to matches.parquet or a partitioned dataset directory",
+    )
+    parser.add_argument("--output", type=Path, default=FEATURES_DIR, help="Feature store directory")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the store and recompute from scratch")
+    return parser.parse_args(argv)
+
+
+class TeamState:
+    """Per-team rating state in arrays indexed by team id, plus head-to-head records."""
+
+    def __init__(self) -> None:
+        self.rating = np.zeros(0, dtype=np.float64)
+        self.games = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        # Ring buffer of the last FORM_WINDOW results per team, plus their sum in the last column.
+        self.recent = np.zeros((0, FORM_WINDOW + 1), dtype=np.int16)
+        self.h2h: dict[tuple[int, int], list[int]] = {}
+        # Last processed (start time, match id), feature files and rows written.
+        self.watermark: tuple[str, str] = ("", "")
+        self.parts = 0
+        self.rows = 0
+
+    def ensure(self, size: int) -> None:
+        """Grow the arrays to hold ``size`` teams."""
+        extra = size - len(self.rating)
+        if extra <= 0:
+            return
+        self.rating = np.concatenate([self.rating, np.full(extra, INITIAL_RATING)])
+        self.games = np.concatenate([self.games, np.zeros(extra, dtype=np.int64)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(extra, np.nan)])
+        self.recent = np.concatenate([self.recent, np.zeros((extra, FORM_WINDOW + 1), dtype=np.int16)])
+
+    @classmethod
+    def load(cls, path: Path) -> TeamState:
+        state = cls()
+        if not path.exists():
+            return state
+        with np.load(path) as data:
+            state.rating = data["rating"]
+            state.games = data["games"]
+            state.last_seen = data["last_seen"]
+            state.recent = data["recent"]
+            pairs, records = data["h2h_pairs"], data["h2h_records"]
+            state.h2h = {(int(a), int(b)): [int(n), int(w)] for (a, b), (n, w) in zip(pairs, records)}
+            meta = json.loads(str(data["meta"]))
+        state.watermark = tuple(meta["watermark"])
+        state.parts = meta["parts"]
+        state.rows = meta["rows"]
+        return state
+
+    def save(self, path: Path) -> None:
+        """Atomically write the state."""
+        pairs = np.array(list(self.h2h), dtype=np.int64).reshape(-1, 2)
+        records = np.array(list(self.h2h.values()), dtype=np.int64).reshape(-1, 2)
+        meta = json.dumps({"watermark": list(self.watermark), "parts": self.parts, "rows": self.rows})
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                rating=self.rating,
+                games=self.games,
+                last_seen=self.last_seen,
+                recent=self.recent,
+                h2h_pairs=pairs,
+                h2h_records=records,
+                meta=np.array(meta),
+            )
+        os.replace(tmp_path, path)
+
+
+def _new_matches(matches: pa.Table, state: TeamState) -> tuple[pa.Table, int]:
+    """Decided matches after the watermark in chronological order, and how many arrived late."""
+    matches = matches.select(MATCH_COLUMNS)
+    decided = pc.and_(
+        pc.and_(pc.is_valid(matches.column("team1_id")), pc.is_valid(matches.column("team2_id"))),
+        pc.is_in(matches.column("winner"), pa.array(["team1", "team2"])),
+    )
+    decided = pc.and_(decided, pc.is_valid(matches.column("start_time_utc")))
+    matches = matches.filter(decided).sort_by([("start_time_utc", "ascending"), ("match_id", "ascending")])
+    times = matches.column("start_time_utc").to_numpy(zero_copy_only=False).astype(str)
+    ids = matches.column("match_id").to_numpy(zero_copy_only=False).astype(str)
+    last_time, last_id = state.watermark
+    after = (times > last_time) | ((times == last_time) & (ids > last_id))
+    start = int(np.argmax(after)) if after.any() else len(after)
+    return matches.slice(start), max(0, start - state.rows)
+
+
+def compute_features(matches: pa.Table, state: TeamState) -> pa.Table:
+    """Compute pre-match features for chronologically sorted matches and update ``state``."""
+    count = matches.num_rows
+    team1 = matches.column("team1_id").to_numpy().astype(np.int64)
+    team2 = matches.column("team2_id").to_numpy().astype(np.int64)
+    won1 = pc.equal(matches.column("winner"), "team1").to_numpy(zero_copy_only=False)
+    # A timestamp cast (unlike a fixed strptime format) accepts fractional seconds.
+    micros = pc.cast(pc.cast(matches.column("start_time_utc"), pa.timestamp("us", tz="UTC")), pa.int64())
+    seconds = micros.to_numpy().astype(np.float64) / 1e6
+    if count:
+        state.ensure(int(max(team1.max(), team2.max())) + 1)
+
+    out = {name: np.full(count, np.nan) for name in FEATURE_COLUMNS}
+    elo1, elo2, elo_diff, elo_expected1 = out["elo1"], out["elo2"], out["elo_diff"], out["elo_expected1"]
+    games1, games2, form1, form2 = out["games1"], out["games2"], out["form1"], out["form2"]
+    h2h_games, h2h_winrate1 = out["h2h_games"], out["h2h_winrate1"]
+    days_since1, days_since2 = out["days_since1"], out["days_since2"]
+    rating, games, last_seen, recent, h2h = state.rating, state.games, state.last_seen, state.recent, state.h2h
+    for i, (a, b, t, won) in enumerate(zip(team1.tolist(), team2.tolist(), seconds.tolist(), won1.tolist())):
+        rating_a, rating_b = rating[a], rating[b]
+        expected = 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+        elo1[i], elo2[i], elo_diff[i], elo_expected1[i] = rating_a, rating_b, rating_a - rating_b, expected
+        games_a, games_b = int(games[a]), int(games[b])
+        window_a, window_b = recent[a], recent[b]
+        games1[i], games2[i] = games_a, games_b
+        if games_a:
+            form1[i] = window_a[FORM_WINDOW] / min(games_a, FORM_WINDOW)
+        if games_b:
+            form2[i] = window_b[FORM_WINDOW] / min(games_b, FORM_WINDOW)
+        days_since1[i] = (t - last_seen[a]) / 86400.0
+        days_since2[i] = (t - last_seen[b]) / 86400.0
+        pair = (a, b) if a < b else (b, a)
+        record = h2h.get(pair)
+        if record is None:
+            record = h2h[pair] = [0, 0]
+            h2h_games[i] = 0
+        else:
+            h2h_games[i] = record[0]
+            wins_low = record[1] / record[0]
+            h2h_winrate1[i] = wins_low if a < b else 1.0 - wins_low
+
+        result = 1 if won else 0
+        delta = K_FACTOR * (result - expected)
+        rating[a] = rating_a + delta
+        rating[b] = rating_b - delta
+        slot_a, slot_b = games_a % FORM_WINDOW, games_b % FORM_WINDOW
+        window_a[FORM_WINDOW] += result - window_a[slot_a]
+        window_b[FORM_WINDOW] += 1 - result - window_b[slot_b]
+        window_a[slot_a], window_b[slot_b] = result, 1 - result
+        games[a], games[b] = games_a + 1, games_b + 1
+        last_seen[a] = last_seen[b] = t
+        record[0] += 1
+        record[1] += result if a < b else 1 - result
+
+    if count:
+        last = count - 1
+        state.watermark = (matches.column("start_time_utc")[last].as_py(), matches.column("match_id")[last].as_py())
+    columns = {name: matches.column(name) for name in ("match_id", "start_time_utc", "team1_id", "team2_id")}
+    columns.update({name: pa.array(values) for name, values in out.items()})
+    columns["label"] = pa.array(won1.astype(np.int8))
+    return pa.table(columns)
+
+
+def update_feature_store(matches: pa.Table, root: Path = FEATURES_DIR, rebuild: bool = False) -> int:
+    """Append features for matches newer than the store's watermark; return how many."""
+    root.mkdir(parents=True, exist_ok=True)
+    state_path = root / STATE_NAME
+    if rebuild:
+        state_path.unlink(missing_ok=True)
+    state = TeamState.load(state_path)
+    # Drop files written by a run that did not get to save its state.
+    for path in root.glob("part-*.parquet"):
+        if int(path.stem.split("-")[1]) >= state.parts:
+            path.unlink()
+
+    new, late = _new_matches(matches, state)
+    if late:
+        logger.warning("%s matches are older than the feature store watermark; use --rebuild to include them", late)
+    if not new.num_rows:
+        return 0
+    features = compute_features(new, state)
+    pq.write_table(features, root / f"part-{state.parts:05d}.parquet")
+    state.parts += 1
+    state.rows += features.num_rows
+    state.save(state_path)
+    return features.num_rows
+
+
+def read_features(root: Path = FEATURES_DIR) -> pa.Table:
+    """Read all feature rows written by completed updates."""
+    state = TeamState.load(root / STATE_NAME)
+    if not state.parts:
+        raise ValueError(f"Feature store {root} is empty.")
+    return pa.concat_tables([pq.read_table(root / f"part-{part:05d}.parquet") for part in range(state.parts)])
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    setup_logging()
+    run(args)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Update the feature store for parsed command-line arguments."""
+    matches = read_matches(args.input, columns=MATCH_COLUMNS)
+    added = update_feature_store(matches, args.output, rebuild=args.rebuild)
+    logger.info("Added features for %s matches to %s", added, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,10 @@ import logging
 from pathlib import Path
 
 import catboost
-import pandas as pd
 
+from src.liquipedia.dataset import read_matches
 from src.liquipedia.logging_utils import setup_logging
+from src.modeling.features import FEATURE_COLUMNS, FEATURES_DIR, MATCH_COLUMNS, read_features, update_feature_store
 
 
 logger = logging.getLogger(__name__)
@@ -24,8 +25,11 @@ def parse_args() -> argparse.Namespace:
         "--input",
         type=Path,
         default=Path("data/processed/matches.parquet"),
-        help="Path to matches.parquet",
+        help="Path to matches.parquet or a partitioned dataset directory",
     )
+    parser.add_argument("--tiers", nargs="+", default=None, help="Only train on these tournament tiers")
+    parser.add_argument("--years", nargs="+", type=int, default=None, help="Only train on these years")
+    parser.add_argument("--features", type=Path, default=FEATURES_DIR, help="Feature store directory")
     parser.add_argument("--iterations", type=int, default=50, help="Number of boosting iterations")
     parser.add_argument("--output", type=Path, default=Path("reports/catboost_model.cbm"))
     return parser.parse_args()
@@ -35,14 +39,17 @@ def main() -> None:
     args = parse_args()
     setup_logging()
 
-    df = pd.read_parquet(args.input)
-    df = df.dropna(subset=["score1", "score2", "winner"])
+    # Ratings need every match, so the store is updated from the full dataset and filtered afterwards.
+    added = update_feature_store(read_matches(args.input, columns=MATCH_COLUMNS), args.features)
+    logger.info("Added features for %s matches", added)
+    wanted = read_matches(args.input, tiers=args.tiers, years=args.years, columns=["match_id"]).column("match_id")
+    df = read_features(args.features).to_pandas()
+    df = df[df["match_id"].isin(wanted.to_pylist())]
     if df.empty:
-        raise ValueError("No training data available. Ensure matches.parquet has scores and winners.")
+        raise ValueError("No training data available. Ensure matches.parquet has teams, start times and winners.")
 
-    df = df.assign(winner_label=(df["winner"] == "team1").astype(int))
-    features = df[["score1", "score2", "best_of"]].fillna(0)
-    target = df["winner_label"]
+    features = df[FEATURE_COLUMNS]
+    target = df["label"]
 
     model = catboost.CatBoostClassifier(
         iterations=args.iterations,
@@ -0,0 +1,27 @@
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import compare
+from src.liquipedia.extract_matches import extract_matches_from_wikitext
+
+
+def test_corpus_is_seeded_and_extractable():
+    corpus = generate_corpus(seed=7, pages=3, brackets=2, matches=4, prose=2)
+    assert corpus == generate_corpus(seed=7, pages=3, brackets=2, matches=4, prose=2)
+    assert corpus != generate_corpus(seed=8, pages=3, brackets=2, matches=4, prose=2)
+
+    title, wikitext = corpus[0]
+    matches = extract_matches_from_wikitext(wikitext, title, "S")
+    assert len(matches) == 8
+    assert all(match["team1"] and match["team2"] for match in matches)
+    assert all(match["start_time_utc"] for match in matches)
+    assert all(match["winner"] for match in matches)
+    assert all(match["maps"] for match in matches)
+    extracted = [match for title, text in corpus for match in extract_matches_from_wikitext(text, title, "S")]
+    assert len(extracted) == 3 * 2 * 4
+    assert all(match["team1"] and match["team2"] for match in extracted)
+    assert {match["source_template"] for match in extracted} == {"Match", "Match2"}
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {"results": {"parse": {"full_pages_per_s": 100.0}, "build": {"serial_cold_s": 1.0}}}
+    results = {"results": {"parse": {"full_pages_per_s": 70.0}, "build": {"serial_cold_s": 0.5}}}
+    assert compare(results, baseline, max_regression=0.15) == ["parse.full_pages_per_s (0.70x)"]
@@ -0,0 +1,49 @@
+from src.liquipedia.build_dataset import _iter_extracted
+from src.liquipedia.extraction_cache import ExtractionCache
+
+
+def _tasks():
+    for index in range(12):
+        wikitext = "\n".join(
+            f"{{{{Match|team1=T{index}a{n}|team2=T{index}b{n}|score1={n % 3}|score2=1|bestof=3|date=2024-02-0{n + 1}}}}}"
+            for n in range(3)
+        )
+        yield wikitext, f"Event {index}", "S"
+
+
+def test_parallel_extraction_matches_serial_order():
+    serial = list(_iter_extracted(_tasks(), workers=1))
+    parallel = list(_iter_extracted(_tasks(), workers=2))
+    assert parallel == serial
+    assert [title for title, _, _ in parallel] == [f"Event {index}" for index in range(12)]
+
+
+def test_extraction_cache_reuses_rows(tmp_path):
+    cache = ExtractionCache(tmp_path / "extraction.sqlite", fingerprint="v1")
+    first = list(_iter_extracted(_tasks(), workers=2, cache=cache))
+    assert (cache.hits, cache.misses) == (0, 12)
+    second = list(_iter_extracted(_tasks(), workers=1, cache=cache))
+    assert (cache.hits, cache.misses) == (12, 12)
+    assert second == first == list(_iter_extracted(_tasks(), workers=1))
+
+    stale = ExtractionCache(tmp_path / "extraction.sqlite", fingerprint="v2")
+    list(_iter_extracted(_tasks(), workers=1, cache=stale))
+    assert stale.misses == 12
+    assert stale.prune() == 12
+
+
+def test_full_provenance_survives_workers():
+    serial = list(_iter_extracted(_tasks(), workers=1, provenance="full"))
+    parallel = list(_iter_extracted(_tasks(), workers=2, provenance="full"))
+    assert parallel == serial
+    assert serial[0][2][0]["source_params"][0] == ["team1", "T0a0"]
+
+
+def test_failed_pages_are_reported_and_skipped():
+    tasks = list(_tasks())[:3]
+    tasks[1] = (None, "Broken", "S")
+    for workers in (1, 2):
+        failed = []
+        extracted = list(_iter_extracted(tasks, workers, on_error=lambda title, exc: failed.append(title)))
+        assert [title for title, _, _ in extracted] == ["Event 0", "Event 2"]
+        assert failed == ["Broken"]
@@ -0,0 +1,35 @@
+import json
+import time
+
+from src.liquipedia.cache import SQLiteCache
+
+
+def test_sqlite_cache_roundtrip_and_ttl(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite", ttl_seconds=60)
+    payload = {"query": {"pages": {"1": {"title": "Event Ä"}}}}
+    cache.put("abc", payload)
+    assert cache.get("abc") == payload
+    assert cache.get("missing") is None
+
+    cache.put("old", payload, fetched_at=time.time() - 120)
+    assert cache.get("old") is None
+    assert cache.evict() == 1
+
+
+def test_sqlite_cache_lru_eviction(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite", max_bytes=30)
+    cache.put("first", {"value": 1})
+    cache.put("second", {"value": 2})
+    assert cache.get("first") == {"value": 1}
+    assert cache.evict() == 1
+    assert cache.get("second") is None
+    assert cache.get("first") == {"value": 1}
+
+
+def test_import_json_dir(tmp_path):
+    source = tmp_path / "json"
+    source.mkdir()
+    (source / "deadbeef.json").write_text(json.dumps({"ok": True}, indent=2), encoding="utf-8")
+    cache = SQLiteCache(tmp_path / "cache.sqlite")
+    assert cache.import_json_dir(source) == 1
+    assert cache.get("deadbeef") == {"ok": True}
@@ -0,0 +1,55 @@
+import pyarrow.dataset as ds
+
+from src.liquipedia.dataset import MatchesDataset, load_dataset_manifest, read_matches
+from src.liquipedia.parquet_writer import MATCHES_SCHEMA, StreamingParquetWriter
+
+
+def _match(title, tier, start, n, score=1):
+    return {
+        "tournament_page": title,
+        "tournament_tier": tier,
+        "team1": f"A{n}",
+        "team2": f"B{n}",
+        "score1": score,
+        "score2": 0,
+        "start_time_utc": start,
+        "match_id": f"{title}-{n}-{score}",
+    }
+
+
+def _build(root, tournaments):
+    dataset = MatchesDataset(root)
+    with StreamingParquetWriter(dataset.staging_path, MATCHES_SCHEMA) as writer:
+        for title, matches in tournaments.items():
+            for match in matches:
+                writer.add(match)
+            dataset.track(title, matches)
+    return dataset.publish()
+
+
+def test_upsert_rewrites_only_touched_partitions(tmp_path):
+    root = tmp_path / "matches"
+    tournaments = {
+        "Major 2023": [_match("Major 2023", "S", "2023-05-01T12:00:00Z", n) for n in range(3)],
+        "Cup 2024": [_match("Cup 2024", "A", "2024-02-01T12:00:00Z", n) for n in range(2)],
+        "Open": [_match("Open", None, None, 0)],
+    }
+    assert _build(root, tournaments) == [
+        "tournament_tier=A/year=2024",
+        "tournament_tier=S/year=2023",
+        "tournament_tier=__HIVE_DEFAULT_PARTITION__/year=__HIVE_DEFAULT_PARTITION__",
+    ]
+    assert _build(root, tournaments) == []
+
+    tournaments["Cup 2024"] = [_match("Cup 2024", "A", "2024-02-01T12:00:00Z", 0, score=2)]
+    assert _build(root, tournaments) == ["tournament_tier=A/year=2024"]
+    manifest = load_dataset_manifest(root)
+    assert manifest["version"] == 2
+    assert manifest["files"]["tournament_tier=S/year=2023"] == "tournament_tier=S/year=2023/part-000001.parquet"
+
+    cup = read_matches(root, tiers=["A"]).to_pylist()
+    assert [(row["match_id"], row["score1"]) for row in cup] == [("Cup 2024-0-2", 2)]
+    assert read_matches(root).num_rows == 5
+    assert read_matches(root, years=[2023], columns=["match_id"]).column_names == ["match_id"]
+    assert read_matches(root, filter=ds.field("team1") == "A1").num_rows == 1
+    assert not (root / "_staging.parquet").exists()
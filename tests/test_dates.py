@@ -0,0 +1,29 @@
+from datetime import timezone
+
+import pytest
+from dateutil import parser as date_parser
+
+from src.liquipedia.dates import _fast_parse, parse_datetime_utc
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["2024-01-01", "2024-01-01 12:00", "2024-02-09 - 13:30", "February 3, 2024 - 12:00", "Feb 3rd, 2024 9:05"],
+)
+def test_fast_path_agrees_with_dateutil(text):
+    expected = date_parser.parse(text).replace(tzinfo=timezone.utc)
+    assert _fast_parse(text) == expected
+
+
+def test_timezone_abbreviations_are_applied():
+    assert parse_datetime_utc("February 3, 2024 - 12:00 {{Abbr/CET}}", None) == "2024-02-03T11:00:00+00:00"
+    assert parse_datetime_utc("2024-06-01", "18:30 {{Abbr/CEST}}") == "2024-06-01T16:30:00+00:00"
+    assert parse_datetime_utc("2024-06-01 18:30", "EDT") == "2024-06-01T22:30:00+00:00"
+
+
+def test_fallback_and_invalid_inputs():
+    assert parse_datetime_utc("3 February 2024", None) == "2024-02-03T00:00:00+00:00"
+    assert parse_datetime_utc("2024-01-05T18:00:00.250Z", None) == "2024-01-05T18:00:00+00:00"
+    assert parse_datetime_utc("TBD", None) is None
+    assert parse_datetime_utc("2024-02-30", None) is None
+    assert parse_datetime_utc(None, None) is None
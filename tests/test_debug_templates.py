@@ -0,0 +1,25 @@
+from src.liquipedia.debug_templates import census_report, run_census
+from src.liquipedia.page_store import PackedPageStore
+
+PAGES = {
+    "Cup": "{{Match|team1=A|team2=B|date=2024}}{{MatchNew|opponent1=A|opponent2=B}}",
+    "League": "{{MatchNew|opponent1=C|opponent2=D|bo=3}}{{TeamCard|team=C}}",
+    "Show": "{{MatchNew|opponent1=E}}{{TeamCard|team=E}}",
+}
+
+
+def test_census_merges_counts_across_workers_and_flags_unconfigured_templates(tmp_path):
+    store = PackedPageStore(tmp_path)
+    for title, text in PAGES.items():
+        store.put(title, text)
+    pages = sorted(store.refs().items()) * 40
+
+    census = run_census(pages, workers=2)
+    report = census_report(census, len(pages))
+
+    assert report["templates"]["MatchNew"]["calls"] == 120
+    assert report["templates"]["MatchNew"]["pages"] == 120
+    assert report["templates"]["MatchNew"]["params"] == {"opponent1": 120, "opponent2": 80, "bo": 40}
+    assert report["templates"]["MatchNew"]["examples"] == ["Cup", "League", "Show"]
+    assert [entry["name"] for entry in report["unconfigured_match_templates"]] == ["MatchNew"]
+    assert census == run_census(pages, workers=1)
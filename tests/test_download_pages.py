@@ -0,0 +1,58 @@
+import json
+
+from src.liquipedia.download_pages import parse_args, run
+from src.liquipedia.page_manifest import load_manifest, manifest_path
+from src.liquipedia.page_store import PAGES_DIR
+
+
+class WikiClient:
+    def __init__(self, revids):
+        self.revids = revids
+        self.fetched = []
+        self.cache = {}
+
+    def _key(self, params):
+        return tuple(sorted(params.items()))
+
+    def get_cached(self, params):
+        return self.cache.get(self._key(params))
+
+    def store_cached(self, params, data):
+        self.cache[self._key(params)] = data
+
+    def get_json(self, params, use_cache=True):
+        titles = params["titles"].split("|")
+        pages = {}
+        for index, title in enumerate(titles):
+            page = {"pageid": index + 1, "title": title, "lastrevid": self.revids[title], "touched": "T"}
+            if params["prop"] == "revisions":
+                revision = {"revid": self.revids[title], "timestamp": "T", "slots": {"main": {"*": title}}}
+                page = {"pageid": index + 1, "title": title, "revisions": [revision]}
+            pages[str(index + 1)] = page
+        if params["prop"] == "revisions":
+            self.fetched.append(titles)
+        return {"query": {"pages": pages}}
+
+
+def test_every_download_records_revisions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tournaments = tmp_path / "tournaments.jsonl"
+    tournaments.write_text("".join(json.dumps({"title": title}) + "\n" for title in ["A", "B"]), encoding="utf-8")
+    client = WikiClient({"A": 1, "B": 1})
+    base = ["--input", str(tournaments), "--page_store", "files"]
+
+    run(parse_args(base), client)
+    assert {title: entry["lastrevid"] for title, entry in load_manifest(manifest_path(PAGES_DIR)).items()} == {
+        "A": 1,
+        "B": 1,
+    }
+
+    # The first refresh after a plain download only fetches pages edited since.
+    client.revids["B"] = 2
+    run(parse_args([*base, "--refresh"]), client)
+    assert client.fetched == [["A", "B"], ["B"]]
+    assert load_manifest(manifest_path(PAGES_DIR))["B"]["lastrevid"] == 2
+
+    # --force bypasses the response cache.
+    run(parse_args([*base, "--force"]), client)
+    assert client.fetched[-1] == ["A", "B"]
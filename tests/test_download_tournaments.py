@@ -0,0 +1,54 @@
+import json
+
+from src.liquipedia.download_tournaments import discover, load_state
+
+
+class CategoryClient:
+    def __init__(self, members):
+        self.members = members
+        self.requests = []
+
+    def get_json(self, params, use_cache=True):
+        assert params["cmsort"] == "timestamp" and not use_cache
+        self.requests.append(params)
+        start = params.get("cmstart", "")
+        members = [member for member in self.members[params["cmtitle"]] if member["timestamp"] >= start]
+        return {"query": {"categorymembers": members}}
+
+
+def _member(title, timestamp):
+    return {"title": title, "pageid": hash(title) % 1000, "timestamp": timestamp}
+
+
+def test_discover_appends_only_new_members(tmp_path):
+    output = tmp_path / "tournaments.jsonl"
+    state = tmp_path / "state.json"
+    output.write_text(json.dumps({"title": "Major 2023", "pageid": 1, "tier": "S"}) + "\n", encoding="utf-8")
+    client = CategoryClient(
+        {
+            "Category:S-Tier_Tournaments": [
+                _member("Major 2023", "2023-01-01T00:00:00Z"),
+                _member("Major 2024", "2024-01-01T00:00:00Z"),
+            ],
+            "Category:Qualifier_Tournaments": [_member("Major 2024 Qualifier", "2023-12-01T00:00:00Z")],
+        }
+    )
+
+    assert discover(client, ["S", "Qualifier"], output, state) == 2
+    assert load_state(state) == {
+        "S-Tier_Tournaments": "2024-01-01T00:00:00Z",
+        "Qualifier_Tournaments": "2023-12-01T00:00:00Z",
+    }
+
+    client.members["Category:S-Tier_Tournaments"].append(_member("Major 2025", "2025-01-01T00:00:00Z"))
+    client.requests.clear()
+    assert discover(client, ["S"], output, state) == 1
+    assert client.requests[0]["cmstart"] == "2024-01-01T00:00:00Z"
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [(record["title"], record["tier"]) for record in records] == [
+        ("Major 2023", "S"),
+        ("Major 2024", "S"),
+        ("Major 2024 Qualifier", "Qualifier"),
+        ("Major 2025", "S"),
+    ]
@@ -21,3 +21,48 @@ def test_best_of_and_winner_logic():
     matches = extract_matches_from_wikitext(wikitext, "Test Event", "A")
     assert matches[0]["best_of"] == 5
     assert matches[0]["winner"] == "team2"
+
+
+def test_provenance_modes():
+    wikitext = "{{Match|team1=Foo|team2=Bar|score1=1|score2=3|bestof=5}}"
+    off = extract_matches_from_wikitext(wikitext, "Test Event", "A", provenance="off")
+    compact = extract_matches_from_wikitext(wikitext, "Test Event", "A")
+    full = extract_matches_from_wikitext(wikitext, "Test Event", "A", provenance="full")
+    assert off[0]["source_template"] is None and "source_params" not in off[0]
+    assert compact[0]["source_template"] == "Match" and "source_params" not in compact[0]
+    assert full[0]["source_params"][:2] == [["team1", "Foo"], ["team2", "Bar"]]
+
+
+def test_map_rows_from_nested_and_legacy_params():
+    wikitext = """
+    {{Match|team1=Foo|team2=Bar|score1=2|score2=0
+    |map1={{Map|map=Anubis|score1=13|score2=9|winner=1|pick=2|t1firstside=CT|finished=true}}
+    |map2={{Map|map=Nuke|score1=16|score2=14|finished=true}}
+    |map3={{Map|map=Inferno|finished=skip}}
+    }}
+    {{Match2|team1=Foo|team2=Baz|map1=Mirage|map1win=2|map2=Ancient}}
+    {{Match2|team1=Foo|team2=Qux|maplist=Vertigo, Overpass}}
+    """
+    first, second, third = (match["maps"] for match in extract_matches_from_wikitext(wikitext, "Test Event", "S"))
+    assert first == [[1, "Anubis", 13, 9, "team1", "team2", "ct"], [2, "Nuke", 16, 14, "team1", None, None]]
+    assert second == [[1, "Mirage", None, None, "team2", None, None], [2, "Ancient", None, None, None, None, None]]
+    assert [row[1] for row in third] == ["Vertigo", "Overpass"]
+
+
+def test_nested_match_maps_are_not_matches():
+    wikitext = """
+    {{Match2|opponent1=Foo|opponent2=Bar|team1score=2|team2score=1|bestof=3|date=2024-03-01 18:00
+    |map1={{MatchMap|map=Anubis|team1score=13|team2score=9|winner=1}}
+    |map2={{MatchMap|map=Nuke|team1score=7|team2score=13|winner=2}}
+    |map3={{MatchMap|map=Mirage|team1score=13|team2score=4|winner=1}}
+    }}
+    {{MatchMap|team1=Foo|team2=Baz|score1=1|score2=0|map=Dust2}}
+    {{MatchList|id=L1|M1={{Match|team1=Foo|team2=Qux|score1=2|score2=0}}}}
+    """
+    for prefilter in (True, False):
+        matches = extract_matches_from_wikitext(wikitext, "Test Event", "S", prefilter=prefilter)
+        summary = [(match["source_template"], match["team2"]) for match in matches]
+        assert summary == [("Match2", "Bar"), ("MatchMap", "Baz"), ("Match", "Qux")]
+        assert matches[0]["map_list"] == "Anubis,Nuke,Mirage"
+        assert [row[4] for row in matches[0]["maps"]] == ["team1", "team2", "team1"]
+        assert matches[1]["map_list"] == "Dust2"
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.modeling.features import read_features, update_feature_store
+
+
+def _matches(rows):
+    return pa.table(
+        {
+            "match_id": [f"m{n:03d}" for n in range(len(rows))],
+            "start_time_utc": [f"2024-01-{day:02d}T12:00:00+00:00" for day, _, _, _ in rows],
+            "team1_id": pa.array([a for _, a, _, _ in rows], pa.int32()),
+            "team2_id": pa.array([b for _, _, b, _ in rows], pa.int32()),
+            "winner": [winner for _, _, _, winner in rows],
+        }
+    )
+
+
+ROWS = [
+    (1, 0, 1, "team1"),
+    (3, 1, 0, "team1"),
+    (4, 0, 2, None),
+    (5, 2, 0, "team2"),
+    (8, 0, 1, "team1"),
+]
+
+
+def test_features_are_pre_match_and_incremental(tmp_path):
+    full = tmp_path / "full"
+    assert update_feature_store(_matches(ROWS), full) == 4
+    first, second, third, fourth = read_features(full).to_pylist()
+    assert first["elo1"] == first["elo2"] == 1500.0 and first["games1"] == 0
+    assert np.isnan(first["days_since1"]) and np.isnan(first["form1"])
+    assert second["elo1"] < 1500.0 < second["elo2"]
+    assert second["h2h_games"] == 1 and second["h2h_winrate1"] == 0.0
+    assert second["days_since1"] == 2.0
+    assert third["team1_id"] == 2 and third["label"] == 0
+    assert fourth["form1"] == pytest.approx(2 / 3)
+    assert fourth["h2h_winrate1"] == 0.5
+
+    incremental = tmp_path / "incremental"
+    assert update_feature_store(_matches(ROWS[:2]), incremental) == 2
+    assert update_feature_store(_matches(ROWS[:2]), incremental) == 0
+    assert update_feature_store(_matches(ROWS), incremental) == 2
+    pd.testing.assert_frame_equal(read_features(incremental).to_pandas(), read_features(full).to_pandas())
+
+
+def test_fractional_seconds_are_accepted(tmp_path):
+    matches = _matches(ROWS[:2])
+    times = ["2024-01-01T12:00:00.500000+00:00", "2024-01-03T12:00:00+00:00"]
+    matches = matches.set_column(1, "start_time_utc", pa.array(times))
+    assert update_feature_store(matches, tmp_path) == 2
+    assert read_features(tmp_path).column("days_since1").to_pylist()[1] == pytest.approx(2.0, abs=1e-4)
@@ -0,0 +1,74 @@
+import bz2
+import gzip
+
+from src.liquipedia.ingest_dump import ingest_dump, page_categories
+from src.liquipedia.page_manifest import load_manifest, manifest_path, save_manifest
+
+PAGE = """  <page>
+    <title>{title}</title>
+    <ns>{ns}</ns>
+    <id>{pageid}</id>{redirect}
+    <revision>
+      <id>{pageid}00</id>
+      <timestamp>2024-03-01T10:00:00Z</timestamp>
+      <text bytes="10" xml:space="preserve">{text}</text>
+    </revision>
+  </page>
+"""
+
+
+def _dump(pages):
+    body = "".join(
+        PAGE.format(
+            title=title,
+            ns=ns,
+            pageid=pageid,
+            text=text,
+            redirect='\n    <redirect title="Elsewhere" />' if text.startswith("#REDIRECT") else "",
+        )
+        for pageid, (title, ns, text) in enumerate(pages, start=1)
+    )
+    return (
+        '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" version="0.11">\n'
+        "  <siteinfo><sitename>Liquipedia</sitename></siteinfo>\n" + body + "</mediawiki>\n"
+    ).encode("utf-8")
+
+
+PAGES = [
+    ("IEM Katowice 2024", 0, "{{Infobox league|liquipediatier=1}} {{Match|team1=A|team2=B}}"),
+    ("Some Cup", 0, "{{Infobox league|liquipediatier=3}} [[Category:Online Tournaments]]"),
+    ("Katowice", 0, "#REDIRECT [[IEM Katowice 2024]]"),
+    ("Template:Match", 10, "template body"),
+]
+
+
+def test_ingest_filters_by_title_and_records_revisions(tmp_path):
+    dump = tmp_path / "dump.xml.bz2"
+    dump.write_bytes(bz2.compress(_dump(PAGES)))
+    pages_dir = tmp_path / "pages"
+    records = ingest_dump(dump, pages_dir, titles={"IEM_Katowice_2024", "Katowice"})
+    assert records == [{"title": "IEM Katowice 2024", "pageid": 1, "tier": "S"}]
+    assert (pages_dir / "IEM_Katowice_2024.wikitext").read_text(encoding="utf-8") == PAGES[0][2]
+    assert load_manifest(manifest_path(pages_dir))["IEM Katowice 2024"]["lastrevid"] == 100
+
+
+def test_ingest_filters_by_category(tmp_path):
+    dump = tmp_path / "dump.xml.gz"
+    dump.write_bytes(gzip.compress(_dump(PAGES)))
+    records = ingest_dump(dump, tmp_path / "pages", categories=["B-Tier_Tournaments"])
+    assert [record["title"] for record in records] == ["Some Cup"]
+    assert page_categories(PAGES[1][2]) == {"Online Tournaments", "B-Tier Tournaments"}
+
+
+def test_ingest_keeps_manifest_of_existing_pages(tmp_path):
+    dump = tmp_path / "dump.xml"
+    dump.write_bytes(_dump(PAGES))
+    pages_dir = tmp_path / "pages"
+    pages_dir.mkdir()
+    (pages_dir / "IEM_Katowice_2024.wikitext").write_text("older text", encoding="utf-8")
+    entry = {"pageid": 1, "lastrevid": 42, "touched": "2023-01-01T00:00:00Z"}
+    save_manifest(manifest_path(pages_dir), {"IEM Katowice 2024": entry})
+
+    ingest_dump(dump, pages_dir, titles={"IEM Katowice 2024"})
+    assert (pages_dir / "IEM_Katowice_2024.wikitext").read_text(encoding="utf-8") == "older text"
+    assert load_manifest(manifest_path(pages_dir))["IEM Katowice 2024"] == entry
@@ -0,0 +1,82 @@
+import argparse
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.liquipedia.download_pages import parse_args as download_args
+from src.liquipedia.jobs import JobManifest, in_shard, parse_shard, shard_suffix
+from src.liquipedia.merge_shards import merge_shards, sidecar_inputs
+from src.liquipedia.parquet_writer import MATCH_PARAMS_SCHEMA, MATCHES_SCHEMA, StreamingParquetWriter
+
+
+def _records(count):
+    return [{"title": f"Tournament {index}", "pageid": index, "tier": "S"} for index in range(count)]
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard("4/4")
+    assert shard_suffix((0, 1)) == ""
+    assert shard_suffix((2, 8)) == "-002-of-008"
+
+    with pytest.raises(SystemExit):
+        download_args(["--input", "t.jsonl", "--jobs", "jobs.sqlite", "--refresh"])
+
+
+def test_shards_partition_titles(tmp_path):
+    manifest = JobManifest(tmp_path / "jobs.sqlite")
+    assert manifest.sync(_records(40)) == 40
+    assert manifest.sync(_records(45)) == 5
+    claimed = {shard: [job["title"] for job in manifest.claim((shard, 3), limit=100)] for shard in range(3)}
+    assert all(in_shard(title, (shard, 3)) for shard, titles in claimed.items() for title in titles)
+    assert sorted(sum(claimed.values(), [])) == sorted(record["title"] for record in _records(45))
+    assert sum(manifest.counts((shard, 3))["pending"] for shard in range(3)) == 45
+
+
+def test_leases_and_retries(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    first = JobManifest(path, owner="a", lease_seconds=60, max_attempts=2)
+    second = JobManifest(path, owner="b", lease_seconds=60)
+    crashed = JobManifest(path, owner="c", lease_seconds=-1)
+    first.sync(_records(3))
+
+    claimed = [job["title"] for job in first.claim(limit=2)]
+    assert claimed == ["Tournament 0", "Tournament 1"]
+    assert [job["title"] for job in crashed.claim()] == ["Tournament 2"]
+    assert [job["title"] for job in second.claim()] == ["Tournament 2"]
+    assert second.claim() == []
+
+    first.mark(claimed[:1], "fetched")
+    first.mark(claimed[1:], "failed", error="timeout")
+    assert first.counts() == {"pending": 1, "fetched": 1, "extracted": 0, "failed": 1}
+    assert [job["title"] for job in first.claim()] == ["Tournament 1"]
+    first.mark(["Tournament 1"], "failed", error="timeout")
+    assert first.claim() == []
+
+
+def test_merge_shards_drops_duplicates(tmp_path):
+    paths = []
+    for shard, ids in enumerate([["a", "b"], ["b", "c"]]):
+        path = tmp_path / f"matches-{shard:03d}-of-002.parquet"
+        with StreamingParquetWriter(path, MATCHES_SCHEMA) as writer:
+            for match_id in ids:
+                writer.add({"match_id": match_id, "tournament_page": f"Page {shard}"})
+        paths.append(path)
+
+    writer = merge_shards(paths, tmp_path / "matches.parquet")
+    assert (writer.rows_written, writer.duplicates_dropped) == (3, 1)
+    assert pq.read_table(tmp_path / "matches.parquet").column("match_id").to_pylist() == ["a", "b", "c"]
+
+
+def test_merge_shards_keeps_match_params(tmp_path):
+    paths = [tmp_path / f"matches-{shard:03d}-of-002.parquet" for shard in range(2)]
+    with StreamingParquetWriter(tmp_path / "match_params-001-of-002.parquet", MATCH_PARAMS_SCHEMA) as writer:
+        writer.add({"match_id": "c", "key": "team1", "value": "NaVi"})
+    params = sidecar_inputs(paths, "match_params")
+    assert params == [tmp_path / "match_params-001-of-002.parquet"]
+
+    merge_shards(params, tmp_path / "match_params.parquet", schema=MATCH_PARAMS_SCHEMA, dedup_key=None)
+    assert pq.read_table(tmp_path / "match_params.parquet").to_pylist() == [
+        {"match_id": "c", "key": "team1", "value": "NaVi"}
+    ]
@@ -1,11 +1,11 @@
-from src.liquipedia.mediawiki import iter_category_members
+from src.liquipedia.mediawiki import get_page_info, get_wikitext, get_wikitexts, iter_category_members
 
 
 class DummyClient:
     def __init__(self):
         self.calls = 0
 
-    def get_json(self, params):
+    def get_json(self, params, use_cache=True):
         self.calls += 1
         if self.calls == 1:
             return {
@@ -23,3 +23,66 @@ def test_iter_category_members_pagination():
     assert len(members) == 2
     assert members[0]["title"] == "Event 1"
     assert members[1]["title"] == "Event 2"
+
+
+class BatchClient:
+    def __init__(self):
+        self.requests = []
+        self.cache = {}
+
+    def _key(self, params):
+        return tuple(sorted(params.items()))
+
+    def get_cached(self, params):
+        return self.cache.get(self._key(params))
+
+    def store_cached(self, params, data):
+        self.cache[self._key(params)] = data
+
+    def get_json(self, params, use_cache=True):
+        self.requests.append(params)
+        return {
+            "query": {
+                "normalized": [{"from": "event_1", "to": "Event 1"}],
+                "redirects": [{"from": "Old Event", "to": "Event 2"}],
+                "pages": {
+                    "1": {"pageid": 1, "title": "Event 1", "revisions": [{"slots": {"main": {"*": "one"}}}]},
+                    "2": {"pageid": 2, "title": "Event 2", "revisions": [{"slots": {"main": {"*": "two"}}}]},
+                    "-1": {"title": "Gone", "missing": ""},
+                },
+            }
+        }
+
+
+def test_get_wikitexts_batches_and_caches_per_page():
+    client = BatchClient()
+    texts = get_wikitexts(client, ["event_1", "Old Event", "Gone"])
+    assert texts == {"event_1": "one", "Old Event": "two", "Gone": ""}
+    assert len(client.requests) == 1
+    assert client.requests[0]["titles"] == "event_1|Old Event|Gone"
+
+    assert get_wikitext(client, "Old Event") == "two"
+    assert len(client.requests) == 1
+
+
+class InfoClient:
+    def __init__(self):
+        self.use_cache = []
+
+    def get_json(self, params, use_cache=True):
+        self.use_cache.append(use_cache)
+        return {
+            "query": {
+                "pages": {
+                    "1": {"pageid": 1, "title": "Event 1", "lastrevid": 42, "touched": "2024-05-01T00:00:00Z"},
+                    "-1": {"title": "Gone", "missing": ""},
+                }
+            }
+        }
+
+
+def test_get_page_info_skips_cache_and_missing_pages():
+    client = InfoClient()
+    info = get_page_info(client, ["Event 1", "Gone"])
+    assert info == {"Event 1": {"pageid": 1, "lastrevid": 42, "touched": "2024-05-01T00:00:00Z"}}
+    assert client.use_cache == [False]
@@ -0,0 +1,33 @@
+import json
+
+from src.liquipedia.metrics import Metrics
+
+
+def test_metrics_snapshot_tracks_slowest_and_ratios(tmp_path):
+    metrics = Metrics(slowest_n=2)
+    for seconds, page in [(0.2, "A"), (0.004, "B"), (1.5, "C")]:
+        metrics.observe("extract.page", seconds, page)
+    metrics.incr("cache.hits", 3)
+    metrics.incr("cache.misses")
+
+    snapshot = metrics.snapshot()
+    timer = snapshot["timers"]["extract.page"]
+    assert timer["count"] == 3
+    assert timer["max_s"] == 1.5
+    assert timer["buckets"]["le_0.005s"] == 1
+    assert [entry["item"] for entry in snapshot["slowest"]["extract.page"]] == ["C", "A"]
+    assert snapshot["ratios"] == {"cache.hit_ratio": 0.75}
+
+    path = tmp_path / "metrics.json"
+    metrics.write(path, {"command": "test"})
+    assert json.loads(path.read_text())["command"] == "test"
+
+
+def test_drain_and_merge_counters():
+    worker = Metrics()
+    worker.incr("dates.fast_path", 2)
+    parent = Metrics()
+    parent.incr("dates.fast_path")
+    parent.merge_counters(worker.drain_counters())
+    assert parent.counters == {"dates.fast_path": 3}
+    assert worker.counters == {}
@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.liquipedia.build_dataset import _iter_extracted, _iter_pages
+from src.liquipedia.extraction_cache import ExtractionCache, content_hash
+from src.liquipedia.page_store import FilePageStore, PackedPageStore, PageRef, pack_pages, read_page
+
+PAGE = """{{Match
+|opponent1={{TeamOpponent|Alpha}}
+|opponent2={{TeamOpponent|Beta}}
+|date=2024-01-05 18:00 {{Abbr/CET}}
+}}"""
+
+
+def test_packed_store_deduplicates_and_keeps_titles_apart(tmp_path):
+    store = PackedPageStore(tmp_path / "corpus")
+    # Both titles map to the same file name in the file layout.
+    store.put("A/B", "first")
+    store.put("A?B", "second")
+    store.put("Copy", "first")
+
+    assert store.get("A/B") == "first"
+    assert store.get("A?B") == "second"
+    assert store.ref("Copy").offset == store.ref("A/B").offset
+    assert store.ref("Copy").sha1 == content_hash("first")
+    assert (tmp_path / "corpus" / "pages-00000.pack").stat().st_size == len("firstsecond")
+    store.close()
+
+    reopened = PackedPageStore(tmp_path / "corpus")
+    assert reopened.get("A?B") == "second"
+    assert not reopened.has("Missing")
+    reopened.close()
+
+
+def test_empty_page_in_empty_shard_reads_back(tmp_path):
+    store = PackedPageStore(tmp_path)
+    store.put("Empty", "")
+    assert store.get("Empty") == ""
+    assert read_page(store.ref("Empty")) == ""
+    store.close()
+
+
+def test_packed_store_rotates_shards_and_rolls_back_failed_batches(tmp_path):
+    store = PackedPageStore(tmp_path, shard_bytes=8)
+    store.put("One", "12345")
+    store.put("Two", "67890")
+    assert store.ref("Two").path.endswith("pages-00001.pack")
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.put("Three", "abc")
+            raise RuntimeError("interrupted")
+    assert not store.has("Three")
+    store.close()
+    assert not PackedPageStore(tmp_path).has("Three")
+
+
+def test_refs_are_readable_in_worker_processes(tmp_path):
+    store = PackedPageStore(tmp_path)
+    store.put("Page", "ünïcode")
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(read_page, store.ref("Page")).result() == "ünïcode"
+
+
+def test_build_reads_packed_pages_and_uses_ref_hash_for_cache(tmp_path):
+    files = FilePageStore(tmp_path / "pages")
+    files.put("Cup", PAGE)
+    store = PackedPageStore(tmp_path / "corpus")
+    assert pack_pages(["Cup", "Missing"], files, store) == 1
+
+    tasks = list(_iter_pages([{"title": "Cup", "tier": "S"}, {"title": "Missing"}], store, None))
+    assert len(tasks) == 1
+    assert isinstance(tasks[0][0], PageRef)
+
+    cache = ExtractionCache(tmp_path / "cache.sqlite", "v1")
+    [(title, tier, matches)] = list(_iter_extracted(tasks, workers=1, cache=cache))
+    assert (title, tier, matches[0]["team1"]) == ("Cup", "S", "{{TeamOpponent|Alpha}}")
+    assert cache.get(content_hash(PAGE), "Cup", "S") is not None
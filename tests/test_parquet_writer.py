@@ -0,0 +1,26 @@
+import pyarrow.parquet as pq
+
+from src.liquipedia.parquet_writer import MATCHES_SCHEMA, StreamingParquetWriter
+
+
+def test_streaming_writer_dedups_and_flushes_row_groups(tmp_path):
+    path = tmp_path / "matches.parquet"
+    with StreamingParquetWriter(path, MATCHES_SCHEMA, row_group_size=2) as writer:
+        for index in [1, 2, 1, 3, 2, 4, 5]:
+            writer.add({"match_id": f"id{index}", "team1": f"T{index}", "score1": index})
+
+    assert writer.rows_written == 5
+    assert writer.duplicates_dropped == 2
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == MATCHES_SCHEMA
+    table = parquet.read()
+    assert table.column("match_id").to_pylist() == ["id1", "id2", "id3", "id4", "id5"]
+    assert table.column("score2").null_count == 5
+
+
+def test_streaming_writer_writes_empty_file_with_schema(tmp_path):
+    path = tmp_path / "matches.parquet"
+    with StreamingParquetWriter(path, MATCHES_SCHEMA):
+        pass
+    assert pq.read_table(path).schema == MATCHES_SCHEMA
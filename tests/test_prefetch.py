@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from src.liquipedia.prefetch import iter_prefetched
+
+
+def test_prefetch_preserves_order_and_bounds_queue():
+    produced = []
+
+    def producer():
+        for index in range(10):
+            produced.append(index)
+            yield index
+
+    items = iter_prefetched(producer(), maxsize=2)
+    assert next(items) == 0
+    threading.Event().wait(0.3)
+    assert len(produced) <= 4
+    assert list(items) == list(range(1, 10))
+
+
+def test_prefetch_reraises_producer_errors():
+    def producer():
+        yield 1
+        raise RuntimeError("fetch failed")
+
+    items = iter_prefetched(producer(), maxsize=4)
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        next(items)
+
+
+def test_prefetch_stops_producer_on_close():
+    produced = []
+
+    def producer():
+        for index in range(1000):
+            produced.append(index)
+            yield index
+
+    items = iter_prefetched(producer(), maxsize=1)
+    next(items)
+    items.close()
+    count = len(produced)
+    threading.Event().wait(0.3)
+    assert len(produced) == count < 1000
+
+
+def test_close_waits_for_producer_cleanup():
+    events = []
+
+    def producer():
+        try:
+            yield 0
+            # Still busy (e.g. in an HTTP call) when the consumer closes.
+            threading.Event().wait(1.2)
+            yield 1
+        finally:
+            events.append("producer closed")
+
+    items = iter_prefetched(producer(), maxsize=1)
+    next(items)
+    items.close()
+    events.append("consumer closed")
+    assert events == ["producer closed", "consumer closed"]
@@ -0,0 +1,60 @@
+import pyarrow as pa
+
+from src.liquipedia.parquet_writer import MATCHES_SCHEMA, StreamingParquetWriter
+from src.liquipedia.quality import QualityReport, quality_report
+
+
+def _match(match_id, page, template="Match", **values):
+    row = {"match_id": match_id, "tournament_page": page, "tournament_tier": "S", "source_template": template}
+    row.update(values)
+    return row
+
+
+ROWS = [
+    _match("1", "A", team1="x", team2="y", score1=2, score2=1, best_of=3, start_time_utc="2024-01-01T10:00:00+00:00"),
+    _match("2", "A", team1="x", team2="y", score1=3, score2=1, best_of=3, start_time_utc="2024-01-01T10:00:00+00:00"),
+    _match("3", "A", team1="x", team2="z", score1=13, score2=7, best_of=1, start_time_utc="2024-01-02T10:00:00+00:00"),
+    _match("4", "B", "Match2", team1="x", best_of=1),
+]
+
+
+def test_report_groups_flags_across_row_groups(tmp_path):
+    report = QualityReport()
+    path = tmp_path / "matches.parquet"
+    with StreamingParquetWriter(path, MATCHES_SCHEMA, row_group_size=2, on_flush=report.update) as writer:
+        for row in ROWS:
+            writer.add(row)
+
+    result = report.result()
+    assert result["overall"]["rows"] == 4
+    assert result["overall"]["problem"] == 2
+    first, second = result["by_tournament"]
+    assert (first["tournament_page"], first["rows"], first["bad_scores"], first["duplicates"]) == ("A", 3, 1, 2)
+    assert first["first_match"] == "2024-01-01T10:00:00+00:00"
+    assert first["last_match"] == "2024-01-02T10:00:00+00:00"
+    assert second["missing_teams_rate"] == second["missing_scores_rate"] == 1.0
+    assert [page["tournament_page"] for page in result["suspect_pages"]] == ["B", "A"]
+    assert [group["source_template"] for group in result["by_template"]] == ["Match", "Match2"]
+    assert quality_report(path) == result
+
+
+def test_empty_report_has_no_groups():
+    report = QualityReport()
+    report.update(pa.Table.from_pylist([], schema=MATCHES_SCHEMA))
+    result = report.result()
+    assert result["by_tournament"] == result["suspect_pages"] == []
+    assert result["overall"]["rows"] is None
+
+
+def test_duplicates_count_every_repeated_row_across_batches_and_groups():
+    report = QualityReport()
+    when = "2024-01-01T10:00:00+00:00"
+    batches = [
+        [_match("1", "A", team1="x", team2="y", start_time_utc=when)],
+        [_match("2", "C", team1="x", team2="y", start_time_utc=when)],
+        [_match("3", "C", team1="x", team2="y", start_time_utc=when), _match("4", "C", team1="x", team2="z")],
+    ]
+    for rows in batches:
+        report.update(pa.Table.from_pylist(rows, schema=MATCHES_SCHEMA))
+    duplicates = {row["tournament_page"]: row["duplicates"] for row in report.result()["by_tournament"]}
+    assert duplicates == {"A": 1, "C": 2}
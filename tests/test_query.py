@@ -0,0 +1,63 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.liquipedia.query import MatchIndex, index_path
+from src.liquipedia.parquet_writer import MATCHES_SCHEMA
+
+TEAMS = ["Alpha", "Beta", "Gamma"]
+MATCHES = [
+    ("m1", "2024-01-05T18:00:00+00:00", 0, 1),
+    ("m2", "2024-01-03T12:00:00+00:00", 1, 2),
+    ("m3", "2024-02-10T09:00:00+00:00", 1, 0),
+    ("m4", None, 0, 2),
+    ("m5", "2024-03-01T00:00:00+00:00", 2, None),
+]
+
+
+def _write(path):
+    rows = [
+        {
+            "match_id": match_id,
+            "start_time_utc": start,
+            "team1_id": team1,
+            "team2_id": team2,
+            "team1_canonical": None if team1 is None else TEAMS[team1],
+            "team2_canonical": None if team2 is None else TEAMS[team2],
+        }
+        for match_id, start, team1, team2 in MATCHES
+    ]
+    pq.write_table(pa.Table.from_pylist(rows, schema=MATCHES_SCHEMA), path)
+
+
+def test_lookups_use_team_pair_and_time_indexes(tmp_path):
+    path = tmp_path / "matches.parquet"
+    _write(path)
+    index = MatchIndex.open(path, columns=["match_id", "start_time_utc"])
+    assert index_path(path).exists()
+
+    assert index.team_matches("Alpha").column("match_id").to_pylist() == ["m1", "m3", "m4"]
+    assert index.team_matches("Beta", start="2024-01-04").column("match_id").to_pylist() == ["m1", "m3"]
+    assert index.head_to_head("Beta", "Alpha", end="2024-02-01").column("match_id").to_pylist() == ["m1"]
+    assert index.head_to_head("Alpha", "Nobody").num_rows == 0
+    between = index.between("2024-01-01", "2024-02-01", columns=["match_id"])
+    assert between.column_names == ["match_id"]
+    assert between.column("match_id").to_pylist() == ["m2", "m1"]
+    assert index.between().column("match_id").to_pylist() == ["m2", "m1", "m3", "m5"]
+
+    reopened = MatchIndex.open(path)
+    assert reopened.teams == index.teams
+    assert reopened.table.num_columns == len(MATCHES_SCHEMA)
+    assert reopened.team_matches(2).column("match_id").to_pylist() == ["m2", "m5", "m4"]
+
+
+def test_bounded_lookups_skip_undated_matches(tmp_path):
+    path = tmp_path / "matches.parquet"
+    _write(path)
+    index = MatchIndex.open(path, columns=["match_id"])
+
+    assert index.team_matches("Alpha", start="2024-01-04").column("match_id").to_pylist() == ["m1", "m3"]
+    assert index.head_to_head("Alpha", "Gamma", start="2025-01-01").num_rows == 0
+    assert index.head_to_head("Alpha", "Gamma").column("match_id").to_pylist() == ["m4"]
+    assert index.between(start="2024-02-01").column("match_id").to_pylist() == ["m3", "m5"]
+    assert index.team_matches(np.int64(0)).column("match_id").to_pylist() == ["m1", "m3", "m4"]
@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+
+from src.liquipedia.client import LiquipediaClient
+from src.liquipedia.rate_limit import TokenBucketLimiter, parse_retry_after
+
+
+def _acquire_tokens(path, count):
+    limiter = TokenBucketLimiter(rate_per_second=50, path=path)
+    for _ in range(count):
+        limiter.acquire()
+
+
+def test_bucket_is_shared_between_processes(tmp_path):
+    path = tmp_path / "ratelimit.json"
+    start = time.monotonic()
+    processes = [multiprocessing.Process(target=_acquire_tokens, args=(path, 3)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert time.monotonic() - start >= 5 / 50
+
+
+def test_penalize_blocks_other_limiters(tmp_path):
+    path = tmp_path / "ratelimit.json"
+    TokenBucketLimiter(rate_per_second=1000, path=path).penalize(0.1)
+    waited = TokenBucketLimiter(rate_per_second=1000, path=path).acquire()
+    assert waited >= 0.09
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after(None) is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        self.content = b"{}"
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.params = []
+
+    def get(self, url, params, headers, timeout):
+        self.params.append(params)
+        return self.responses.pop(0)
+
+
+class MemoryCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def put(self, key, data):
+        self.data[key] = data
+
+
+def test_client_honors_retry_after_and_maxlag(tmp_path, monkeypatch):
+    monkeypatch.setenv("LIQUIPEDIA_USER_AGENT", "test/0.1 (test@example.com)")
+    session = FakeSession(
+        [
+            FakeResponse(429, {}, {"Retry-After": "0.05"}),
+            FakeResponse(200, {"error": {"code": "maxlag"}}, {"Retry-After": "0.05"}),
+            FakeResponse(200, {"query": {}}),
+        ]
+    )
+    limiter = TokenBucketLimiter(rate_per_second=1000, path=tmp_path / "ratelimit.json")
+    client = LiquipediaClient(session=session, cache=MemoryCache(), limiter=limiter, maxlag=5)
+
+    start = time.monotonic()
+    assert client.get_json({"action": "query"}) == {"query": {}}
+    assert time.monotonic() - start >= 0.09
+    assert all(params["maxlag"] == 5 for params in session.params)
+    assert client.get_json({"action": "query"}) == {"query": {}}
+    assert len(session.params) == 3
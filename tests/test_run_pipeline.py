@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+from src.liquipedia.__main__ import Pipeline, parse_args, run_pipeline, stage_order
+
+
+class FakePipeline(Pipeline):
+    def __init__(self, args, inputs):
+        super().__init__(args)
+        self.inputs = inputs
+        self.ran = []
+
+    def fingerprint(self, stage):
+        return self.inputs[stage]
+
+    def outputs(self, stage):
+        return []
+
+    def run(self, stage):
+        self.ran.append(stage)
+
+
+def test_stages_run_in_dependency_order():
+    assert stage_order(["features", "pages", "build"]) == ["pages", "build", "features"]
+
+
+def test_unchanged_stages_are_skipped(tmp_path):
+    state = tmp_path / "run_state.json"
+    inputs = {"tournaments": "t", "pages": "p", "build": "b", "features": "f"}
+    args = parse_args(["run", "--state", str(state)])
+
+    first = FakePipeline(args, inputs)
+    assert run_pipeline(args, first) == ["tournaments", "pages", "build", "features"]
+
+    inputs["build"] = "b2"
+    second = FakePipeline(args, inputs)
+    assert run_pipeline(args, second) == ["build"]
+    assert run_pipeline(args, FakePipeline(args, inputs)) == []
+
+    offline = parse_args(["run", "--state", str(state), "--offline", "--force"])
+    assert run_pipeline(offline, FakePipeline(offline, inputs)) == ["build", "features"]
+    refresh = parse_args(["run", "--state", str(state), "--refresh", "--stages", "pages"])
+    assert run_pipeline(refresh, FakePipeline(refresh, inputs)) == ["pages"]
+
+
+def test_cli_import_does_not_load_stage_dependencies():
+    code = "import sys, src.liquipedia.__main__; print(sorted({'mwparserfromhell', 'pyarrow'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
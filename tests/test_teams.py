@@ -0,0 +1,90 @@
+from src.liquipedia.teams import TeamIndex, clean_team_name, iter_canonicalized
+
+PAGES = {
+    "Natus Vincere": ["NaVi", "Na`Vi"],
+    "FaZe Clan": ["FaZe"],
+}
+REDIRECTS = {"NAVI": "Natus Vincere", "Navi": "Natus Vincere"}
+
+
+class ResolveClient:
+    def __init__(self):
+        self.batches = []
+
+    def get_json(self, params, use_cache=True):
+        titles = params["titles"].split("|")
+        self.batches.append(titles)
+        redirects = [{"from": title, "to": REDIRECTS[title]} for title in titles if title in REDIRECTS]
+        pages = {}
+        for index, title in enumerate(titles):
+            target = REDIRECTS.get(title, title)
+            if target in PAGES:
+                pages[str(len(target))] = {"title": target, "redirects": [{"title": alias} for alias in PAGES[target]]}
+            else:
+                pages[str(-index - 1)] = {"title": title, "missing": ""}
+        return {"query": {"redirects": redirects, "pages": pages}}
+
+
+def test_clean_team_name():
+    assert clean_team_name("{{TeamOpponent|navi}}") == "Navi"
+    assert clean_team_name("[[Natus Vincere|NaVi]]") == "Natus Vincere"
+    assert clean_team_name(" Team_Spirit ") == "Team Spirit"
+    assert clean_team_name("TBD") is None
+    assert clean_team_name(None) is None
+
+
+def test_index_resolves_only_unseen_names(tmp_path):
+    client = ResolveClient()
+    index = TeamIndex(tmp_path / "teams.json")
+    assert index.resolve(client, ["Navi", "FaZe Clan", "Nobody"]) == 3
+    assert index.lookup("{{TeamOpponent|navi}}") == index.lookup("Na`Vi") == (0, "Natus Vincere")
+    assert index.lookup("FaZe")[1] == "FaZe Clan"
+    assert index.lookup("Nobody")[1] == "Nobody"
+    assert index.resolve(client, ["NaVi", "Navi", "FaZe"]) == 0
+    assert len(client.batches) == 1
+    index.save()
+
+    reloaded = TeamIndex(tmp_path / "teams.json")
+    assert reloaded.lookup("NaVi") == (0, "Natus Vincere")
+
+
+def test_canonicalize_batches_names_and_keeps_order(tmp_path):
+    client = ResolveClient()
+    index = TeamIndex(tmp_path / "teams.json")
+    pages = [
+        (f"Event {n}", "S", [{"team1": f"Team {n}a", "team2": "NAVI" if n % 2 else "FaZe Clan"}]) for n in range(30)
+    ]
+    output = list(iter_canonicalized(pages, index, client, batch_size=10))
+    assert [title for title, _, _ in output] == [f"Event {n}" for n in range(30)]
+    assert [len(batch) for batch in client.batches] == [10, 10, 10, 2]
+    assert output[1][2][0]["team2_canonical"] == "Natus Vincere"
+    assert output[0][2][0]["team2_id"] == output[2][2][0]["team2_id"]
+
+
+def test_concurrent_indexes_agree_on_ids(tmp_path):
+    path = tmp_path / "teams.json"
+    first, second = TeamIndex(path), TeamIndex(path)
+    assert first.lookup("Alpha") == (0, "Alpha")
+    assert second.lookup("Beta") == (1, "Beta")
+    assert second.lookup("Alpha") == (0, "Alpha")
+    assert first.lookup("Beta") == (1, "Beta")
+
+    first.resolve(ResolveClient(), ["Navi"])
+    second.resolve(ResolveClient(), ["FaZe Clan"])
+    first.save()
+    second.save()
+    merged = TeamIndex(path)
+    assert merged.teams == ["Alpha", "Beta"]
+    assert (merged.aliases["Navi"], merged.aliases["FaZe"]) == ("Natus Vincere", "FaZe Clan")
+
+
+def test_failed_resolution_falls_back_to_clean_names(tmp_path):
+    class FailingClient:
+        def get_json(self, params, use_cache=True):
+            raise RuntimeError("API down")
+
+    index = TeamIndex(tmp_path / "teams.json")
+    pages = [("Event", "S", [{"team1": "{{TeamOpponent|navi}}", "team2": "FaZe"}])]
+    match = list(iter_canonicalized(pages, index, FailingClient()))[0][2][0]
+    assert (match["team1_canonical"], match["team2_canonical"]) == ("Navi", "FaZe")
+    assert not index.is_resolved("Navi")
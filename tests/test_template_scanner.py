@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from src.liquipedia.config import DEFAULT_MATCH_TEMPLATES
+from src.liquipedia.extract_matches import extract_matches_from_wikitext
+from src.liquipedia.template_scanner import find_template_spans, iter_template_calls
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+NAMES = tuple(DEFAULT_MATCH_TEMPLATES)
+
+
+@pytest.mark.parametrize("path", sorted(PAGES_DIR.glob("*.wikitext")), ids=lambda path: path.stem)
+def test_prefilter_matches_full_parse(path):
+    wikitext = path.read_text(encoding="utf-8")
+    fast = extract_matches_from_wikitext(wikitext, path.stem, "S", prefilter=True)
+    full = extract_matches_from_wikitext(wikitext, path.stem, "S", prefilter=False)
+    assert fast == full
+
+
+def test_spans_cover_outermost_candidates_and_skip_comments():
+    text = "{{Bracket|R1={{Match|a={{Match2|q=1}}}}}} <!-- {{Match}} --> {{Match|z=1}}"
+    spans = find_template_spans(text, NAMES)
+    assert [text[start:end] for start, end in spans] == ["{{Match|a={{Match2|q=1}}}}", "{{Match|z=1}}"]
+
+
+def test_scanner_returns_early_or_falls_back():
+    assert find_template_spans("{{TeamCard|team=A}} prose", NAMES) == []
+    assert find_template_spans("{{Match|team1={{{1}}}}}", NAMES) is None
+    assert find_template_spans("{{Match|team1=A", NAMES) is None
+
+
+def test_template_calls_yield_names_and_param_keys():
+    text = (
+        "{{Match|opponent1={{TeamOpponent|navi}}|opponent2=[[G2 Esports|G2]]<!-- {{Hidden|x=1}} -->"
+        "|{{#if:a|b}}|bestof=3\n|map1={{Map|map=Mirage|score1=13}}}}{{Unclosed|a=1"
+    )
+    assert list(iter_template_calls(text)) == [
+        ("TeamOpponent", ["1"]),
+        ("Map", ["map", "score1"]),
+        ("Match", ["opponent1", "opponent2", "1", "bestof", "map1"]),
+    ]